@@ -24,6 +24,9 @@ const PHASE2_STEPS: Step[] = [
   { id: 'quality', name: 'Quality Assessment', status: 'pending' },
 ];
 
+// Steps whose step_progress deltas build up the summary
+const STREAMED_SUMMARY_STEPS = ['summarize', 'revision'];
+
 interface WorkflowState {
   jobId: string | null;
   phase: number;
@@ -75,6 +78,9 @@ export function WorkflowRunner() {
               : s
           )
         );
+        if (STREAMED_SUMMARY_STEPS.includes(event.step ?? '')) {
+          setState((prev) => ({ ...prev, summary: '' }));
+        }
         break;
 
       case 'step_progress':
@@ -83,6 +89,14 @@ export function WorkflowRunner() {
             s.id === event.step ? { ...s, message: event.message } : s
           )
         );
+
+        // Show streamed text while the step is still running
+        if (event.reset && STREAMED_SUMMARY_STEPS.includes(event.step ?? '')) {
+          setState((prev) => ({ ...prev, summary: '' }));
+        }
+        if (event.delta && STREAMED_SUMMARY_STEPS.includes(event.step ?? '')) {
+          setState((prev) => ({ ...prev, summary: prev.summary + event.delta }));
+        }
         break;
 
       case 'step_complete':
@@ -406,7 +420,9 @@ export function WorkflowRunner() {
           <div className="mt-6 bg-green-50 border border-green-200 rounded-lg p-4">
             <p className="text-green-800 font-medium">Workflow Complete!</p>
             <p className="text-green-600">
-              Files have been saved to <code>papers/{arxivId}/</code>
+              Phase 1 files have been saved to <code>papers/{arxivId}/</code>. Phase 2 outputs are in the
+              artifact store (<code>papers/artifacts.sqlite</code> by default); write them out as files with{' '}
+              <code>python -m utils.artifacts export {arxivId}</code>
             </p>
           </div>
         )}
@@ -13,6 +13,10 @@ export interface SSEEvent {
   type: SSEEventType;
   step?: string;
   message?: string;
+  // step_progress: next fragment of the step's LLM output as it streams in
+  delta?: string;
+  // step_progress: the step's LLM call is retried, so drop the text streamed so far
+  reset?: boolean;
   output?: string;
   error?: string;
   action?: string;
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the Math Conjecturer pipeline.
+
+Run from src/, e.g. ``uv run python -m benchmarks.bench_http_client``.
+"""
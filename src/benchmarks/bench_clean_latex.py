@@ -0,0 +1,254 @@
+"""
+Benchmark and golden check for LaTeX cleaning.
+
+Times utils.ingest.file_cleaning.clean_latex (two scans for the removal
+rules) against clean_latex_multipass (one pass per rule, the previous
+implementation) over a corpus of documents:
+- --path: .tex files, or directories searched for them (e.g. ../papers)
+- a seeded synthetic corpus of papers of growing size: preamble macros,
+  metadata lines, comments, layout and colour commands, centred figures
+- EDGE_CASES: small documents where the passes interact (nested junk,
+  commands formed by a removal, CRLF and other line breaks, ...)
+
+Every document must clean to byte-identical output with both
+implementations; any difference is printed and the exit status is 1.
+
+It also times remove_unused_macros against the previous implementation
+(one whole-document substitution per unused macro, kept here as
+``legacy_remove_unused_macros``) on papers with --macros definitions.
+
+Usage (from src/):
+    uv run python -m benchmarks.bench_clean_latex
+    uv run python -m benchmarks.bench_clean_latex --path ../papers --sections 10 40 160
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from utils.ingest import file_cleaning
+from utils.ingest.file_cleaning import clean_latex, clean_latex_multipass
+
+EDGE_CASES = [
+    "",
+    "\n",
+    "no newline at the end",
+    "\\maketitle",
+    "text\n\\author{A}",
+    "text\n\n\\date{today}\n",
+    "  \\small % indented junk line\nkept",
+    "50\\% of it % a comment\nnext",
+    "\\\\% a comment after a line break\n",
+    "%\\author{in a comment}\nkept",
+    "\\mbox{\\vspace{1em}}",
+    "\\mbox{a \\hspace{2pt} b} c",
+    "\\vsp\\color{red}ace{1em} joined",
+    "\\mb\\vspace{1em}ox{z}",
+    "\\par\\vspace{1em}agraph",
+    "\\noindent\\hspace{1em}text",
+    "\\par\\mbox{x}abc",
+    "\\paragraph{A}\\parbox{1cm}{b}\\par",
+    "\\begin{center}a\\begin{center}b\\end{center}c\\end{center}",
+    "\\begin{center}\\begin{flushleft}x\\end{center}\\end{flushleft}",
+    "\\begin{cen\\vspace{1pt}ter}x\\end{center}",
+    "\\end{center}\\begin{center}unclosed",
+    "\\mbox{\\begin{center}}x\\end{center}",
+    "\\textcolor{red}{\\mbox{x}}",
+    "\\vspace{unclosed",
+    "line\r\nwith crlf % comment\r\n\\author{A}\r\nend\r\n",
+    "a %x\rb\nc",
+    "a\r\r\nb",
+    "form\x0cfeed\n\\date",
+    "unicode\u2028separator\n\\small",
+    "\u00a0\\small non-breaking space\nkept",
+    "\\newcommand{\\used}{u}\\newcommand{\\unused}{v}\n\\used\n",
+    "\\vspace*{2mm}\\hspace*{1mm}\\newpage\\clearpage\\linebreak\\medskip\\noindent x",
+    "\\definecolor{c}{rgb}{1,0,0}\\pagecolor{c}\\raisebox{1pt}{r}\\makebox{1cm}{m}\\framebox{f}\\fbox{g}",
+    "text\\\\\n\\vspace{2mm}\nmore\n\n\n\nfar   \n",
+]
+
+PREAMBLE = r"""\documentclass[11pt]{amsart}
+\usepackage{amsmath,amssymb,amsthm}
+\usepackage[dvipsnames]{xcolor}
+\newcommand{\R}{\mathbb{R}}
+\newcommand{\N}{\mathbb{N}}
+\newcommand{\eps}{\varepsilon}
+\newcommand{\unusedA}{\mathcal{A}}
+\renewcommand{\phi}{\varphi}
+\def\unusedB{\mathfrak{B}}
+\DeclareMathOperator{\supp}{supp}
+\DeclareMathOperator{\unusedOp}{Op}
+\newtheorem{theorem}{Theorem}[section]
+\newtheorem{lemma}[theorem]{Lemma}
+
+\begin{document}
+\title{A Synthetic Paper}
+\author{A. Author}
+\address{Somewhere}
+\email{author@example.org}
+\date{\today}
+\keywords{cleaning, benchmarks}
+\maketitle
+"""
+
+PARAGRAPHS = [
+    r"Let $f \colon \R \to \R$ be smooth with $\supp f \subset [0,1]$. % TODO: weaken",
+    r"\noindent For every $\eps > 0$ there is $n \in \N$ with $\|f_n - f\| < \eps$.",
+    r"We write $\phi$ for the phase; 50\% of the mass lies in $B(0, r)$.",
+    r"\textcolor{red}{This needs checking.} The bound in \eqref{eq:main} is sharp.",
+    r"See \cite{Smith2020} and the \mbox{well-known} estimate of Lemma~\ref{lem:key}.",
+    r"\vspace{2mm}\par The second claim follows from the first by duality.",
+    r"% a commented-out sentence that should disappear entirely",
+    r"\smallskip",
+    r"\color{blue}A coloured remark.\color{black} Back to normal text.",
+]
+
+BLOCKS = [
+    "\\begin{theorem}\\label{thm:main}\nIf $f$ is convex then\n\\begin{equation}\\label{eq:main}\n"
+    "  \\int_0^1 f(x)\\,dx \\leq \\frac{f(0) + f(1)}{2}.\n\\end{equation}\n\\end{theorem}",
+    "\\begin{center}\n\\fbox{\\includegraphics[width=0.5\\textwidth]{fig}}\n\\end{center}",
+    "\\begin{flushright}\n\\small Right-aligned note.\n\\end{flushright}",
+    "\\begin{proof}\nBy induction on $n$.\\hspace{1em}\\qedhere\n\\end{proof}",
+    "\\newpage",
+]
+
+
+# --- previous implementation, kept for comparison -------------------------
+
+LEGACY_MACRO_DEF_RE = re.compile(
+    r'\\(newcommand|renewcommand|def|DeclareMathOperator)\s*\{\\([A-Za-z@]+)\}',
+    re.MULTILINE,
+)
+
+
+def legacy_remove_unused_macros(tex: str) -> str:
+    defs = LEGACY_MACRO_DEF_RE.findall(tex)
+    defined = {name for _, name in defs}
+    tex_wo_defs = LEGACY_MACRO_DEF_RE.sub('', tex)
+    used = set(re.findall(r'\\([A-Za-z@]+)\b', tex_wo_defs))
+    for name in defined - used:
+        tex = re.sub(
+            rf'\\(newcommand|renewcommand|def|DeclareMathOperator)\s*\{{\\{name}\}}.*',
+            '',
+            tex,
+        )
+    return tex
+
+
+# --- corpus ----------------------------------------------------------------
+
+def synthetic_paper(sections: int, rng: random.Random, crlf: bool = False, macros: int = 0) -> str:
+    # A large preamble: one macro in four is used in the text
+    definitions = "".join(
+        f"\\newcommand{{\\macro{_letters(m)}}}[1]{{\\mathrm{{M}}_{{{m}}}(#1)}}\n" for m in range(macros))
+    parts = [PREAMBLE.replace("\\begin{document}", definitions + "\\begin{document}")]
+    used = [f"$\\macro{_letters(m)}{{x}}$" for m in range(0, macros, 4)]
+    for s in range(sections):
+        parts.append(f"\\section{{Section {s}}}\\label{{sec:{s}}}\n")
+        for _ in range(rng.randint(3, 8)):
+            parts.append(" ".join(rng.choices(PARAGRAPHS + used, k=rng.randint(2, 5))) + "\n\n")
+            if rng.random() < 0.4:
+                parts.append(rng.choice(BLOCKS) + "\n\n\n")
+    parts.append("\\end{document}\n")
+    text = "".join(parts)
+    return text.replace("\n", "\r\n") if crlf else text
+
+
+def _letters(n: int) -> str:
+    # Macro names cannot contain digits
+    out = ""
+    while True:
+        out += chr(ord("a") + n % 26)
+        n //= 26
+        if not n:
+            return out
+
+
+def path_corpus(paths: List[Path]) -> List[Tuple[str, str]]:
+    corpus = []
+    for path in paths:
+        files = sorted(path.rglob("*.tex")) if path.is_dir() else [path]
+        for file in files:
+            corpus.append((str(file), file.read_text(encoding="utf-8", errors="ignore")))
+    return corpus
+
+
+def _time(fn: Callable[[str], str], text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _removal_multipass(tex: str) -> str:
+    tex = file_cleaning.remove_comments(tex)
+    tex = file_cleaning.remove_line_based_junk(tex)
+    tex = file_cleaning.remove_regex_junk(tex)
+    return file_cleaning.flatten_layout_environments(tex)
+
+
+def _removal_single_pass(tex: str) -> str:
+    tex = file_cleaning.strip_comments_and_lines(tex)
+    stripped = file_cleaning.strip_layout(tex)
+    return stripped if stripped is not None else file_cleaning.flatten_layout_environments(
+        file_cleaning.remove_regex_junk(tex))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", type=Path, action="append", default=[],
+                        help=".tex file or directory to add to the corpus")
+    parser.add_argument("--sections", type=int, nargs="*", default=[5, 20, 80, 320],
+                        help="sizes of the synthetic papers, in sections")
+    parser.add_argument("--macros", type=int, default=400,
+                        help="macro definitions in the papers used to time remove_unused_macros")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [(f"edge case {i}", text) for i, text in enumerate(EDGE_CASES)]
+    corpus += [(f"synthetic {n} sections", synthetic_paper(n, rng)) for n in args.sections]
+    corpus += [(f"synthetic {n} sections, CRLF", synthetic_paper(n, rng, crlf=True)) for n in args.sections[:1]]
+    corpus += path_corpus(args.path)
+
+    mismatches = fallbacks = 0
+    for name, text in corpus:
+        if clean_latex(text) != clean_latex_multipass(text):
+            mismatches += 1
+            print(f"  MISMATCH {name}")
+        if file_cleaning.strip_layout(file_cleaning.strip_comments_and_lines(text)) is None:
+            fallbacks += 1
+    print(f"Golden check: {len(corpus) - mismatches}/{len(corpus)} documents byte-identical "
+          f"({fallbacks} needed the multi-pass layout stage)")
+
+    print(f"{'document':<32} {'chars':>9} {'removal':>22} {'clean_latex':>22}")
+    for name, text in corpus:
+        if len(text) < 10_000:
+            continue
+        removal = (_time(_removal_multipass, text, args.repeat), _time(_removal_single_pass, text, args.repeat))
+        full = (_time(clean_latex_multipass, text, args.repeat), _time(clean_latex, text, args.repeat))
+        print(
+            f"{name[-32:]:<32} {len(text):>9} "
+            f"{removal[0]:>7.2f}->{removal[1]:>6.2f}ms {removal[0] / removal[1]:>4.1f}x "
+            f"{full[0]:>7.2f}->{full[1]:>6.2f}ms {full[0] / full[1]:>4.1f}x"
+        )
+
+    print(f"remove_unused_macros, {args.macros} definitions:")
+    for n in args.sections:
+        text = _removal_single_pass(synthetic_paper(n, random.Random(args.seed), macros=args.macros))
+        old = _time(legacy_remove_unused_macros, text, args.repeat)
+        new = _time(file_cleaning.remove_unused_macros, text, args.repeat)
+        kept = len(file_cleaning.find_macro_definitions(file_cleaning.remove_unused_macros(text)))
+        print(f"{f'synthetic {n} sections':<32} {len(text):>9} {old:>8.2f}->{new:>7.2f}ms {old / new:>6.1f}x  "
+              f"({kept} definitions kept)")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Per-call latency of the LLM transport: fresh connection vs shared pool.
+
+Starts a local keep-alive stub of the chat-completions endpoint and times
+N sequential calls two ways:
+- before: a one-shot request per call (new TCP connection every time),
+  which is what the old bare ``requests.post`` call sites did
+- after:  ``utils.http_client.post_json`` over the shared pooled client
+
+Usage (from src/):
+    uv run python -m benchmarks.bench_http_client --calls 200
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from utils.http_client import close_http_client, post_json
+
+STUB_RESPONSE = json.dumps({
+    "choices": [{"message": {"role": "assistant", "content": "ok"}}],
+}).encode()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(STUB_RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _time_calls(fn, calls: int) -> list[float]:
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> dict:
+    timings = sorted(timings)
+    stats = {
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+    }
+    print(
+        f"  {label:<8} mean={stats['mean_ms']:.3f}ms "
+        f"p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server = _start_stub_server()
+    url = f"http://127.0.0.1:{server.server_port}/api/v1/chat/completions"
+    payload = {"model": "stub", "messages": [{"role": "user", "content": "hi"}]}
+    headers = {"Authorization": "Bearer stub"}
+
+    def one_shot():
+        httpx.post(url, json=payload, headers=headers).raise_for_status()
+
+    def pooled():
+        post_json(url, payload, "stub").raise_for_status()
+
+    print(f"Timing {args.calls} sequential calls against {url}")
+    before = _report("before", _time_calls(one_shot, args.calls))
+    after = _report("after", _time_calls(pooled, args.calls))
+    print(f"  speedup  {before['mean_ms'] / after['mean_ms']:.2f}x (mean)")
+
+    close_http_client()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
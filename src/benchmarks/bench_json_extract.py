@@ -0,0 +1,235 @@
+"""
+Micro-benchmark of structured-output JSON extraction.
+
+Times the single-pass extractor (utils.json_extract, used by
+nodes.phase2._common.extract_json_from_response) against the previous
+regex + multi-pass implementation, kept here as ``legacy_extract``, over a
+corpus of model outputs:
+- --cassette: responses recorded by benchmarks.mock_openrouter --mode record
+- --cache: responses stored in the SQLite LLM cache (LLM_CACHE=sqlite)
+- otherwise (or with --synthetic) a seeded corpus shaped like Phase 2
+  judge/critic answers: every schema.phase2 model, LaTeX-heavy strings,
+  with and without correctly escaped backslashes, bare, fenced and
+  wrapped in prose
+
+Besides timings it reports how often the two implementations agree, and
+the responses only one of them could parse.
+
+Usage (from src/):
+    uv run python -m benchmarks.bench_json_extract
+    uv run python -m benchmarks.bench_json_extract --cassette run.jsonl --cache ../.cache/llm_cache.sqlite
+"""
+
+import argparse
+import json
+import random
+import re
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.mock_openrouter import RESPONSE_MODELS, sample_from_schema
+from utils.json_extract import extract_json
+
+LATEX_SNIPPETS = [
+    r"for every $\varepsilon > 0$ we have $\|u_n - u\|_{L^2} \leq \frac{C}{n}$",
+    r"the map $\nabla f : \mathbb{R}^n \to \mathbb{R}^n$ is $\theta$-Hölder",
+    r"consider $S = \{x \in X : \phi(x) \neq 0\}$ and $\tau \geq \beta$",
+    r"by \cite{Smith2020}, $\sum_{k=1}^{\infty} a_k \, b_k < \infty$",
+    r"\textbf{Step 1.} Show $\lim_{t \to 0} \rho(t) = 0$ using \eqref{eq:main}",
+    r"the bound $\underline{d}(A) \geq \left( \frac{1}{2} \right)^{\kappa}$ is sharp",
+]
+PLAIN_SNIPPETS = [
+    "This step is standard.",
+    "The argument follows the outline in Section 3.",
+    "Line one of the critique.\nLine two of the critique.",
+]
+PREAMBLES = [
+    "",
+    "Here is my evaluation.\n\n",
+    "Let me think about the proposal {carefully} first.\n\n",
+]
+
+
+# --- previous implementation, kept for comparison -------------------------
+
+def legacy_try_parse_json(json_str: str) -> dict | None:
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        pass
+    try:
+        fixed = re.sub(r'(?<!\\)\\([a-zA-Z])', r'\\\\' + r'\1', json_str)
+        return json.loads(fixed)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(json_str.replace('\\', '/'))
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(json_str.replace('\\', ''))
+    except json.JSONDecodeError:
+        pass
+    return None
+
+
+def legacy_extract(response_text: str) -> dict | None:
+    patterns = [
+        r'```json\s*([\s\S]*?)\s*```',
+        r'```\s*([\s\S]*?)\s*```',
+        r'(\{[\s\S]*\})',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, response_text)
+        if match:
+            json_str = match.group(1) if '```' in pattern else match.group(0)
+            result = legacy_try_parse_json(json_str)
+            if result:
+                return result
+    json_match = re.search(r'\{[\s\S]*\}', response_text)
+    if json_match:
+        cleaned = re.sub(r'\\([a-zA-Z]+)', r'LATEX_\1', json_match.group(0))
+        result = legacy_try_parse_json(cleaned)
+        if result:
+            return result
+    return None
+
+
+# --- corpus ----------------------------------------------------------------
+
+def _fill_strings(value: Any, rng: random.Random) -> Any:
+    if isinstance(value, dict):
+        return {k: _fill_strings(v, rng) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill_strings(v, rng) for v in value]
+    if isinstance(value, str):
+        pieces = rng.choices(LATEX_SNIPPETS + PLAIN_SNIPPETS, k=rng.randint(1, 12))
+        return " ".join(pieces)
+    return value
+
+
+def synthetic_corpus(count: int, seed: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """(response, intended object) pairs; about half with LaTeX left unescaped."""
+    rng = random.Random(seed)
+    models = sorted(RESPONSE_MODELS.items())
+    corpus = []
+    for i in range(count):
+        _, model = models[i % len(models)]
+        data = _fill_strings(sample_from_schema(model.model_json_schema()), rng)
+        body = json.dumps(data, indent=2, ensure_ascii=False)
+        if rng.random() < 0.5:
+            # What models often send: LaTeX backslashes not doubled
+            body = body.replace("\\\\", "\\")
+        wrapping = rng.randrange(3)
+        if wrapping == 1:
+            body = f"```json\n{body}\n```"
+        elif wrapping == 2:
+            body = f"```\n{body}\n```\nLet me know if the {{scores}} need adjusting."
+        corpus.append((rng.choice(PREAMBLES) + body, data))
+    return corpus
+
+
+def cassette_corpus(path: Path) -> List[str]:
+    corpus = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            response = json.loads(line)["response"]
+            corpus.append(response["choices"][0]["message"]["content"])
+    return corpus
+
+
+def cache_corpus(path: Path) -> List[str]:
+    conn = sqlite3.connect(path)
+    try:
+        return [value for (value,) in conn.execute("SELECT value FROM responses")]
+    finally:
+        conn.close()
+
+
+# --- measurement -----------------------------------------------------------
+
+def _time(fn: Callable[[str], Any], corpus: List[str], repeat: int) -> Dict[str, float]:
+    per_response = []
+    for text in corpus:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(text)
+        per_response.append((time.perf_counter() - start) / repeat * 1e6)
+    per_response.sort()
+    return {
+        "total_ms": sum(per_response) / 1000,
+        "mean_us": statistics.mean(per_response),
+        "p50_us": per_response[len(per_response) // 2],
+        "max_us": per_response[-1],
+    }
+
+
+def _agreement(corpus: List[str]) -> Dict[str, int]:
+    counts = {"same": 0, "differ": 0, "new_only": 0, "legacy_only": 0, "neither": 0}
+    for text in corpus:
+        new, old = extract_json(text), legacy_extract(text)
+        if new is None and not old:
+            counts["neither"] += 1
+        elif new is None:
+            counts["legacy_only"] += 1
+        elif not old:
+            counts["new_only"] += 1
+        else:
+            counts["same" if new == old else "differ"] += 1
+    return counts
+
+
+def _accuracy(fn: Callable[[str], Any], pairs: List[Tuple[str, Dict[str, Any]]]) -> int:
+    """Synthetic responses decoded to exactly the object the "model" meant."""
+    return sum(fn(text) == expected for text, expected in pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cassette", type=Path, action="append", default=[],
+                        help="JSONL cassette recorded by benchmarks.mock_openrouter")
+    parser.add_argument("--cache", type=Path, action="append", default=[],
+                        help="SQLite LLM cache file")
+    parser.add_argument("--synthetic", type=int, default=None,
+                        help="Synthetic responses to add (default 300 when no other corpus is given)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus: List[str] = []
+    for path in args.cassette:
+        corpus += cassette_corpus(path)
+    for path in args.cache:
+        corpus += cache_corpus(path)
+    synthetic = args.synthetic if args.synthetic is not None else (0 if corpus else 300)
+    pairs = synthetic_corpus(synthetic, args.seed)
+    corpus += [text for text, _ in pairs]
+    if not corpus:
+        parser.error("empty corpus")
+
+    sizes = sorted(len(text) for text in corpus)
+    print(f"Corpus: {len(corpus)} responses, median {sizes[len(sizes) // 2]} chars, largest {sizes[-1]} chars")
+
+    results = {"legacy": _time(legacy_extract, corpus, args.repeat), "single_pass": _time(extract_json, corpus, args.repeat)}
+    for name, stats in results.items():
+        print(
+            f"  {name:<12} total={stats['total_ms']:.2f}ms mean={stats['mean_us']:.1f}us "
+            f"p50={stats['p50_us']:.1f}us max={stats['max_us']:.1f}us"
+        )
+    speedup = results["legacy"]["total_ms"] / results["single_pass"]["total_ms"]
+    print(f"  speedup      {speedup:.2f}x")
+
+    counts = _agreement(corpus)
+    print("Agreement: " + ", ".join(f"{name}={n}" for name, n in counts.items()))
+    if pairs:
+        print(
+            f"Synthetic responses decoded exactly: legacy {_accuracy(legacy_extract, pairs)}/{len(pairs)}, "
+            f"single_pass {_accuracy(extract_json, pairs)}/{len(pairs)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
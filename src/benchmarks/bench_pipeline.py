@@ -0,0 +1,425 @@
+"""
+End-to-end Phase 1 + Phase 2 benchmark against the local mock OpenRouter.
+
+Drives build_phase1_workflow, create_agenda_workflow and
+create_proposal_workflow for one or more synthetic papers (served by
+benchmarks.mock_openrouter, so no network or API key is needed) and
+reports:
+- wall time per phase and in total
+- per-node latency percentiles (from LangGraph debug events)
+- LLM call counts (per usage label, plus injected 429s / malformed JSON)
+- bytes written under papers/<id>, and the size of the artifact store the
+  Phase 2 nodes wrote to (a temporary one, see --artifact-store), with the
+  background writer's queue depth and put/sync latency
+- peak RSS of the process
+
+With --checkpoint the Phase 2 graphs run with a SQLite checkpointer (in the
+temporary store directory), as run_workflow.py does by default, so the
+cost of checkpoints and of the per-node artifact barrier is measured too.
+
+Results are written as JSON; pass --compare with an earlier file to print
+the change per metric, e.g. between two commits.
+
+Usage (from src/):
+    uv run python -m benchmarks.bench_pipeline --papers 2 --latency 0.05 --output bench.json
+    uv run python -m benchmarks.bench_pipeline --async --compare bench.json
+    uv run python -m benchmarks.bench_pipeline --checkpoint --compare bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import nodes.phase2._common as phase2_common
+import utils.ingest.fetch_papers as fetch_papers
+import utils.openrouter as openrouter
+from utils.artifacts import (
+    ArtifactStore,
+    FileArtifactStore,
+    JSONLArtifactStore,
+    SQLiteArtifactStore,
+    artifact_writer_stats,
+    flush_artifacts,
+    set_artifact_store,
+)
+from utils.http_client import aclose_http_client, close_http_client
+from utils.rate_limit import get_rate_limiter
+from utils.usage import get_usage_tracker
+from workflow.phase1 import build_phase1_workflow
+from workflow.phase2 import (
+    NUM_PROPOSALS,
+    _agenda_state,
+    _failed_proposal,
+    _proposal_state,
+    _select_directions,
+    create_agenda_workflow,
+    create_proposal_workflow,
+)
+from workflow.checkpoint import _config, agenda_thread, aopen_checkpointer, open_checkpointer, proposal_thread
+from .mock_openrouter import MockConfig, start_mock_server
+
+BENCH_ID_PREFIX = "bench."
+
+
+class NodeTimer:
+    """Collects node durations from LangGraph ``debug`` stream events."""
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self._started: Dict[str, tuple[str, datetime]] = {}
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        payload = event.get("payload", {})
+        task_id = payload.get("id")
+        timestamp = datetime.fromisoformat(event["timestamp"])
+        if event["type"] == "task":
+            self._started[task_id] = (payload["name"], timestamp)
+        elif event["type"] == "task_result" and task_id in self._started:
+            name, started = self._started.pop(task_id)
+            self.durations[name].append((timestamp - started).total_seconds())
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {name: _percentiles(values) for name, values in sorted(self.durations.items())}
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "mean_s": round(statistics.mean(ordered), 4),
+        "p50_s": round(pick(0.50), 4),
+        "p90_s": round(pick(0.90), 4),
+        "p99_s": round(pick(0.99), 4),
+        "max_s": round(ordered[-1], 4),
+    }
+
+
+def _checkpointed(app, thread_id: str) -> Dict[str, Any]:
+    """stream() arguments for ``thread_id``, with the durability invoke_checkpointed uses."""
+    if app.checkpointer is None:
+        return {}
+    return {"config": _config(thread_id), "durability": "sync"}
+
+
+def _run_graph(app, state: dict, timer: NodeTimer, thread_id: str | None = None) -> dict:
+    final_state = state
+    for mode, chunk in app.stream(state, stream_mode=["debug", "values"], **_checkpointed(app, thread_id)):
+        if mode == "debug":
+            timer.observe(chunk)
+        else:
+            final_state = chunk
+    return final_state
+
+
+async def _arun_graph(app, state: dict, timer: NodeTimer, thread_id: str | None = None) -> dict:
+    final_state = state
+    async for mode, chunk in app.astream(state, stream_mode=["debug", "values"], **_checkpointed(app, thread_id)):
+        if mode == "debug":
+            timer.observe(chunk)
+        else:
+            final_state = chunk
+    return final_state
+
+
+def _run_phase2(phase1_state: dict, args, timer: NodeTimer) -> list:
+    summary, mechanism, arxiv_id = phase1_state["summary"], phase1_state["mechanism"], phase1_state["arxiv_id"]
+    with open_checkpointer() if args.checkpoint else contextlib.nullcontext() as checkpointer:
+        agenda = _run_graph(
+            create_agenda_workflow(checkpointer=checkpointer),
+            _agenda_state(summary, mechanism, arxiv_id, args.max_iterations),
+            timer,
+            agenda_thread(arxiv_id),
+        )
+        directions, selected = _select_directions(agenda, args.proposals)
+        proposal_app = create_proposal_workflow(max_iterations=args.max_iterations, checkpointer=checkpointer)
+
+        def run_proposal(i: int, direction: str) -> dict:
+            try:
+                return _run_graph(proposal_app, _proposal_state(
+                    summary, mechanism, arxiv_id, args.max_iterations, direction, i, len(selected), directions,
+                ), timer, proposal_thread(arxiv_id, i))
+            except Exception as e:
+                # Isolated like run_phase2_workflow does, so one failure is counted, not fatal
+                return _failed_proposal(i, direction, e)
+
+        return [run_proposal(i, direction) for i, direction in enumerate(selected, 1)]
+
+
+async def _arun_phase2(phase1_state: dict, args, timer: NodeTimer) -> list:
+    summary, mechanism, arxiv_id = phase1_state["summary"], phase1_state["mechanism"], phase1_state["arxiv_id"]
+    try:
+        async with aopen_checkpointer() if args.checkpoint else contextlib.nullcontext() as checkpointer:
+            agenda = await _arun_graph(
+                create_agenda_workflow(use_async=True, checkpointer=checkpointer),
+                _agenda_state(summary, mechanism, arxiv_id, args.max_iterations),
+                timer,
+                agenda_thread(arxiv_id),
+            )
+            directions, selected = _select_directions(agenda, args.proposals)
+            proposal_app = create_proposal_workflow(
+                max_iterations=args.max_iterations, use_async=True, checkpointer=checkpointer
+            )
+
+            async def run_proposal(i: int, direction: str) -> dict:
+                try:
+                    return await _arun_graph(proposal_app, _proposal_state(
+                        summary, mechanism, arxiv_id, args.max_iterations, direction, i, len(selected), directions,
+                    ), timer, proposal_thread(arxiv_id, i))
+                except Exception as e:
+                    return _failed_proposal(i, direction, e)
+
+            return await asyncio.gather(*(run_proposal(i, direction) for i, direction in enumerate(selected, 1)))
+    finally:
+        await aclose_http_client()
+
+
+def _dir_bytes(path: Path) -> tuple[int, int]:
+    """(total bytes, file count) under path."""
+    files = [p for p in path.rglob("*") if p.is_file()]
+    return sum(p.stat().st_size for p in files), len(files)
+
+
+def _bench_artifact_store(backend: str, directory: Path) -> ArtifactStore:
+    """A store in ``directory``, so benchmark outputs stay out of papers/artifacts.*"""
+    if backend == "files":
+        return FileArtifactStore(fetch_papers.PAPERS_DIR)
+    if backend == "jsonl":
+        return JSONLArtifactStore(directory / "artifacts.jsonl")
+    return SQLiteArtifactStore(directory / "artifacts.sqlite")
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    mock = start_mock_server(MockConfig(
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        malformed=args.malformed,
+        retry_after=0,
+        seed=args.seed,
+        reject_json_schema=args.no_json_schema,
+        done_after=args.done_after,
+        paper_sections=args.sections,
+    ))
+    # Point the LLM transport and arXiv download at the mock (which needs no real key)
+    openrouter.OPENROUTER_API_URL = mock.url
+    fetch_papers.ARXIV_EPRINT_URL = mock.eprint_url
+    os.environ["OPENROUTER_API_KEY"] = phase2_common.OPENROUTER_API_KEY = "mock"
+    get_usage_tracker().reset()
+
+    store_dir = Path(tempfile.mkdtemp(prefix="bench_artifacts_"))
+    store = _bench_artifact_store(args.artifact_store, store_dir)
+    # Synthetic e-prints go to a throwaway source store, not .cache/arxiv_sources
+    os.environ.setdefault("ARXIV_SOURCE_CACHE", str(store_dir / "sources"))
+    if args.checkpoint:
+        os.environ["PHASE2_CHECKPOINTS"] = str(store_dir / "checkpoints.sqlite")
+    set_artifact_store(store, background=not args.inline_artifacts)
+
+    timer = NodeTimer()
+    phase1_s, phase2_s = [], []
+    proposals = failed = 0
+    papers_bytes = papers_files = 0
+    arxiv_ids = [f"{BENCH_ID_PREFIX}{i:04d}" for i in range(1, args.papers + 1)]
+
+    total_start = time.perf_counter()
+    log = io.StringIO()
+    try:
+        for arxiv_id in arxiv_ids:
+            with contextlib.redirect_stdout(log if not args.verbose else sys.stdout):
+                start = time.perf_counter()
+                state = _run_graph(build_phase1_workflow(), {
+                    "arxiv_id": arxiv_id, "tex": "", "summary": "", "iteration": 1,
+                }, timer)
+                phase1_s.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                if args.use_async:
+                    results = asyncio.run(_arun_phase2(state, args, timer))
+                else:
+                    results = _run_phase2(state, args, timer)
+                phase2_s.append(time.perf_counter() - start)
+            proposals += len(results)
+            failed += sum(1 for result in results if result.get("error"))
+
+            size, count = _dir_bytes(fetch_papers.PAPERS_DIR / arxiv_id)
+            papers_bytes += size
+            papers_files += count
+        flush_artifacts()
+        writer_stats = artifact_writer_stats()
+        artifact_records = sum(len(store.list(arxiv_id)) for arxiv_id in arxiv_ids)
+        store.close()
+        artifact_bytes = store.size_bytes()
+    finally:
+        total_s = time.perf_counter() - total_start
+        close_http_client()
+        mock.shutdown()
+        set_artifact_store(None)
+        if not args.keep:
+            for arxiv_id in arxiv_ids:
+                shutil.rmtree(fetch_papers.PAPERS_DIR / arxiv_id, ignore_errors=True)
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+    tracker = get_usage_tracker()
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        },
+        "wall_s": {
+            "total": round(total_s, 3),
+            "phase1": _percentiles(phase1_s),
+            "phase2": _percentiles(phase2_s),
+        },
+        "nodes": timer.report(),
+        "proposals": {"total": proposals, "failed": failed},
+        "llm": {
+            "requests": mock.stats["requests"],
+            "rate_limited": mock.stats["rate_limited"],
+            "malformed": mock.stats["malformed"],
+            "rejected_json_schema": mock.stats["rejected_json_schema"],
+            "completed_calls": len(tracker.records()),
+            "prompt_tokens": sum(r.prompt_tokens for r in tracker.records()),
+            "cached_share": round(tracker.cached_share(), 4),
+            "by_label": {label: t["calls"] for label, t in tracker.summary().items()},
+        },
+        "rate_limiter": get_rate_limiter().stats.as_dict(),
+        "papers": {"bytes": papers_bytes, "files": papers_files},
+        "artifacts": {
+            "backend": args.artifact_store,
+            "records": artifact_records,
+            "bytes": artifact_bytes,
+            "writer": writer_stats,
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _flatten(result: Dict[str, Any]) -> Dict[str, float]:
+    """Comparable scalar metrics of a result file."""
+    flat = {
+        "wall_s.total": result["wall_s"]["total"],
+        "wall_s.phase1.mean": result["wall_s"]["phase1"]["mean_s"],
+        "wall_s.phase2.mean": result["wall_s"]["phase2"]["mean_s"],
+        "llm.requests": result["llm"]["requests"],
+        "llm.prompt_tokens": result["llm"]["prompt_tokens"],
+        "papers.bytes": result["papers"]["bytes"],
+    }
+    if "artifacts" in result:
+        flat["artifacts.bytes"] = result["artifacts"]["bytes"]
+    if result.get("peak_rss_mb") is not None:
+        flat["peak_rss_mb"] = result["peak_rss_mb"]
+    for name, stats in result["nodes"].items():
+        flat[f"nodes.{name}.p50"] = stats["p50_s"]
+    return flat
+
+
+def print_report(result: Dict[str, Any], baseline: Dict[str, Any] | None = None) -> None:
+    wall = result["wall_s"]
+    print(f"Total wall time: {wall['total']:.2f}s "
+          f"(phase 1 mean {wall['phase1']['mean_s']:.2f}s, phase 2 mean {wall['phase2']['mean_s']:.2f}s)")
+    if "proposals" in result:
+        print(f"Proposals: {result['proposals']['total']} ({result['proposals']['failed']} failed)")
+    print("Per-node latency:")
+    for name, stats in result["nodes"].items():
+        print(f"  {name:<22} n={stats['count']:<4} p50={stats['p50_s']:.3f}s "
+              f"p90={stats['p90_s']:.3f}s p99={stats['p99_s']:.3f}s")
+    llm = result["llm"]
+    print(f"LLM requests: {llm['requests']} ({llm['rate_limited']} rate-limited, "
+          f"{llm['malformed']} malformed), prompt tokens: {llm['prompt_tokens']}")
+    print(f"Written under papers/: {result['papers']['bytes']} bytes in {result['papers']['files']} files")
+    if "artifacts" in result:
+        artifacts = result["artifacts"]
+        print(f"Artifact store ({artifacts['backend']}): {artifacts['records']} records, {artifacts['bytes']} bytes")
+        writer = artifacts.get("writer")
+        if writer:
+            print(f"Artifact writer: {writer['puts']} puts (max {writer['put_s_max'] * 1000:.1f}ms), "
+                  f"{writer['syncs']} syncs (max {writer['sync_s_max'] * 1000:.1f}ms), "
+                  f"peak queue depth {writer['queue_depth_peak']}")
+    print(f"Peak RSS: {result['peak_rss_mb']} MB")
+
+    if baseline is not None:
+        print(f"Compared with {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+        before, after = _flatten(baseline), _flatten(result)
+        for key in after:
+            if key in before and before[key]:
+                change = (after[key] - before[key]) / before[key]
+                print(f"  {key:<36} {before[key]:>12} -> {after[key]:<12} ({change:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--papers", type=int, default=1, help="synthetic papers to process")
+    parser.add_argument("--sections", type=int, default=8, help="sections per synthetic paper")
+    parser.add_argument("--proposals", type=int, default=NUM_PROPOSALS)
+    parser.add_argument("--max-iterations", type=int, default=2)
+    parser.add_argument("--done-after", type=int, default=1, help="Phase 2 iteration the mock accepts")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock seconds per LLM call")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability of an injected 429")
+    parser.add_argument("--malformed", type=float, default=0.0, help="probability of truncated JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-json-schema", action="store_true",
+                        help="mock rejects json_schema requests (model without structured outputs)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="run Phase 2 with the async nodes, proposals concurrently")
+    parser.add_argument("--artifact-store", choices=["sqlite", "jsonl", "files"],
+                        default=os.getenv("ARTIFACT_STORE", "sqlite"),
+                        help="backend for Phase 2 outputs (sqlite/jsonl in a temporary directory)")
+    parser.add_argument("--inline-artifacts", action="store_true",
+                        help="write artifacts inside the nodes instead of on the background writer")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="run Phase 2 with a checkpointer, as run_workflow.py does by default")
+    parser.add_argument("--output", type=Path, default=Path("bench_pipeline.json"))
+    parser.add_argument("--compare", type=Path, help="earlier result file to diff against")
+    parser.add_argument("--keep", action="store_true", help="keep papers/bench.* outputs and the artifact store")
+    parser.add_argument("--verbose", action="store_true", help="show pipeline output")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    print_report(result, baseline)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
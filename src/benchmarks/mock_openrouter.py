@@ -0,0 +1,532 @@
+"""
+Local stand-in for OpenRouter (and arXiv e-prints) for offline runs.
+
+Serves ``POST /api/v1/chat/completions`` with responses that satisfy the
+pipeline's parsers, so Phase 1 + Phase 2 can run end to end without
+network access or an API key:
+- ``response_format.json_schema`` requests get an instance of that schema
+- JSON-mode / prompt-fallback requests get an instance of the schema.phase2
+  model whose fields the prompt mentions (AgendaResult, CritiqueResult, ...)
+- plain-text requests get a summary, a critic verdict (**STATUS:** PASS) or
+  a ``<blackboard>`` mechanism XML depending on the prompt
+
+Faults can be injected deterministically (seeded per request): latency,
+HTTP 429 with Retry-After, and truncated (malformed) JSON content.
+--no-json-schema makes it reject ``json_schema`` requests like a model
+without structured-output support.
+
+Cassette modes make runs reproducible against real model output:
+- record: forward each request to the real endpoint and append the
+  response to a JSONL cassette keyed by utils.llm_cache.cache_key
+- replay: answer from the cassette (canned response on a miss, or 404
+  with --strict)
+
+Requests with ``"stream": true`` get the same content as server-sent
+events, a few characters per event.
+
+``GET /e-print/<arxiv_id>`` returns a synthetic LaTeX source tarball with an
+ETag and Last-Modified (and 304 Not Modified for a matching conditional
+request), and ``GET /stats`` returns the request counters as JSON.
+
+Point the pipeline at it with:
+    OPENROUTER_API_URL=http://127.0.0.1:8765/api/v1/chat/completions
+    ARXIV_EPRINT_URL=http://127.0.0.1:8765/e-print
+
+Usage (from src/):
+    uv run python -m benchmarks.mock_openrouter --port 8765 --latency 0.2 --rate-limit 0.05
+    uv run python -m benchmarks.mock_openrouter --mode record --cassette run.jsonl
+    uv run python -m benchmarks.mock_openrouter --mode replay --cassette run.jsonl
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import re
+import tarfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Type
+
+import httpx
+from pydantic import BaseModel
+
+from schema import phase2 as phase2_schema
+from utils.llm_cache import cache_key
+from utils.prompt_budget import estimate_message_tokens, estimate_tokens
+
+UPSTREAM_URL = "https://openrouter.ai/api/v1/chat/completions"
+COMPLETIONS_PATH = "/api/v1/chat/completions"
+EPRINT_PATH = "/e-print/"
+# Synthetic tarballs are deterministic, so they never change
+EPRINT_LAST_MODIFIED = "Thu, 01 Jan 1970 00:00:00 GMT"
+STREAM_CHUNK_CHARS = 16  # content per SSE event for "stream": true requests
+
+# Models the pipeline asks for in JSON mode; matched by field names in the prompt
+RESPONSE_MODELS: Dict[str, Type[BaseModel]] = {
+    name: model for name, model in vars(phase2_schema).items()
+    if isinstance(model, type) and issubclass(model, BaseModel) and model is not BaseModel
+}
+
+CANNED_TEXT = "Canned {field} for offline runs: for every $\\varepsilon > 0$ the bound holds."
+
+CANNED_SUMMARY = """# Summary
+
+## Main Results
+**Theorem 1.** For every $n \\geq 1$ the canned inequality $a_n \\leq C n^{\\alpha}$ holds.
+
+## Key Definitions
+A sequence is *canned* if it is produced by the offline stand-in server.
+
+## Open Questions
+Whether the exponent $\\alpha$ is sharp remains open.
+"""
+
+CANNED_CRITIQUE = """**STATUS:** PASS
+
+The summary is clear, complete and faithful to the paper.
+"""
+
+CANNED_BLACKBOARD = """<blackboard>
+  <context>
+    <theorem id="T1">For every $n \\geq 1$, $a_n \\leq C n^{\\alpha}$.</theorem>
+  </context>
+  <motivation>
+    <dissatisfaction id="D1" refs="T1">Sharpness of $\\alpha$ is unknown.</dissatisfaction>
+  </motivation>
+</blackboard>
+"""
+
+SYNTHETIC_MAIN = r"""\documentclass{article}
+\newcommand{\R}{\mathbb{R}}
+\title{A Synthetic Paper (%(arxiv_id)s)}
+\begin{document}
+\maketitle
+\begin{abstract}
+Offline stand-in for arXiv source used by the benchmarks.
+\end{abstract}
+%(inputs)s
+\bibliographystyle{plain}
+\bibliography{refs}
+\end{document}
+"""
+
+SYNTHETIC_SECTION = r"""\section{Section %(i)d}
+%% a comment that the cleaner removes
+\begin{theorem}
+For every $x \in \R$ and $n \geq %(i)d$ we have $|f_n(x)| \leq C n^{\alpha}$ \cite{ref%(i)d}.
+\end{theorem}
+\begin{proof}
+%(body)s
+\end{proof}
+"""
+
+SYNTHETIC_BBL = r"""\begin{thebibliography}{9}
+%(items)s
+\end{thebibliography}
+"""
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the stand-in server."""
+    latency: float = 0.0         # seconds added to every completion
+    latency_jitter: float = 0.0  # +/- uniform jitter in seconds
+    rate_limit: float = 0.0      # probability of answering 429
+    malformed: float = 0.0       # probability of truncating JSON content
+    retry_after: float = 1.0     # Retry-After header on 429s
+    seed: int = 0
+    reject_json_schema: bool = False  # answer json_schema requests with 400, like models without support
+    done_after: int = 1          # DoneDecision says is_done from this iteration on
+    mode: str = "canned"         # canned | record | replay
+    cassette: Path | None = None
+    strict: bool = False         # replay: 404 on a cassette miss instead of a canned answer
+    upstream_url: str = UPSTREAM_URL
+    paper_sections: int = 8      # sections in the synthetic e-print
+
+
+def sample_from_schema(schema: Dict[str, Any], field: str = "value", defs: Dict[str, Any] | None = None) -> Any:
+    """Build a value that validates against a (pydantic-generated) JSON schema."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return sample_from_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], field, defs)
+    if "anyOf" in schema:
+        return sample_from_schema(schema["anyOf"][0], field, defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+
+    kind = schema.get("type", "object")
+    if kind == "object":
+        return {
+            name: sample_from_schema(prop, name, defs)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [sample_from_schema(schema.get("items", {}), field, defs) for _ in range(3)]
+    if kind in ("integer", "number"):
+        low = schema.get("minimum", 1)
+        high = schema.get("maximum", max(low, 4))
+        return min(max(4, low), high)
+    if kind == "boolean":
+        return True
+    return CANNED_TEXT.format(field=field.replace("_", " "))
+
+
+def synthetic_eprint(arxiv_id: str, sections: int = 8) -> bytes:
+    """Gzipped tarball laid out like a typical arXiv source (\\input + .bbl)."""
+    body = " ".join(["The estimate follows by induction on $n$ and Lemma~2."] * 40)
+    files = {
+        "main.tex": SYNTHETIC_MAIN % {
+            "arxiv_id": arxiv_id,
+            "inputs": "\n".join(f"\\input{{sections/sec{i}}}" for i in range(1, sections + 1)),
+        },
+        "main.bbl": SYNTHETIC_BBL % {
+            "items": "\n".join(f"\\bibitem{{ref{i}}} A. Author, Paper {i}." for i in range(1, sections + 1)),
+        },
+    }
+    for i in range(1, sections + 1):
+        files[f"sections/sec{i}.tex"] = SYNTHETIC_SECTION % {"i": i, "body": body}
+
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, text in files.items():
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 0
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _message_text(payload: Dict[str, Any]) -> str:
+    parts = []
+    for message in payload.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content)
+        parts.append(content)
+    return "\n".join(parts)
+
+
+def _guess_model(text: str) -> Type[BaseModel] | None:
+    """The response model whose field names the prompt mentions most."""
+    best, best_score = None, 0
+    for model in RESPONSE_MODELS.values():
+        fields = list(model.model_fields)
+        score = sum(1 for name in fields if name in text) / len(fields)
+        if score > best_score:
+            best, best_score = model, score
+    return best if best_score >= 0.5 else None
+
+
+class MockOpenRouter:
+    """Stand-in server; start with start_mock_server()."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._seen: Counter = Counter()  # per request key, for deterministic fault rolls
+        self._prefixes: set[str] = set()  # cache_control parts seen, to report cached tokens
+        self._cassette: Dict[str, Dict[str, Any]] = {}
+        if config.mode == "replay":
+            if config.cassette is None or not config.cassette.exists():
+                raise FileNotFoundError(f"Cassette not found: {config.cassette}")
+            with config.cassette.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._cassette[entry["key"]] = entry["response"]
+        self.server: ThreadingHTTPServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self) -> str:
+        return self.base_url + COMPLETIONS_PATH
+
+    @property
+    def eprint_url(self) -> str:
+        return self.base_url + EPRINT_PATH.rstrip("/")
+
+    def shutdown(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    # --- request handling -------------------------------------------------
+
+    def _roll(self, key: str, kind: str) -> float:
+        """Deterministic pseudo-random draw for the n-th occurrence of a request."""
+        with self._lock:
+            occurrence = self._seen[(key, kind)]
+            self._seen[(key, kind)] += 1
+        digest = hashlib.sha256(f"{self.config.seed}:{kind}:{key}:{occurrence}".encode()).digest()
+        return int.from_bytes(digest[:8], "big") / 2**64
+
+    def complete(self, payload: Dict[str, Any], headers: Dict[str, str]) -> tuple[int, Dict[str, str], Dict[str, Any]]:
+        """Return (status, extra headers, JSON body) for one completion request."""
+        key = cache_key(payload)
+        self._count("requests")
+
+        delay = self.config.latency
+        if self.config.latency_jitter:
+            delay += (self._roll(key, "jitter") * 2 - 1) * self.config.latency_jitter
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.config.rate_limit and self._roll(key, "429") < self.config.rate_limit:
+            self._count("rate_limited")
+            return 429, {"Retry-After": str(self.config.retry_after)}, {
+                "error": {"code": 429, "message": "Rate limit exceeded (injected by mock)"},
+            }
+
+        response_format = payload.get("response_format") or {}
+        if self.config.reject_json_schema and response_format.get("type") == "json_schema":
+            self._count("rejected_json_schema")
+            return 400, {}, {"error": {"code": 400, "message": "response_format json_schema is not supported by this model"}}
+
+        if self.config.mode == "record":
+            return self._record(key, payload, headers)
+        if self.config.mode == "replay":
+            response = self._cassette.get(key)
+            if response is not None:
+                self._count("replay_hits")
+                return 200, {}, response
+            self._count("replay_misses")
+            if self.config.strict:
+                return 404, {}, {"error": {"code": 404, "message": f"No cassette entry for {key}"}}
+
+        return 200, {}, self._canned(key, payload)
+
+    def _record(self, key: str, payload: Dict[str, Any], headers: Dict[str, str]) -> tuple[int, Dict[str, str], Dict[str, Any]]:
+        response = httpx.post(
+            self.config.upstream_url,
+            # Cassettes hold whole responses; streaming is re-created on replay
+            json={k: v for k, v in payload.items() if k != "stream"},
+            headers={"Authorization": headers.get("Authorization", "")},
+            timeout=180,
+        )
+        body = response.json()
+        if response.status_code == 200 and self.config.cassette is not None:
+            entry = {"key": key, "model": payload.get("model"), "response": body}
+            with self._lock, self.config.cassette.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._count("recorded")
+        return response.status_code, {}, body
+
+    def _canned(self, key: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        text = _message_text(payload)
+        response_format = payload.get("response_format") or {}
+
+        if response_format.get("type") == "json_schema":
+            data = sample_from_schema(response_format["json_schema"]["schema"])
+        else:
+            model = _guess_model(text) if response_format or "JSON" in text else None
+            data = sample_from_schema(model.model_json_schema()) if model else None
+
+        if data is not None:
+            if "is_done" in data:
+                match = re.search(r"Current iteration:\s*(\d+)", text)
+                data["is_done"] = bool(match) and int(match.group(1)) >= self.config.done_after
+            content = json.dumps(data)
+            if self.config.malformed and self._roll(key, "malformed") < self.config.malformed:
+                self._count("malformed")
+                content = content[: len(content) // 2]
+        elif "**STATUS:**" in text:
+            content = CANNED_CRITIQUE
+        elif "<blackboard>" in text or "<proposed_problem>" in text:
+            content = CANNED_BLACKBOARD
+        else:
+            content = CANNED_SUMMARY
+
+        return {
+            "id": f"mock-{key[:16]}",
+            "object": "chat.completion",
+            "model": payload.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": self._usage(payload, content),
+        }
+
+    def _usage(self, payload: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Token usage, treating cache_control parts seen before as cache hits."""
+        cached = 0
+        for message in payload.get("messages", []):
+            parts = message.get("content")
+            if not isinstance(parts, list):
+                continue
+            for part in parts:
+                if "cache_control" not in part:
+                    continue
+                digest = hashlib.sha256(part.get("text", "").encode()).hexdigest()
+                with self._lock:
+                    hit = digest in self._prefixes
+                    self._prefixes.add(digest)
+                if hit:
+                    cached += estimate_tokens(part.get("text", ""))
+        prompt_tokens = estimate_message_tokens(payload.get("messages", []))
+        completion_tokens = estimate_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += n
+
+
+def _handler(mock: MockOpenRouter) -> Type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length)
+            if self.path != COMPLETIONS_PATH:
+                self._send(404, {}, {"error": {"code": 404, "message": f"Unknown path {self.path}"}})
+                return
+            try:
+                payload = json.loads(raw)
+            except json.JSONDecodeError:
+                self._send(400, {}, {"error": {"code": 400, "message": "Request body is not JSON"}})
+                return
+            status, headers, body = mock.complete(payload, dict(self.headers))
+            if payload.get("stream") and status == 200:
+                self._send_events(body)
+            else:
+                self._send(status, headers, body)
+
+        def do_GET(self):
+            if self.path.startswith(EPRINT_PATH):
+                arxiv_id = self.path[len(EPRINT_PATH):]
+                data = synthetic_eprint(arxiv_id, mock.config.paper_sections)
+                validators = {"ETag": f'"{hashlib.sha256(data).hexdigest()[:16]}"', "Last-Modified": EPRINT_LAST_MODIFIED}
+                # If-None-Match wins over If-Modified-Since when both are sent
+                if_none_match = self.headers.get("If-None-Match")
+                if (if_none_match == validators["ETag"] if if_none_match is not None
+                        else self.headers.get("If-Modified-Since") == EPRINT_LAST_MODIFIED):
+                    mock._count("eprints_not_modified")
+                    self._send_bytes(304, b"", "application/gzip", validators)
+                    return
+                mock._count("eprints")
+                self._send_bytes(200, data, "application/gzip", validators)
+            elif self.path == "/stats":
+                with mock._lock:
+                    stats = dict(mock.stats)
+                self._send(200, {}, stats)
+            else:
+                self._send(404, {}, {"error": {"code": 404, "message": f"Unknown path {self.path}"}})
+
+        def _send(self, status: int, headers: Dict[str, str], body: Dict[str, Any]):
+            self._send_bytes(status, json.dumps(body).encode("utf-8"), "application/json", headers)
+
+        def _send_events(self, body: Dict[str, Any]):
+            """Answer a ``"stream": true`` request as server-sent events."""
+            mock._count("streamed")
+            content = body["choices"][0]["message"]["content"]
+            events = [b": OPENROUTER PROCESSING\n\n"]
+            for i in range(0, len(content), STREAM_CHUNK_CHARS):
+                chunk = {"choices": [{"index": 0, "delta": {"content": content[i:i + STREAM_CHUNK_CHARS]}}]}
+                events.append(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            final = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": body.get("usage")}
+            events.append(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+            events.append(b"data: [DONE]\n\n")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Content-Length", str(sum(len(e) for e in events)))
+            self.end_headers()
+            for event in events:
+                self.wfile.write(event)
+                self.wfile.flush()
+
+        def _send_bytes(self, status: int, data: bytes, content_type: str, headers: Dict[str, str] | None = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_mock_server(config: MockConfig | None = None, host: str = "127.0.0.1", port: int = 0) -> MockOpenRouter:
+    """Start the stand-in on a background thread (port 0 = any free port)."""
+    mock = MockOpenRouter(config or MockConfig())
+    mock.server = ThreadingHTTPServer((host, port), _handler(mock))
+    mock.server.daemon_threads = True
+    threading.Thread(target=mock.server.serve_forever, daemon=True).start()
+    return mock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of latency jitter")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability of a 429")
+    parser.add_argument("--malformed", type=float, default=0.0, help="probability of truncated JSON")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-json-schema", action="store_true", help="reject json_schema requests with 400")
+    parser.add_argument("--done-after", type=int, default=1, help="Phase 2 iteration that is accepted")
+    parser.add_argument("--mode", choices=["canned", "record", "replay"], default="canned")
+    parser.add_argument("--cassette", type=Path)
+    parser.add_argument("--strict", action="store_true", help="replay: 404 on cassette misses")
+    parser.add_argument("--upstream", default=UPSTREAM_URL)
+    parser.add_argument("--sections", type=int, default=8, help="sections in the synthetic e-print")
+    args = parser.parse_args()
+
+    if args.mode in ("record", "replay") and args.cassette is None:
+        parser.error(f"--mode {args.mode} needs --cassette")
+
+    mock = start_mock_server(MockConfig(
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        malformed=args.malformed,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        reject_json_schema=args.no_json_schema,
+        done_after=args.done_after,
+        mode=args.mode,
+        cassette=args.cassette,
+        strict=args.strict,
+        upstream_url=args.upstream,
+        paper_sections=args.sections,
+    ), args.host, args.port)
+
+    print(f"Mock OpenRouter ({args.mode}) listening on {mock.base_url}")
+    print(f"  export OPENROUTER_API_URL={mock.url}")
+    print(f"  export ARXIV_EPRINT_URL={mock.eprint_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.shutdown()
+        print(f"Stats: {dict(mock.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Message assembly for the Phase 1 nodes that carry the paper.
+
+The summarizer, critic and revision nodes all send the flattened LaTeX. How
+it is sent is controlled by PHASE1_PAPER_MODE:
+- "cached" (default): the paper opens the system message as a cacheable
+  prefix that is byte-identical across nodes and revision rounds, so
+  providers with prompt caching bill it in full only once
+- "sections": critic and revision rounds get only the sections most
+  relevant to the summary/critique, within PHASE1_PAPER_TOKEN_BUDGET
+- "full": the original layout, paper and task in one user message
+"""
+
+import os
+from typing import Any, Dict, List
+
+from prompts.phase1 import PAPER_INPUT_BLOCK
+from utils.prompt_budget import cached_text_part, select_relevant_sections
+
+PAPER_MODES = ("cached", "sections", "full")
+DEFAULT_PAPER_TOKEN_BUDGET = 30_000
+
+
+def paper_mode() -> str:
+    mode = os.getenv("PHASE1_PAPER_MODE", "cached").lower()
+    if mode not in PAPER_MODES:
+        raise ValueError(f"PHASE1_PAPER_MODE must be one of {PAPER_MODES}, got {mode!r}")
+    return mode
+
+
+def paper_messages(
+    system_prompt: str,
+    task_prompt: str,
+    tex: str,
+    query: str | None = None,
+    **task_inputs: str,
+) -> List[Dict[str, Any]]:
+    """
+    Build the messages for a prompt of the form PAPER_INPUT_BLOCK + task_prompt.
+
+    ``query`` is the text the round is about (the summary for the critic,
+    the critique for a revision); when given in "sections" mode only the
+    matching sections of the paper are sent.
+    """
+    mode = paper_mode()
+    task = task_prompt.format(**task_inputs)
+
+    if mode == "sections" and query is not None:
+        budget = int(os.getenv("PHASE1_PAPER_TOKEN_BUDGET", str(DEFAULT_PAPER_TOKEN_BUDGET)))
+        tex = select_relevant_sections(tex, query, budget)
+        mode = "full"
+
+    if mode == "full":
+        return [
+            {"role": "system", "content": system_prompt.strip()},
+            {"role": "user", "content": PAPER_INPUT_BLOCK.format(input_paper=tex) + task},
+        ]
+
+    return [
+        {
+            "role": "system",
+            "content": [
+                cached_text_part(PAPER_INPUT_BLOCK.format(input_paper=tex)),
+                {"type": "text", "text": system_prompt.strip()},
+            ],
+        },
+        {"role": "user", "content": task},
+    ]
@@ -5,10 +5,12 @@ from pathlib import Path
 
 from prompts.phase1 import (
     SUMMARIZER_CRITIC_SYSTEM_PROMPT,
-    SUMMARIZER_CRITIC_USER_PROMPT,
+    SUMMARIZER_CRITIC_TASK_PROMPT,
 )
 from schema.phase1 import GraphState
 from utils.openrouter import call_openrouter
+from utils.usage import usage_label
+from ._paper_prompt import paper_messages
 
 # Project root directory (outside src/)
 BASE_DIR = Path(__file__).resolve().parents[3]
@@ -22,21 +24,16 @@ def critic_node(state: GraphState) -> GraphState:
     """
     iteration = state.get("iteration", 1)
 
-    messages = [
-        {
-            "role": "system",
-            "content": SUMMARIZER_CRITIC_SYSTEM_PROMPT.strip(),
-        },
-        {
-            "role": "user",
-            "content": SUMMARIZER_CRITIC_USER_PROMPT.format(
-                input_paper=state["tex"],
-                summary=state["summary"],
-            ),
-        },
-    ]
+    messages = paper_messages(
+        SUMMARIZER_CRITIC_SYSTEM_PROMPT,
+        SUMMARIZER_CRITIC_TASK_PROMPT,
+        state["tex"],
+        query=state["summary"],
+        summary=state["summary"],
+    )
 
-    critique_response = call_openrouter(messages, temperature=0.0)
+    with usage_label(f"phase1.round{iteration}.critic"):
+        critique_response = call_openrouter(messages, temperature=0.0)
 
     # Parse the status from the critique response
     # Look for **STATUS:** PASS or **STATUS:** NEEDS_REVISION
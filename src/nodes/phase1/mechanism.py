@@ -8,6 +8,7 @@ from prompts.phase1 import (
 )
 from schema.phase1 import GraphState
 from utils.openrouter import call_openrouter
+from utils.usage import usage_label
 
 # Project root directory (outside src/)
 BASE_DIR = Path(__file__).resolve().parents[3]
@@ -33,7 +34,8 @@ def mechanism_node(state: GraphState) -> GraphState:
         },
     ]
 
-    mechanism_xml = call_openrouter(messages, temperature=0.0)
+    with usage_label(f"phase1.round{state.get('iteration', 1)}.mechanism"):
+        mechanism_xml = call_openrouter(messages, temperature=0.0)
 
     # Save mechanism to papers/{arxiv_id}/step3_mechanism/mechanism.xml
     paper_id = state["arxiv_id"]
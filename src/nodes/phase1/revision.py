@@ -4,10 +4,13 @@ from pathlib import Path
 
 from prompts.phase1 import (
     CONTEXT_EXTRACTOR_REVISION_SYSTEM_PROMPT,
-    CONTEXT_EXTRACTOR_REVISION_USER_PROMPT,
+    CONTEXT_EXTRACTOR_REVISION_TASK_PROMPT,
 )
 from schema.phase1 import GraphState
 from utils.openrouter import call_openrouter
+from utils.streaming import progress_writer
+from utils.usage import usage_label
+from ._paper_prompt import paper_messages
 
 # Project root directory (outside src/)
 BASE_DIR = Path(__file__).resolve().parents[3]
@@ -18,26 +21,21 @@ def revision_node(state: GraphState) -> GraphState:
     """
     Revises the summary based on the critique from the critic node.
     """
-    messages = [
-        {
-            "role": "system",
-            "content": CONTEXT_EXTRACTOR_REVISION_SYSTEM_PROMPT.strip(),
-        },
-        {
-            "role": "user",
-            "content": CONTEXT_EXTRACTOR_REVISION_USER_PROMPT.format(
-                input_paper=state["tex"],
-                previous_summary=state["summary"],
-                expert_critique=state["critique"],
-            ),
-        },
-    ]
-
-    revised_summary = call_openrouter(messages, temperature=0.4)
+    messages = paper_messages(
+        CONTEXT_EXTRACTOR_REVISION_SYSTEM_PROMPT,
+        CONTEXT_EXTRACTOR_REVISION_TASK_PROMPT,
+        state["tex"],
+        query=state["critique"],
+        previous_summary=state["summary"],
+        expert_critique=state["critique"],
+    )
 
     # Increment iteration for the new summary
     new_iteration = state.get("iteration", 1) + 1
 
+    with usage_label(f"phase1.round{new_iteration}.revision"):
+        revised_summary = call_openrouter(messages, temperature=0.4, on_delta=progress_writer("revision"))
+
     # Save revised summary to papers/{arxiv_id}/step2_summary/iteration_X.md
     paper_id = state["arxiv_id"]
     summary_dir = PAPERS_DIR / paper_id / "step2_summary"
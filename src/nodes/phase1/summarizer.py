@@ -4,10 +4,13 @@ from pathlib import Path
 
 from prompts.phase1 import (
     CONTEXT_EXTRACTOR_SYSTEM_PROMPT,
-    CONTEXT_EXTRACTOR_USER_PROMPT,
+    CONTEXT_EXTRACTOR_TASK_PROMPT,
 )
 from schema.phase1 import GraphState
 from utils.openrouter import call_openrouter
+from utils.streaming import progress_writer
+from utils.usage import usage_label
+from ._paper_prompt import paper_messages
 
 # Project root directory (outside src/)
 BASE_DIR = Path(__file__).resolve().parents[3]
@@ -16,24 +19,18 @@ PAPERS_DIR = BASE_DIR / "papers"
 
 def summarizer_node(state: GraphState) -> GraphState:
     """Generate initial summary (iteration 1)."""
-    messages = [
-        {
-            "role": "system",
-            "content": CONTEXT_EXTRACTOR_SYSTEM_PROMPT.strip(),
-        },
-        {
-            "role": "user",
-            "content": CONTEXT_EXTRACTOR_USER_PROMPT.format(
-                input_paper=state["tex"]
-            ),
-        },
-    ]
-
-    summary = call_openrouter(messages, temperature=0.1)
+    messages = paper_messages(
+        CONTEXT_EXTRACTOR_SYSTEM_PROMPT,
+        CONTEXT_EXTRACTOR_TASK_PROMPT,
+        state["tex"],
+    )
 
     paper_id = state["arxiv_id"]
     iteration = state.get("iteration", 1)
 
+    with usage_label(f"phase1.round{iteration}.summarizer"):
+        summary = call_openrouter(messages, temperature=0.1, on_delta=progress_writer("summarize"))
+
     # Save summary to papers/{arxiv_id}/step2_summary/iteration_1.md
     summary_dir = PAPERS_DIR / paper_id / "step2_summary"
     summary_dir.mkdir(parents=True, exist_ok=True)
@@ -1,18 +1,22 @@
-"""Phase 2 Nodes: Open Problem Formulation workflow."""
+"""Phase 2 Nodes: Open Problem Formulation workflow.
 
-from .context_ingestion import context_ingestion_node
-from .agenda_creator import agenda_creator_node
-from .brainstormer import brainstormer_node
-from .sanity_checker import sanity_checker_node
-from .example_tester import example_tester_node
-from .reverse_reasoner import reverse_reasoner_node
-from .obstruction_analyzer import obstruction_analyzer_node
-from .feedback_consolidator import feedback_consolidator_node
-from .done_decision import done_decision_node
-from .report_generator import report_generator_node
-from .mechanism_updater import mechanism_updater_node
-from .final_judge import final_judge_node
-from .quality_score import quality_score_node
+Every node has an ``async def`` twin with an ``a`` prefix (e.g.
+``asanity_checker_node``) for graphs driven with ``ainvoke``.
+"""
+
+from .context_ingestion import context_ingestion_node, acontext_ingestion_node
+from .agenda_creator import agenda_creator_node, aagenda_creator_node
+from .brainstormer import brainstormer_node, abrainstormer_node
+from .sanity_checker import sanity_checker_node, asanity_checker_node
+from .example_tester import example_tester_node, aexample_tester_node
+from .reverse_reasoner import reverse_reasoner_node, areverse_reasoner_node
+from .obstruction_analyzer import obstruction_analyzer_node, aobstruction_analyzer_node
+from .feedback_consolidator import feedback_consolidator_node, afeedback_consolidator_node
+from .done_decision import done_decision_node, adone_decision_node
+from .report_generator import report_generator_node, areport_generator_node
+from .mechanism_updater import mechanism_updater_node, amechanism_updater_node
+from .final_judge import final_judge_node, afinal_judge_node
+from .quality_score import quality_score_node, aquality_score_node
 
 __all__ = [
     "context_ingestion_node",
@@ -28,4 +32,18 @@ __all__ = [
     "mechanism_updater_node",
     "final_judge_node",
     "quality_score_node",
+    # Async variants
+    "acontext_ingestion_node",
+    "aagenda_creator_node",
+    "abrainstormer_node",
+    "asanity_checker_node",
+    "aexample_tester_node",
+    "areverse_reasoner_node",
+    "aobstruction_analyzer_node",
+    "afeedback_consolidator_node",
+    "adone_decision_node",
+    "areport_generator_node",
+    "amechanism_updater_node",
+    "afinal_judge_node",
+    "aquality_score_node",
 ]
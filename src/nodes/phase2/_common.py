@@ -1,16 +1,23 @@
 """Common utilities for Phase 2 nodes."""
 
+import asyncio
 import os
-import json
 import re
 import time
-import requests
 from pathlib import Path
 from typing import Any, Dict, Type, TypeVar
 
+import httpx
 from dotenv import find_dotenv, load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+
+from prompts.phase2 import SHARED_CONTEXT_PROMPT, SHARED_CONTEXT_REFERENCE
+from utils.json_extract import extract_json
+from utils.openrouter import arequest_completion, is_rate_limited, request_completion
+from utils.prompt_budget import cached_text_part
+from utils.usage import current_label, usage_label
+from ._strategies import get_strategy_registry
 
 # Load environment variables
 dotenv_path = find_dotenv()
@@ -24,7 +31,10 @@ OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 # MODEL_NAME = "anthropic/claude-3.5-sonnet"         # Best quality, ~$3/1M tokens
 # MODEL_NAME = "openai/gpt-4o-mini"                  # Good balance, ~$0.15/1M tokens
 MODEL_NAME = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-001")
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Send summary + mechanisms once as a shared, cacheable prefix (set to 0 to inline them)
+SHARED_PREFIX = os.getenv("PHASE2_SHARED_PREFIX", "1") != "0"
+SHARED_CONTEXT_KEYS = ("paper_summary", "mechanisms")
 
 # Project paths
 BASE_DIR = Path(__file__).resolve().parents[3]
@@ -33,83 +43,12 @@ PAPERS_DIR = BASE_DIR / "papers"
 T = TypeVar('T', bound=BaseModel)
 
 
-def try_parse_json(json_str: str) -> dict | None:
-    """Try various strategies to parse JSON with potential escape issues."""
-
-    # Strategy 1: Parse as-is
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError:
-        pass
-
-    # Strategy 2: Escape single backslashes followed by letters (LaTeX commands)
-    # \alpha -> \\alpha, but \\alpha stays as \\alpha
-    try:
-        # Only escape single backslashes (not already escaped)
-        fixed = re.sub(r'(?<!\\)\\([a-zA-Z])', r'\\\\' + r'\1', json_str)
-        return json.loads(fixed)
-    except json.JSONDecodeError:
-        pass
-
-    # Strategy 3: Replace all backslashes with forward slashes (lose the math but get the structure)
-    try:
-        fixed = json_str.replace('\\', '/')
-        return json.loads(fixed)
-    except json.JSONDecodeError:
-        pass
-
-    # Strategy 4: Remove all backslashes
-    try:
-        fixed = json_str.replace('\\', '')
-        return json.loads(fixed)
-    except json.JSONDecodeError:
-        pass
-
-    return None
-
-
 def extract_json_from_response(response_text: str) -> dict | None:
-    """Extract and parse JSON from model response, handling various formats."""
-
-    # Try different patterns to find JSON
-    patterns = [
-        r'```json\s*([\s\S]*?)\s*```',  # ```json ... ```
-        r'```\s*([\s\S]*?)\s*```',       # ``` ... ```
-        r'(\{[\s\S]*\})',                 # Raw JSON object
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, response_text)
-        if match:
-            json_str = match.group(1) if '```' in pattern else match.group(0)
-
-            # Try parsing with various escape handling strategies
-            result = try_parse_json(json_str)
-            if result:
-                return result
-
-    # Last resort: try to find any {...} and parse more aggressively
-    json_match = re.search(r'\{[\s\S]*\}', response_text)
-    if json_match:
-        json_str = json_match.group(0)
-        # Replace LaTeX commands with placeholders before parsing
-        cleaned = re.sub(r'\\([a-zA-Z]+)', r'LATEX_\1', json_str)
-        result = try_parse_json(cleaned)
-        if result:
-            return result
+    """Extract and parse JSON from model response, repairing unescaped LaTeX (see utils.json_extract)."""
+    return extract_json(response_text)
 
-    return None
-
-
-def call_openrouter_direct(
-    messages: list,
-    temperature: float = 0.0,
-    json_schema: dict | None = None,
-) -> str:
-    """Call OpenRouter API directly with optional JSON schema enforcement."""
-    if not OPENROUTER_API_KEY:
-        raise RuntimeError("OPENROUTER_API_KEY not set")
 
+def _schema_payload(messages: list, temperature: float, json_schema: dict | None) -> dict:
     payload = {
         "model": MODEL_NAME,
         "messages": messages,
@@ -127,43 +66,235 @@ def call_openrouter_direct(
                 "schema": json_schema,
             }
         }
+    return payload
 
-    response = requests.post(
-        OPENROUTER_API_URL,
-        headers={
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-        },
-        json=payload,
-        timeout=180,
+
+def _json_mode_payload(messages: list, temperature: float) -> dict:
+    return {
+        "model": MODEL_NAME,
+        "messages": messages,
+        "temperature": temperature,
+        "response_format": {"type": "json_object"},
+    }
+
+
+def call_openrouter_direct(
+    messages: list,
+    temperature: float = 0.0,
+    json_schema: dict | None = None,
+    refresh_cache: bool = False,
+) -> str:
+    """Call OpenRouter API directly with optional JSON schema enforcement."""
+    if not OPENROUTER_API_KEY:
+        raise RuntimeError("OPENROUTER_API_KEY not set")
+
+    return request_completion(
+        _schema_payload(messages, temperature, json_schema),
+        api_key=OPENROUTER_API_KEY,
+        refresh_cache=refresh_cache,
     )
 
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"]
 
+async def acall_openrouter_direct(
+    messages: list,
+    temperature: float = 0.0,
+    json_schema: dict | None = None,
+    refresh_cache: bool = False,
+) -> str:
+    """Async counterpart of call_openrouter_direct."""
+    if not OPENROUTER_API_KEY:
+        raise RuntimeError("OPENROUTER_API_KEY not set")
+
+    return await arequest_completion(
+        _schema_payload(messages, temperature, json_schema),
+        api_key=OPENROUTER_API_KEY,
+        refresh_cache=refresh_cache,
+    )
 
-def call_openrouter_json_mode(messages: list, temperature: float = 0.0) -> str:
+
+def call_openrouter_json_mode(
+    messages: list,
+    temperature: float = 0.0,
+    refresh_cache: bool = False,
+) -> str:
     """Call OpenRouter with basic JSON mode (simpler, more compatible)."""
     if not OPENROUTER_API_KEY:
         raise RuntimeError("OPENROUTER_API_KEY not set")
 
-    response = requests.post(
-        OPENROUTER_API_URL,
-        headers={
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-        },
-        json={
-            "model": MODEL_NAME,
-            "messages": messages,
-            "temperature": temperature,
-            "response_format": {"type": "json_object"},
-        },
-        timeout=180,
+    return request_completion(
+        _json_mode_payload(messages, temperature),
+        api_key=OPENROUTER_API_KEY,
+        refresh_cache=refresh_cache,
+    )
+
+
+async def acall_openrouter_json_mode(
+    messages: list,
+    temperature: float = 0.0,
+    refresh_cache: bool = False,
+) -> str:
+    """Async counterpart of call_openrouter_json_mode."""
+    if not OPENROUTER_API_KEY:
+        raise RuntimeError("OPENROUTER_API_KEY not set")
+
+    return await arequest_completion(
+        _json_mode_payload(messages, temperature),
+        api_key=OPENROUTER_API_KEY,
+        refresh_cache=refresh_cache,
+    )
+
+
+def to_openrouter_messages(prompt: ChatPromptTemplate, inputs: Dict[str, Any]) -> list:
+    """
+    Format a chat prompt and convert it to OpenRouter message dicts.
+
+    When the inputs carry the paper summary and mechanisms, they are moved
+    into a shared context block at the very start of the system message, so
+    every Phase 2 call on a paper begins with the same bytes and providers
+    can serve that prefix from their prompt cache. The node prompt keeps a
+    short reference in their place.
+    """
+    shared = SHARED_PREFIX and all(key in inputs for key in SHARED_CONTEXT_KEYS)
+    if shared:
+        context = SHARED_CONTEXT_PROMPT.format(**{key: inputs[key] for key in SHARED_CONTEXT_KEYS})
+        inputs = {**inputs, **{key: SHARED_CONTEXT_REFERENCE for key in SHARED_CONTEXT_KEYS}}
+
+    messages = []
+    for msg in prompt.format_messages(**inputs):
+        role = "user" if msg.type == "human" else msg.type
+        messages.append({"role": role, "content": msg.content})
+
+    if shared:
+        if messages and messages[0]["role"] == "system":
+            system_text = messages.pop(0)["content"]
+            parts = [cached_text_part(context), {"type": "text", "text": system_text}]
+        else:
+            parts = [cached_text_part(context)]
+        messages.insert(0, {"role": "system", "content": parts})
+    return messages
+
+
+def _usage_label(output_class: Type[BaseModel]) -> str:
+    """Label for usage accounting; callers may already have set a finer one."""
+    label = current_label()
+    return label if label != "unlabeled" else f"phase2.{output_class.__name__}"
+
+
+def _parse_structured(response_text: str, output_class: Type[T]) -> T | None:
+    """Parse a response into output_class; None if no JSON was found."""
+    data = extract_json_from_response(response_text)
+    if data:
+        return output_class.model_validate(data)
+    return None
+
+
+def _error_text(error: Exception) -> str:
+    """Error message plus, for HTTP errors, the provider's response body."""
+    text = str(error)
+    if isinstance(error, httpx.HTTPStatusError):
+        text += " " + error.response.text
+    return text
+
+
+def _schema_unsupported(error: Exception) -> bool:
+    # A 400 only, like _json_mode_unsupported: a 5xx body echoing the request is no verdict
+    if not (isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 400):
+        return False
+    text = _error_text(error)
+    return "response_format" in text or "json_schema" in text
+
+
+# What a provider says when it rejects JSON mode itself (not just any error body mentioning JSON)
+JSON_MODE_UNSUPPORTED_RE = re.compile(
+    r"(?:response_format|json[ _-]?(?:mode|object))\b.{0,40}\b(?:not|un)[ -]?supported", re.IGNORECASE
+)
+
+
+def _json_mode_unsupported(error: Exception) -> bool:
+    # A 400 only: the verdict is remembered for STRUCTURED_OUTPUT_REPROBE_DAYS
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and error.response.status_code == 400
+        and JSON_MODE_UNSUPPORTED_RE.search(_error_text(error)) is not None
     )
 
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"]
+
+def _strategy_unsupported(strategy: str, error: Exception) -> bool:
+    if strategy == "json_schema":
+        return _schema_unsupported(error)
+    if strategy == "json_object":
+        return _json_mode_unsupported(error)
+    return False
+
+
+def _retry_delay(error: Exception, delay: float) -> float:
+    """No extra sleep after a 429: the shared rate limiter already holds the next call."""
+    return 0.0 if is_rate_limited(error) else delay
+
+
+def _fallback_messages(messages: list, schema: dict) -> list:
+    """Append explicit JSON instructions to the last message (prompt fallback)."""
+    required_fields = schema.get("required", [])
+
+    json_instruction = f"""
+
+CRITICAL: You MUST respond with ONLY a valid JSON object. No other text.
+
+Required fields:
+{chr(10).join(f'- {f}' for f in required_fields)}
+
+Output ONLY valid JSON, nothing else."""
+
+    messages = [dict(m) for m in messages]
+    messages[-1]["content"] += json_instruction
+    return messages
+
+
+def _prompt_payload(messages: list, temperature: float) -> dict:
+    return {
+        "model": MODEL_NAME,
+        "messages": messages,
+        "temperature": temperature,
+    }
+
+
+STRATEGY_NAMES = {
+    "json_schema": "JSON schema mode",
+    "json_object": "JSON object mode",
+    "prompt": "prompt engineering fallback",
+}
+
+
+def _strategy_payload(strategy: str, messages: list, temperature: float, schema: dict) -> dict:
+    if strategy == "json_schema":
+        return _schema_payload(messages, temperature, schema)
+    if strategy == "json_object":
+        return _json_mode_payload(messages, temperature)
+    return _prompt_payload(_fallback_messages(messages, schema), temperature)
+
+
+def _strategy_retry_delay(strategy: str, error: Exception, retry_delay: float, attempt: int) -> float:
+    # The prompt fallback backs off linearly; the JSON modes use a fixed delay
+    # for errors and re-ask at once after an unparseable answer
+    if strategy == "prompt":
+        return _retry_delay(error, retry_delay * (attempt + 1))
+    if isinstance(error, _UnparseableResponse):
+        return 0.0
+    return _retry_delay(error, retry_delay)
+
+
+class _UnparseableResponse(ValueError):
+    """The model answered, but not with JSON matching the output class."""
+
+
+def _parse_or_raise(response_text: str, output_class: Type[T]) -> T:
+    try:
+        result = _parse_structured(response_text, output_class)
+    except ValidationError as e:
+        raise _UnparseableResponse(f"Response does not match {output_class.__name__}: {e}") from e
+    if result is None:
+        raise _UnparseableResponse("No valid JSON found in response")
+    return result
 
 
 def invoke_with_structured_output(
@@ -181,120 +312,117 @@ def invoke_with_structured_output(
     1. JSON schema mode (strict structured output)
     2. JSON object mode (basic JSON enforcement)
     3. Prompt engineering fallback
-    """
-    # Get the schema for the output class
-    schema = output_class.model_json_schema()
 
-    # Format the prompt messages
-    formatted_messages = prompt.format_messages(**inputs)
+    The order comes from the per-model strategy registry (see _strategies):
+    a strategy the provider rejected is skipped, and one that has worked is
+    tried first, so a model without json_schema support does not pay a
+    failed round trip on every call.
+    """
+    with usage_label(_usage_label(output_class)):
+        return _invoke_with_structured_output(
+            prompt, output_class, inputs, max_retries, retry_delay, temperature
+        )
 
-    # Convert to OpenRouter format
-    messages = []
-    for msg in formatted_messages:
-        role = "user" if msg.type == "human" else msg.type
-        if role == "human":
-            role = "user"
-        messages.append({"role": role, "content": msg.content})
 
-    # Strategy 1: Try with JSON schema (strict mode)
-    print(f"  Trying JSON schema mode...")
-    for attempt in range(max_retries):
-        try:
-            response_text = call_openrouter_direct(
-                messages, temperature=temperature, json_schema=schema
-            )
-            data = extract_json_from_response(response_text)
-            if data:
-                return output_class.model_validate(data)
-        except requests.exceptions.RequestException as e:
-            if "response_format" in str(e) or "json_schema" in str(e):
-                print(f"  JSON schema not supported, trying JSON mode...")
-                break
-            print(f"  Schema attempt {attempt + 1} failed: {str(e)[:60]}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-        except Exception as e:
-            if "response_format" in str(e) or "json_schema" in str(e):
-                print(f"  JSON schema not supported, trying JSON mode...")
-                break
-            print(f"  Schema attempt {attempt + 1} failed: {str(e)[:60]}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-
-    # Strategy 2: Try with basic JSON mode
-    print(f"  Trying JSON object mode...")
-    for attempt in range(max_retries):
-        try:
-            response_text = call_openrouter_json_mode(messages, temperature=temperature)
-            data = extract_json_from_response(response_text)
-            if data:
-                return output_class.model_validate(data)
-        except requests.exceptions.RequestException as e:
-            if "response_format" in str(e) or "json" in str(e).lower():
-                print(f"  JSON mode not supported, trying prompt fallback...")
-                break
-            print(f"  JSON mode attempt {attempt + 1} failed: {str(e)[:60]}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-        except Exception as e:
-            print(f"  JSON mode attempt {attempt + 1} failed: {str(e)[:60]}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-
-    # Strategy 3: Prompt engineering fallback
-    print(f"  Trying prompt engineering fallback...")
-    required_fields = schema.get("required", [])
-    properties = schema.get("properties", {})
-
-    field_descriptions = []
-    for field_name, field_info in properties.items():
-        field_type = field_info.get("type", "string")
-        desc = field_info.get("description", "")
-        if field_type == "array":
-            field_type = "list of strings"
-        field_descriptions.append(f'  - "{field_name}": ({field_type}) {desc}')
+def _invoke_with_structured_output(
+    prompt: ChatPromptTemplate,
+    output_class: Type[T],
+    inputs: Dict[str, Any],
+    max_retries: int,
+    retry_delay: float,
+    temperature: float,
+) -> T:
+    # Get the schema for the output class
+    schema = output_class.model_json_schema()
+    messages = to_openrouter_messages(prompt, inputs)
+    registry = get_strategy_registry()
+
+    for strategy in registry.order(MODEL_NAME):
+        print(f"  Trying {STRATEGY_NAMES[strategy]}...")
+        payload = _strategy_payload(strategy, messages, temperature, schema)
+        for attempt in range(max_retries):
+            try:
+                # A retry means the previous (possibly cached) answer was unusable
+                response_text = request_completion(
+                    payload,
+                    api_key=OPENROUTER_API_KEY,
+                    refresh_cache=attempt > 0,
+                )
+                result = _parse_or_raise(response_text, output_class)
+                registry.record_success(MODEL_NAME, strategy)
+                return result
+            except Exception as e:
+                if _strategy_unsupported(strategy, e):
+                    print(f"  {STRATEGY_NAMES[strategy]} not supported, falling back...")
+                    registry.record_unsupported(MODEL_NAME, strategy)
+                    break
+                if isinstance(e, _UnparseableResponse):
+                    registry.record_parse_failure(MODEL_NAME, strategy)
+                print(f"  {STRATEGY_NAMES[strategy]} attempt {attempt + 1} failed: {str(e)[:80]}")
+                if attempt < max_retries - 1:
+                    time.sleep(_strategy_retry_delay(strategy, e, retry_delay, attempt))
 
-    json_instruction = f"""
+    # Last resort: return a default/empty result
+    print("  WARNING: All strategies failed, returning default values")
+    return create_default_result(output_class)
 
-CRITICAL: You MUST respond with ONLY a valid JSON object. No other text.
 
-Required fields:
-{chr(10).join(f'- {f}' for f in required_fields)}
-
-Output ONLY valid JSON, nothing else."""
+async def ainvoke_with_structured_output(
+    prompt: ChatPromptTemplate,
+    output_class: Type[T],
+    inputs: Dict[str, Any],
+    max_retries: int = 3,
+    retry_delay: float = 2.0,
+    temperature: float = 0.0,
+) -> T:
+    """
+    Async counterpart of invoke_with_structured_output.
 
-    messages[-1]["content"] += json_instruction
+    Same strategies, registry and retry policy, but awaits the shared async
+    client and sleeps with asyncio so no thread is blocked per call.
+    """
+    with usage_label(_usage_label(output_class)):
+        return await _ainvoke_with_structured_output(
+            prompt, output_class, inputs, max_retries, retry_delay, temperature
+        )
 
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(
-                OPENROUTER_API_URL,
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": MODEL_NAME,
-                    "messages": messages,
-                    "temperature": temperature,
-                },
-                timeout=180,
-            )
-            response.raise_for_status()
-            response_text = response.json()["choices"][0]["message"]["content"]
-
-            data = extract_json_from_response(response_text)
-            if data:
-                return output_class.model_validate(data)
-            else:
-                raise ValueError("No valid JSON found in response")
 
-        except Exception as e:
-            print(f"  Fallback attempt {attempt + 1} failed: {str(e)[:80]}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay * (attempt + 1))
+async def _ainvoke_with_structured_output(
+    prompt: ChatPromptTemplate,
+    output_class: Type[T],
+    inputs: Dict[str, Any],
+    max_retries: int,
+    retry_delay: float,
+    temperature: float,
+) -> T:
+    schema = output_class.model_json_schema()
+    messages = to_openrouter_messages(prompt, inputs)
+    registry = get_strategy_registry()
+
+    for strategy in registry.order(MODEL_NAME):
+        print(f"  Trying {STRATEGY_NAMES[strategy]}...")
+        payload = _strategy_payload(strategy, messages, temperature, schema)
+        for attempt in range(max_retries):
+            try:
+                response_text = await arequest_completion(
+                    payload,
+                    api_key=OPENROUTER_API_KEY,
+                    refresh_cache=attempt > 0,
+                )
+                result = _parse_or_raise(response_text, output_class)
+                registry.record_success(MODEL_NAME, strategy)
+                return result
+            except Exception as e:
+                if _strategy_unsupported(strategy, e):
+                    print(f"  {STRATEGY_NAMES[strategy]} not supported, falling back...")
+                    registry.record_unsupported(MODEL_NAME, strategy)
+                    break
+                if isinstance(e, _UnparseableResponse):
+                    registry.record_parse_failure(MODEL_NAME, strategy)
+                print(f"  {STRATEGY_NAMES[strategy]} attempt {attempt + 1} failed: {str(e)[:80]}")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(_strategy_retry_delay(strategy, e, retry_delay, attempt))
 
-    # Last resort: return a default/empty result
     print("  WARNING: All strategies failed, returning default values")
     return create_default_result(output_class)
 
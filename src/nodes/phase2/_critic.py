@@ -0,0 +1,91 @@
+"""Shared plumbing for the four parallel critic nodes (Phase 2, Node 3.2)."""
+
+from typing import Any, Dict
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from prompts.phase2 import CRITIC_SYSTEM
+from schema.phase2 import Phase2State, CritiqueResult, Critique
+from utils.artifacts import Artifact, register_renderer, save_artifacts
+
+
+def critique_request(
+    state: Phase2State,
+    critic_prompt: str,
+    temperature: float = 0.0,
+) -> Dict[str, Any]:
+    """Keyword arguments for (a)invoke_with_structured_output for one critic."""
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", CRITIC_SYSTEM),
+        ("human", critic_prompt)
+    ])
+
+    return {
+        "prompt": prompt,
+        "output_class": CritiqueResult,
+        "inputs": {
+            "proposal": state["current_proposal"],
+            "paper_summary": state["summary"],
+            "mechanisms": state["mechanism"],
+        },
+        "temperature": temperature,
+    }
+
+
+@register_renderer("critique_md")
+def render_critique(data: Dict[str, Any]) -> str:
+    return f"""# {data['title']} Critique (Iteration {data['iteration']})
+
+## Summary
+{data['summary']}
+
+## Severity: {data['severity']}
+
+## Issues Found
+{chr(10).join(f'- {issue}' for issue in data['issues']) if data['issues'] else '- None'}
+
+## Strengths Identified
+{chr(10).join(f'- {s}' for s in data['strengths']) if data['strengths'] else '- None'}
+
+## Suggestions
+{chr(10).join(f'- {s}' for s in data['suggestions']) if data['suggestions'] else '- None'}
+"""
+
+
+def record_critique(
+    state: Phase2State,
+    result: CritiqueResult,
+    source: str,
+    title: str,
+) -> Dict[str, Any]:
+    """Turn a critic's result into a state update and store it as a markdown artifact."""
+    print(f"{title}: Found {len(result.issues)} issues, {len(result.strengths)} strengths")
+
+    iteration = state.get("phase2_iteration", 1)
+    critique = Critique(
+        source=source,
+        iteration=iteration,
+        issues=result.issues,
+        strengths=result.strengths,
+        suggestions=result.suggestions,
+    )
+
+    # Save critique to the artifact store if arxiv_id is available
+    arxiv_id = state.get("arxiv_id")
+    proposal_num = state.get("proposal_num", 1)
+    if arxiv_id:
+        critique_path = f"step4_open_problems/proposal_{proposal_num}/critiques/iteration_{iteration}/{source}.md"
+        save_artifacts([Artifact(arxiv_id, critique_path, "critique_md", {
+            "title": title,
+            "iteration": iteration,
+            "summary": result.summary,
+            "severity": result.severity,
+            "issues": result.issues,
+            "strengths": result.strengths,
+            "suggestions": result.suggestions,
+        })])
+        print(f"  > Saved critique to {critique_path}")
+
+    return {
+        "critiques": [critique],
+    }
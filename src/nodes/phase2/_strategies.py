@@ -0,0 +1,150 @@
+"""
+Per-model memory of which structured-output strategy works.
+
+invoke_with_structured_output can ask for JSON three ways, cheapest first:
+json_schema (strict structured outputs), json_object (JSON mode) and a
+prompt-only fallback. Providers differ: some reject ``json_schema``
+outright, some accept it but return unparseable text. The registry records,
+per model and strategy, successes, parse failures and whether the provider
+rejected the strategy, and persists that to JSON so later calls (and later
+runs) start at the cheapest strategy known to work. The file is only
+rewritten when a strategy's standing changes (first success, crossing the
+failure-rate limit, rejected or accepted again), not on every call.
+
+Configuration (environment variables):
+- STRUCTURED_OUTPUT_REGISTRY   JSON file (default <project>/.cache/structured_output.json),
+                               "off" to keep the registry in memory only
+- STRUCTURED_OUTPUT_REPROBE_DAYS   retry a rejected strategy after this many days (default 7)
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BASE_DIR = Path(__file__).resolve().parents[3]
+DEFAULT_REGISTRY_PATH = BASE_DIR / ".cache" / "structured_output.json"
+
+# Cheapest first: each later strategy is a fallback for the ones before it
+STRATEGIES = ("json_schema", "json_object", "prompt")
+
+# A strategy failing to parse more often than this is tried after untested ones
+MAX_FAILURE_RATE = 0.5
+
+
+def _standing(entry: Dict[str, Any] | None) -> tuple[int, bool]:
+    """Where a strategy ranks in order() (0 proven, 1 untried, 2 unreliable) and whether it was rejected."""
+    if not entry:
+        return 1, False
+    attempts = entry["successes"] + entry["parse_failures"]
+    failure_rate = entry["parse_failures"] / attempts if attempts else 0.0
+    if entry["successes"] and failure_rate <= MAX_FAILURE_RATE:
+        rank = 0
+    else:
+        rank = 2 if attempts else 1
+    return rank, entry["unsupported_at"] is not None
+
+
+class StrategyRegistry:
+    """Thread-safe, JSON-persisted record of strategy outcomes per model."""
+
+    def __init__(self, path: Path | None = DEFAULT_REGISTRY_PATH, reprobe_days: float = 7):
+        self.path = path
+        self.reprobe_seconds = reprobe_days * 86400
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if path is not None and path.exists():
+            try:
+                self._models = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                self._models = {}
+
+    def _entry(self, model: str, strategy: str) -> Dict[str, Any]:
+        return self._models.setdefault(model, {}).setdefault(strategy, {
+            "successes": 0,
+            "parse_failures": 0,
+            "unsupported_at": None,
+        })
+
+    def order(self, model: str) -> List[str]:
+        """Strategies to try for ``model``: proven first, then untried, then unreliable."""
+        now = time.time()
+        with self._lock:
+            stats = self._models.get(model, {})
+
+            def rank(strategy: str) -> tuple[int, int]:
+                return _standing(stats.get(strategy))[0], STRATEGIES.index(strategy)
+
+            usable = [
+                s for s in STRATEGIES
+                if not (stats.get(s, {}).get("unsupported_at") or 0) > now - self.reprobe_seconds
+            ]
+        # The prompt fallback works with every model, so it is never dropped
+        if "prompt" not in usable:
+            usable.append("prompt")
+        return sorted(usable, key=rank)
+
+    def record_success(self, model: str, strategy: str) -> None:
+        with self._lock:
+            entry = self._entry(model, strategy)
+            before = _standing(entry)
+            entry["successes"] += 1
+            entry["unsupported_at"] = None
+            changed = _standing(entry) != before
+        # Counts alone go to disk with the next change
+        if changed:
+            self._save()
+
+    def record_parse_failure(self, model: str, strategy: str) -> None:
+        with self._lock:
+            entry = self._entry(model, strategy)
+            before = _standing(entry)
+            entry["parse_failures"] += 1
+            changed = _standing(entry) != before
+        if changed:
+            self._save()
+
+    def record_unsupported(self, model: str, strategy: str) -> None:
+        with self._lock:
+            self._entry(model, strategy)["unsupported_at"] = time.time()
+        self._save()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            return json.loads(json.dumps(self._models))
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            data = json.dumps(self._models, indent=2, sort_keys=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(data, encoding="utf-8")
+        tmp.replace(self.path)
+
+
+_registry: StrategyRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_strategy_registry() -> StrategyRegistry:
+    """Return the process-wide registry (configured from env on first use)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            location = os.getenv("STRUCTURED_OUTPUT_REGISTRY", str(DEFAULT_REGISTRY_PATH))
+            _registry = StrategyRegistry(
+                path=None if location.lower() == "off" else Path(location),
+                reprobe_days=float(os.getenv("STRUCTURED_OUTPUT_REPROBE_DAYS", "7")),
+            )
+        return _registry
+
+
+def set_strategy_registry(registry: StrategyRegistry | None) -> None:
+    """Install a registry explicitly (None re-reads the environment on next use)."""
+    global _registry
+    with _registry_lock:
+        _registry = registry
@@ -10,7 +10,8 @@ from prompts.phase2 import (
     BRAINSTORMER_REVISION_PROMPT,
 )
 from schema.phase2 import Phase2State, ProposalResult
-from ._common import PAPERS_DIR, invoke_with_structured_output
+from utils.artifacts import Artifact, save_artifacts
+from ._common import ainvoke_with_structured_output, invoke_with_structured_output
 
 
 def brainstormer_node(state: Phase2State) -> Dict[str, Any]:
@@ -23,6 +24,22 @@ def brainstormer_node(state: Phase2State) -> Dict[str, Any]:
     max_iterations = state.get("max_iterations", 5)
     print(f"--- Brainstormer: Generating proposal (iteration {iteration}/{max_iterations}) ---")
 
+    result = invoke_with_structured_output(**_proposal_request(state, iteration, max_iterations))
+    return _record_proposal(state, result, iteration)
+
+
+async def abrainstormer_node(state: Phase2State) -> Dict[str, Any]:
+    """Async variant of brainstormer_node."""
+    iteration = state.get("phase2_iteration", 0) + 1
+    max_iterations = state.get("max_iterations", 5)
+    print(f"--- Brainstormer: Generating proposal (iteration {iteration}/{max_iterations}) ---")
+
+    result = await ainvoke_with_structured_output(**_proposal_request(state, iteration, max_iterations))
+    return _record_proposal(state, result, iteration)
+
+
+def _proposal_request(state: Phase2State, iteration: int, max_iterations: int) -> Dict[str, Any]:
+    """Pick initial vs revision prompt and build the structured-output call."""
     # Check if we have existing proposal and feedback (revision case)
     current_proposal = state.get("current_proposal")
     feedback = state.get("consolidated_feedback")
@@ -44,7 +61,7 @@ def brainstormer_node(state: Phase2State) -> Dict[str, Any]:
             ("human", BRAINSTORMER_REVISION_PROMPT)
         ])
 
-        result = invoke_with_structured_output(
+        return dict(
             prompt=prompt,
             output_class=ProposalResult,
             inputs={
@@ -68,7 +85,7 @@ def brainstormer_node(state: Phase2State) -> Dict[str, Any]:
             ("human", BRAINSTORMER_PROMPT)
         ])
 
-        result = invoke_with_structured_output(
+        return dict(
             prompt=prompt,
             output_class=ProposalResult,
             inputs={
@@ -82,6 +99,8 @@ def brainstormer_node(state: Phase2State) -> Dict[str, Any]:
             temperature=0.9,
         )
 
+
+def _record_proposal(state: Phase2State, result: ProposalResult, iteration: int) -> Dict[str, Any]:
     # Format proposal as markdown
     proposal_text = f"""# {result.title}
 
@@ -103,18 +122,16 @@ def brainstormer_node(state: Phase2State) -> Dict[str, Any]:
 
     print(f"Generated proposal: {result.title}")
 
-    # Save proposal to file if arxiv_id is available
+    # Save proposal to the artifact store if arxiv_id is available
     arxiv_id = state.get("arxiv_id")
     proposal_num = state.get("proposal_num", 1)
     if arxiv_id:
-        proposal_dir = PAPERS_DIR / arxiv_id / "step4_open_problems" / f"proposal_{proposal_num}" / "proposals"
-        proposal_dir.mkdir(parents=True, exist_ok=True)
-        proposal_path = proposal_dir / f"proposal_iteration_{iteration}.md"
-        proposal_path.write_text(proposal_text, encoding="utf-8")
+        proposal_path = f"step4_open_problems/proposal_{proposal_num}/proposals/proposal_iteration_{iteration}.md"
+        save_artifacts([Artifact(arxiv_id, proposal_path, "text", proposal_text)])
         print(f"  > Saved proposal to {proposal_path}")
 
     return {
         "current_proposal": proposal_text,
         "phase2_iteration": iteration,
-        "critiques": [],
+        "critiques": [],  # reset the iteration-scoped critique store
     }
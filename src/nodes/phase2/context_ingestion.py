@@ -21,3 +21,8 @@ def context_ingestion_node(state: Phase2State) -> Dict[str, Any]:
         "max_iterations": state.get("max_iterations", 5),
         "critiques": [],
     }
+
+
+async def acontext_ingestion_node(state: Phase2State) -> Dict[str, Any]:
+    """Async variant of context_ingestion_node (no I/O, delegates)."""
+    return context_ingestion_node(state)
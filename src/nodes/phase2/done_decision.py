@@ -1,13 +1,13 @@
 """Done Decision node for Phase 2."""
 
-import json
 from typing import Any, Dict
 
 from langchain_core.prompts import ChatPromptTemplate
 
 from prompts.phase2 import DONE_DECISION_SYSTEM, DONE_DECISION_PROMPT
 from schema.phase2 import Phase2State, DoneDecisionResult
-from ._common import PAPERS_DIR, invoke_with_structured_output
+from utils.artifacts import Artifact, save_artifacts
+from ._common import ainvoke_with_structured_output, invoke_with_structured_output
 
 
 def done_decision_node(state: Phase2State) -> Dict[str, Any]:
@@ -20,26 +20,45 @@ def done_decision_node(state: Phase2State) -> Dict[str, Any]:
     max_iterations = state.get("max_iterations", 5)
     print(f"--- Done Decision: Evaluating proposal (iteration {iteration}/{max_iterations}) ---")
 
-    proposal_num = state.get("proposal_num", 1)
-
     # Force exit if we've hit max iterations
     if iteration >= max_iterations:
-        print("Max iterations reached - forcing exit")
-        decision_result = {
-            "is_done": True,
-            "done_reason": f"Maximum iterations ({max_iterations}) reached.",
-        }
+        return _forced_exit(state, iteration, max_iterations)
+
+    result = invoke_with_structured_output(**_decision_request(state, iteration, max_iterations))
+    return _record_decision(state, result, iteration)
+
+
+async def adone_decision_node(state: Phase2State) -> Dict[str, Any]:
+    """Async variant of done_decision_node."""
+    iteration = state.get("phase2_iteration", 1)
+    max_iterations = state.get("max_iterations", 5)
+    print(f"--- Done Decision: Evaluating proposal (iteration {iteration}/{max_iterations}) ---")
+
+    if iteration >= max_iterations:
+        return _forced_exit(state, iteration, max_iterations)
 
-        # Save decision
-        arxiv_id = state.get("arxiv_id")
-        if arxiv_id:
-            decision_dir = PAPERS_DIR / arxiv_id / "step4_open_problems" / f"proposal_{proposal_num}" / "decisions"
-            decision_dir.mkdir(parents=True, exist_ok=True)
-            decision_path = decision_dir / f"decision_iteration_{iteration}.json"
-            decision_path.write_text(json.dumps(decision_result, indent=2), encoding="utf-8")
+    result = await ainvoke_with_structured_output(**_decision_request(state, iteration, max_iterations))
+    return _record_decision(state, result, iteration)
 
-        return decision_result
 
+def _forced_exit(state: Phase2State, iteration: int, max_iterations: int) -> Dict[str, Any]:
+    print("Max iterations reached - forcing exit")
+    decision_result = {
+        "is_done": True,
+        "done_reason": f"Maximum iterations ({max_iterations}) reached.",
+    }
+
+    # Save decision
+    arxiv_id = state.get("arxiv_id")
+    proposal_num = state.get("proposal_num", 1)
+    if arxiv_id:
+        decision_path = f"step4_open_problems/proposal_{proposal_num}/decisions/decision_iteration_{iteration}.json"
+        save_artifacts([Artifact(arxiv_id, decision_path, "json", decision_result)])
+
+    return decision_result
+
+
+def _decision_request(state: Phase2State, iteration: int, max_iterations: int) -> Dict[str, Any]:
     prompt = ChatPromptTemplate.from_messages([
         ("system", DONE_DECISION_SYSTEM),
         ("human", DONE_DECISION_PROMPT)
@@ -47,7 +66,7 @@ def done_decision_node(state: Phase2State) -> Dict[str, Any]:
 
     feedback = state.get("consolidated_feedback", {})
 
-    result = invoke_with_structured_output(
+    return dict(
         prompt=prompt,
         output_class=DoneDecisionResult,
         inputs={
@@ -58,14 +77,15 @@ def done_decision_node(state: Phase2State) -> Dict[str, Any]:
         }
     )
 
+
+def _record_decision(state: Phase2State, result: DoneDecisionResult, iteration: int) -> Dict[str, Any]:
     print(f"Done Decision: is_done={result.is_done}, clarity={result.clarity_met}, "
           f"feasibility={result.feasibility_met}, novelty={result.novelty_met}")
 
-    # Save decision to file if arxiv_id is available
+    # Save decision to the artifact store if arxiv_id is available
     arxiv_id = state.get("arxiv_id")
+    proposal_num = state.get("proposal_num", 1)
     if arxiv_id:
-        decision_dir = PAPERS_DIR / arxiv_id / "step4_open_problems" / f"proposal_{proposal_num}" / "decisions"
-        decision_dir.mkdir(parents=True, exist_ok=True)
 
         decision_data = {
             "iteration": iteration,
@@ -76,8 +96,8 @@ def done_decision_node(state: Phase2State) -> Dict[str, Any]:
             "reasoning": result.reasoning,
             "recommendation": result.recommendation,
         }
-        decision_path = decision_dir / f"decision_iteration_{iteration}.json"
-        decision_path.write_text(json.dumps(decision_data, indent=2), encoding="utf-8")
+        decision_path = f"step4_open_problems/proposal_{proposal_num}/decisions/decision_iteration_{iteration}.json"
+        save_artifacts([Artifact(arxiv_id, decision_path, "json", decision_data)])
         print(f"  > Saved decision to {decision_path}")
 
     return {
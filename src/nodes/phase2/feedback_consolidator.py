@@ -6,7 +6,8 @@ from langchain_core.prompts import ChatPromptTemplate
 
 from prompts.phase2 import FEEDBACK_CONSOLIDATOR_SYSTEM, FEEDBACK_CONSOLIDATOR_PROMPT
 from schema.phase2 import Phase2State, ConsolidatedFeedbackResult, ConsolidatedFeedback, Critique
-from ._common import PAPERS_DIR, invoke_with_structured_output
+from utils.artifacts import Artifact, register_renderer, save_artifacts
+from ._common import ainvoke_with_structured_output, invoke_with_structured_output
 
 
 def _format_critique(c: Critique) -> str:
@@ -28,20 +29,39 @@ def feedback_consolidator_node(state: Phase2State) -> Dict[str, Any]:
     """
     print("--- Feedback Consolidator: Merging critiques ---")
 
-    critiques = state.get("critiques", [])
+    result = invoke_with_structured_output(**_consolidation_request(state))
+    return _record_feedback(state, result)
+
+
+async def afeedback_consolidator_node(state: Phase2State) -> Dict[str, Any]:
+    """Async variant of feedback_consolidator_node."""
+    print("--- Feedback Consolidator: Merging critiques ---")
+
+    result = await ainvoke_with_structured_output(**_consolidation_request(state))
+    return _record_feedback(state, result)
+
+
+def _consolidation_request(state: Phase2State) -> Dict[str, Any]:
+    # Only this iteration's critiques; the latest one wins per critic
+    iteration = state.get("phase2_iteration", 1)
+    current = {
+        c["source"]: c
+        for c in state.get("critiques", [])
+        if c.get("iteration", iteration) == iteration
+    }
 
     # Find each critic's feedback
-    sanity = next((c for c in critiques if c["source"] == "sanity_checker"), None)
-    example = next((c for c in critiques if c["source"] == "example_tester"), None)
-    reverse = next((c for c in critiques if c["source"] == "reverse_reasoner"), None)
-    obstruction = next((c for c in critiques if c["source"] == "obstruction_analyzer"), None)
+    sanity = current.get("sanity_checker")
+    example = current.get("example_tester")
+    reverse = current.get("reverse_reasoner")
+    obstruction = current.get("obstruction_analyzer")
 
     prompt = ChatPromptTemplate.from_messages([
         ("system", FEEDBACK_CONSOLIDATOR_SYSTEM),
         ("human", FEEDBACK_CONSOLIDATOR_PROMPT)
     ])
 
-    result = invoke_with_structured_output(
+    return dict(
         prompt=prompt,
         output_class=ConsolidatedFeedbackResult,
         inputs={
@@ -53,6 +73,29 @@ def feedback_consolidator_node(state: Phase2State) -> Dict[str, Any]:
         temperature=0.1,
     )
 
+
+@register_renderer("feedback_md")
+def render_feedback(data: Dict[str, Any]) -> str:
+    return f"""# Consolidated Feedback (Iteration {data['iteration']})
+
+## Overall Assessment
+{data['overall_assessment']}
+
+## Critical Issues (Must Fix)
+{chr(10).join(f'- {issue}' for issue in data['critical_issues']) if data['critical_issues'] else '- None'}
+
+## Minor Issues (Nice to Fix)
+{chr(10).join(f'- {issue}' for issue in data['minor_issues']) if data['minor_issues'] else '- None'}
+
+## Strengths (Preserve)
+{chr(10).join(f'- {s}' for s in data['strengths']) if data['strengths'] else '- None'}
+
+## Required Fixes (Priority Order)
+{chr(10).join(f'{i+1}. {fix}' for i, fix in enumerate(data['required_fixes'])) if data['required_fixes'] else '- None'}
+"""
+
+
+def _record_feedback(state: Phase2State, result: ConsolidatedFeedbackResult) -> Dict[str, Any]:
     consolidated = ConsolidatedFeedback(
         critical_issues=result.critical_issues,
         minor_issues=result.minor_issues,
@@ -63,33 +106,16 @@ def feedback_consolidator_node(state: Phase2State) -> Dict[str, Any]:
 
     print(f"Consolidated: {len(result.critical_issues)} critical, {len(result.minor_issues)} minor issues")
 
-    # Save consolidated feedback to file if arxiv_id is available
+    # Save consolidated feedback to the artifact store if arxiv_id is available
     arxiv_id = state.get("arxiv_id")
     iteration = state.get("phase2_iteration", 1)
     proposal_num = state.get("proposal_num", 1)
     if arxiv_id:
-        feedback_dir = PAPERS_DIR / arxiv_id / "step4_open_problems" / f"proposal_{proposal_num}" / "feedback"
-        feedback_dir.mkdir(parents=True, exist_ok=True)
-
-        feedback_md = f"""# Consolidated Feedback (Iteration {iteration})
-
-## Overall Assessment
-{result.overall_assessment}
-
-## Critical Issues (Must Fix)
-{chr(10).join(f'- {issue}' for issue in result.critical_issues) if result.critical_issues else '- None'}
-
-## Minor Issues (Nice to Fix)
-{chr(10).join(f'- {issue}' for issue in result.minor_issues) if result.minor_issues else '- None'}
-
-## Strengths (Preserve)
-{chr(10).join(f'- {s}' for s in result.strengths) if result.strengths else '- None'}
-
-## Required Fixes (Priority Order)
-{chr(10).join(f'{i+1}. {fix}' for i, fix in enumerate(result.required_fixes)) if result.required_fixes else '- None'}
-"""
-        feedback_path = feedback_dir / f"consolidated_iteration_{iteration}.md"
-        feedback_path.write_text(feedback_md, encoding="utf-8")
+        feedback_path = f"step4_open_problems/proposal_{proposal_num}/feedback/consolidated_iteration_{iteration}.md"
+        save_artifacts([Artifact(arxiv_id, feedback_path, "feedback_md", {
+            "iteration": iteration,
+            **result.model_dump(),
+        })])
         print(f"  > Saved feedback to {feedback_path}")
 
     return {
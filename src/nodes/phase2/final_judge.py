@@ -1,13 +1,13 @@
 """Final Judge node for Phase 2."""
 
-import json
 from typing import Any, Dict
 
 from langchain_core.prompts import ChatPromptTemplate
 
 from prompts.phase2 import JUDGE_SYSTEM, FINAL_JUDGE_PROMPT
 from schema.phase2 import Phase2State, JudgeResult, QualityAssessment
-from ._common import PAPERS_DIR, invoke_with_structured_output
+from utils.artifacts import Artifact, register_renderer, save_artifacts
+from ._common import ainvoke_with_structured_output, invoke_with_structured_output
 
 
 def final_judge_node(state: Phase2State) -> Dict[str, Any]:
@@ -18,12 +18,25 @@ def final_judge_node(state: Phase2State) -> Dict[str, Any]:
     """
     print("--- Final Judge: Evaluating report ---")
 
+    result = invoke_with_structured_output(**_judge_request(state))
+    return _record_assessment(state, result)
+
+
+async def afinal_judge_node(state: Phase2State) -> Dict[str, Any]:
+    """Async variant of final_judge_node."""
+    print("--- Final Judge: Evaluating report ---")
+
+    result = await ainvoke_with_structured_output(**_judge_request(state))
+    return _record_assessment(state, result)
+
+
+def _judge_request(state: Phase2State) -> Dict[str, Any]:
     prompt = ChatPromptTemplate.from_messages([
         ("system", JUDGE_SYSTEM),
         ("human", FINAL_JUDGE_PROMPT)
     ])
 
-    result = invoke_with_structured_output(
+    return dict(
         prompt=prompt,
         output_class=JudgeResult,
         inputs={
@@ -34,6 +47,57 @@ def final_judge_node(state: Phase2State) -> Dict[str, Any]:
         temperature=0.5,
     )
 
+
+@register_renderer("quality_assessment_md")
+def render_quality_assessment(data: Dict[str, Any]) -> str:
+    ps, pa, ec, pi = (data[section] for section in
+                      ("problem_statement", "proposed_approach", "expected_challenges", "potential_impact"))
+    return f"""# Quality Assessment
+
+## Scores by Section
+
+### Problem Statement
+| Criterion | Score |
+|-----------|-------|
+| Mathematical coherence | {ps['ps_coherence']}/5 |
+| Motivation from paper | {ps['ps_motivation']}/5 |
+| Clarity of formulation | {ps['ps_derivation']}/5 |
+| Conceptual depth | {ps['ps_depth']}/5 |
+
+### Proposed Approach
+| Criterion | Score |
+|-----------|-------|
+| Internal coherence | {pa['pa_coherence']}/5 |
+| Alignment with problem | {pa['pa_alignment']}/5 |
+| Technical feasibility | {pa['pa_feasibility']}/5 |
+
+### Expected Challenges
+| Criterion | Score |
+|-----------|-------|
+| Obstacle identification | {ec['ec_identification']}/5 |
+| Technical depth of analysis | {ec['ec_technical_depth']}/5 |
+| Complexity calibration | {ec['ec_complexity']}/5 |
+| Strategy plausibility | {ec['ec_strategies']}/5 |
+
+### Potential Impact
+| Criterion | Score |
+|-----------|-------|
+| Novelty | {pi['pi_novelty']}/5 |
+| Field advancement | {pi['pi_advancement']}/5 |
+| Publication potential | {pi['pi_publication']}/5 |
+
+## Justification
+{data['justification']}
+
+## Strengths
+{chr(10).join(f'- {s}' for s in data['strengths']) if data['strengths'] else '- None'}
+
+## Weaknesses
+{chr(10).join(f'- {w}' for w in data['weaknesses']) if data['weaknesses'] else '- None'}
+"""
+
+
+def _record_assessment(state: Phase2State, result: JudgeResult) -> Dict[str, Any]:
     assessment = QualityAssessment(
         ps_coherence=result.ps_coherence,
         ps_motivation=result.ps_motivation,
@@ -60,60 +124,10 @@ def final_judge_node(state: Phase2State) -> Dict[str, Any]:
         f"PI: {result.pi_novelty}/{result.pi_advancement}/{result.pi_publication}"
     )
 
-    # Save assessment to file if arxiv_id is available
+    # Save assessment to the artifact store if arxiv_id is available
     arxiv_id = state.get("arxiv_id")
     proposal_num = state.get("proposal_num", 1)
     if arxiv_id:
-        judge_dir = PAPERS_DIR / arxiv_id / "step4_open_problems" / f"proposal_{proposal_num}"
-        judge_dir.mkdir(parents=True, exist_ok=True)
-
-        assessment_md = f"""# Quality Assessment
-
-## Scores by Section
-
-### Problem Statement
-| Criterion | Score |
-|-----------|-------|
-| Mathematical coherence | {result.ps_coherence}/5 |
-| Motivation from paper | {result.ps_motivation}/5 |
-| Clarity of formulation | {result.ps_derivation}/5 |
-| Conceptual depth | {result.ps_depth}/5 |
-
-### Proposed Approach
-| Criterion | Score |
-|-----------|-------|
-| Internal coherence | {result.pa_coherence}/5 |
-| Alignment with problem | {result.pa_alignment}/5 |
-| Technical feasibility | {result.pa_feasibility}/5 |
-
-### Expected Challenges
-| Criterion | Score |
-|-----------|-------|
-| Obstacle identification | {result.ec_identification}/5 |
-| Technical depth of analysis | {result.ec_technical_depth}/5 |
-| Complexity calibration | {result.ec_complexity}/5 |
-| Strategy plausibility | {result.ec_strategies}/5 |
-
-### Potential Impact
-| Criterion | Score |
-|-----------|-------|
-| Novelty | {result.pi_novelty}/5 |
-| Field advancement | {result.pi_advancement}/5 |
-| Publication potential | {result.pi_publication}/5 |
-
-## Justification
-{result.justification}
-
-## Strengths
-{chr(10).join(f'- {s}' for s in result.strengths) if result.strengths else '- None'}
-
-## Weaknesses
-{chr(10).join(f'- {w}' for w in result.weaknesses) if result.weaknesses else '- None'}
-"""
-        assessment_path = judge_dir / "quality_assessment.md"
-        assessment_path.write_text(assessment_md, encoding="utf-8")
-        print(f"  > Saved assessment to {assessment_path}")
-
         assessment_json = {
             "problem_statement": {
                 "ps_coherence": result.ps_coherence,
@@ -141,8 +155,12 @@ def final_judge_node(state: Phase2State) -> Dict[str, Any]:
             "strengths": result.strengths,
             "weaknesses": result.weaknesses,
         }
-        json_path = judge_dir / "quality_assessment.json"
-        json_path.write_text(json.dumps(assessment_json, indent=2), encoding="utf-8")
+        judge_dir = f"step4_open_problems/proposal_{proposal_num}"
+        save_artifacts([
+            Artifact(arxiv_id, f"{judge_dir}/quality_assessment.md", "quality_assessment_md", assessment_json),
+            Artifact(arxiv_id, f"{judge_dir}/quality_assessment.json", "json", assessment_json),
+        ])
+        print(f"  > Saved assessment to {judge_dir}/quality_assessment.md")
 
     return {
         "quality_assessment": assessment,
@@ -10,7 +10,9 @@ from prompts.phase2.mechanism_updater import (
     MECHANISM_UPDATER_PROMPT,
 )
 from schema.phase2 import Phase2State
-from ._common import PAPERS_DIR, call_openrouter_direct
+from utils.usage import usage_label
+from utils.artifacts import Artifact, save_artifacts
+from ._common import acall_openrouter_direct, call_openrouter_direct, to_openrouter_messages
 
 
 def mechanism_updater_node(state: Phase2State) -> Dict[str, Any]:
@@ -22,6 +24,21 @@ def mechanism_updater_node(state: Phase2State) -> Dict[str, Any]:
     """
     print("--- Mechanism Updater: Adding traceability to mechanism XML ---")
 
+    with usage_label("phase2.mechanism_updater"):
+        response_text = call_openrouter_direct(_updater_messages(state), temperature=0.3)
+    return _record_mechanism(state, response_text)
+
+
+async def amechanism_updater_node(state: Phase2State) -> Dict[str, Any]:
+    """Async variant of mechanism_updater_node."""
+    print("--- Mechanism Updater: Adding traceability to mechanism XML ---")
+
+    with usage_label("phase2.mechanism_updater"):
+        response_text = await acall_openrouter_direct(_updater_messages(state), temperature=0.3)
+    return _record_mechanism(state, response_text)
+
+
+def _updater_messages(state: Phase2State) -> list:
     # Parse the final report sections from markdown
     report = state.get("final_report", "")
     sections = _parse_report_sections(report)
@@ -31,22 +48,17 @@ def mechanism_updater_node(state: Phase2State) -> Dict[str, Any]:
         ("human", MECHANISM_UPDATER_PROMPT),
     ])
 
-    formatted = prompt.format_messages(
-        mechanism=state["mechanism"],
-        problem_statement=sections.get("problem_statement", ""),
-        proposed_approach=sections.get("proposed_approach", ""),
-        expected_challenges=sections.get("expected_challenges", ""),
-        potential_impact=sections.get("potential_impact", ""),
-        direction=state.get("current_direction", ""),
-    )
-
-    messages = []
-    for msg in formatted:
-        role = "user" if msg.type == "human" else msg.type
-        messages.append({"role": role, "content": msg.content})
+    return to_openrouter_messages(prompt, {
+        "mechanism": state["mechanism"],
+        "problem_statement": sections.get("problem_statement", ""),
+        "proposed_approach": sections.get("proposed_approach", ""),
+        "expected_challenges": sections.get("expected_challenges", ""),
+        "potential_impact": sections.get("potential_impact", ""),
+        "direction": state.get("current_direction", ""),
+    })
 
-    response_text = call_openrouter_direct(messages, temperature=0.3)
 
+def _record_mechanism(state: Phase2State, response_text: str) -> Dict[str, Any]:
     # Strip markdown code fences if present
     updated_xml = response_text.strip()
     updated_xml = re.sub(r'^```(?:xml)?\s*', '', updated_xml)
@@ -54,14 +66,12 @@ def mechanism_updater_node(state: Phase2State) -> Dict[str, Any]:
 
     print(f"  Updated mechanism XML ({len(updated_xml)} chars)")
 
-    # Save to file
+    # Save to the artifact store
     arxiv_id = state.get("arxiv_id")
     proposal_num = state.get("proposal_num", 1)
     if arxiv_id:
-        out_dir = PAPERS_DIR / arxiv_id / "step4_open_problems" / f"proposal_{proposal_num}"
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / "mechanism_updated.xml"
-        out_path.write_text(updated_xml, encoding="utf-8")
+        out_path = f"step4_open_problems/proposal_{proposal_num}/mechanism_updated.xml"
+        save_artifacts([Artifact(arxiv_id, out_path, "text", updated_xml)])
         print(f"  > Saved updated mechanism to {out_path}")
 
     return {
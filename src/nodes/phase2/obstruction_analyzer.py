@@ -2,11 +2,10 @@
 
 from typing import Any, Dict
 
-from langchain_core.prompts import ChatPromptTemplate
-
-from prompts.phase2 import CRITIC_SYSTEM, OBSTRUCTION_ANALYZER_PROMPT
-from schema.phase2 import Phase2State, CritiqueResult, Critique
-from ._common import PAPERS_DIR, invoke_with_structured_output
+from prompts.phase2 import OBSTRUCTION_ANALYZER_PROMPT
+from schema.phase2 import Phase2State
+from ._common import ainvoke_with_structured_output, invoke_with_structured_output
+from ._critic import critique_request, record_critique
 
 
 def obstruction_analyzer_node(state: Phase2State) -> Dict[str, Any]:
@@ -17,59 +16,13 @@ def obstruction_analyzer_node(state: Phase2State) -> Dict[str, Any]:
     """
     print("--- Obstruction Analyzer: Identifying barriers ---")
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", CRITIC_SYSTEM),
-        ("human", OBSTRUCTION_ANALYZER_PROMPT)
-    ])
-
-    result = invoke_with_structured_output(
-        prompt=prompt,
-        output_class=CritiqueResult,
-        inputs={
-            "proposal": state["current_proposal"],
-            "paper_summary": state["summary"],
-            "mechanisms": state["mechanism"],
-        },
-        temperature=0.3,
-    )
-
-    print(f"Obstruction Analyzer: Found {len(result.issues)} issues, {len(result.strengths)} strengths")
-
-    critique = Critique(
-        source="obstruction_analyzer",
-        issues=result.issues,
-        strengths=result.strengths,
-        suggestions=result.suggestions,
-    )
-
-    # Save critique to file if arxiv_id is available
-    arxiv_id = state.get("arxiv_id")
-    iteration = state.get("phase2_iteration", 1)
-    proposal_num = state.get("proposal_num", 1)
-    if arxiv_id:
-        critique_dir = PAPERS_DIR / arxiv_id / "step4_open_problems" / f"proposal_{proposal_num}" / "critiques" / f"iteration_{iteration}"
-        critique_dir.mkdir(parents=True, exist_ok=True)
+    result = invoke_with_structured_output(**critique_request(state, OBSTRUCTION_ANALYZER_PROMPT, temperature=0.3))
+    return record_critique(state, result, source="obstruction_analyzer", title="Obstruction Analyzer")
 
-        critique_md = f"""# Obstruction Analyzer Critique (Iteration {iteration})
 
-## Summary
-{result.summary}
-
-## Severity: {result.severity}
-
-## Issues Found
-{chr(10).join(f'- {issue}' for issue in result.issues) if result.issues else '- None'}
-
-## Strengths Identified
-{chr(10).join(f'- {s}' for s in result.strengths) if result.strengths else '- None'}
-
-## Suggestions
-{chr(10).join(f'- {s}' for s in result.suggestions) if result.suggestions else '- None'}
-"""
-        critique_path = critique_dir / "obstruction_analyzer.md"
-        critique_path.write_text(critique_md, encoding="utf-8")
-        print(f"  > Saved critique to {critique_path}")
+async def aobstruction_analyzer_node(state: Phase2State) -> Dict[str, Any]:
+    """Async variant of obstruction_analyzer_node."""
+    print("--- Obstruction Analyzer: Identifying barriers ---")
 
-    return {
-        "critiques": [critique],
-    }
+    result = await ainvoke_with_structured_output(**critique_request(state, OBSTRUCTION_ANALYZER_PROMPT, temperature=0.3))
+    return record_critique(state, result, source="obstruction_analyzer", title="Obstruction Analyzer")
@@ -1,59 +1,30 @@
 """Quality Score node for Phase 2."""
 
-import json
 from typing import Any, Dict
 
 from schema.phase2 import Phase2State
-from ._common import PAPERS_DIR
+from utils.artifacts import Artifact, register_renderer, save_artifacts
 
 
-def quality_score_node(state: Phase2State) -> Dict[str, Any]:
-    """
-    Node 6: Quality Score
-
-    Computes the four section-level average scores (1-5) from the judge's
-    14 criterion scores and saves a proposal summary.
-    """
-    print("--- Quality Score: Computing section averages ---")
-
-    a = state["quality_assessment"]
-
-    ps_score = round((a["ps_coherence"] + a["ps_motivation"] + a["ps_derivation"] + a["ps_depth"]) / 4, 2)
-    pa_score = round((a["pa_coherence"] + a["pa_alignment"] + a["pa_feasibility"]) / 3, 2)
-    ec_score = round((a["ec_identification"] + a["ec_technical_depth"] + a["ec_complexity"] + a["ec_strategies"]) / 4, 2)
-    pi_score = round((a["pi_novelty"] + a["pi_advancement"] + a["pi_publication"]) / 3, 2)
-
-    print(
-        f"Section scores — "
-        f"Problem Statement: {ps_score}/5 | "
-        f"Proposed Approach: {pa_score}/5 | "
-        f"Expected Challenges: {ec_score}/5 | "
-        f"Potential Impact: {pi_score}/5"
-    )
-
-    # Save final summary to file if arxiv_id is available
-    arxiv_id = state.get("arxiv_id")
-    proposal_num = state.get("proposal_num", 1)
-    if arxiv_id:
-        summary_dir = PAPERS_DIR / arxiv_id / "step4_open_problems" / f"proposal_{proposal_num}"
-        summary_dir.mkdir(parents=True, exist_ok=True)
-
-        summary_md = f"""# Proposal {proposal_num} Summary
+@register_renderer("proposal_summary_md")
+def render_summary(data: Dict[str, Any]) -> str:
+    sections, a = data["section_scores"], data["criterion_scores"]
+    return f"""# Proposal {data['proposal_num']} Summary
 
 ## Process Overview
-- **Total Iterations:** {state.get('phase2_iteration', 'N/A')}
-- **Exit Reason:** {state.get('done_reason', 'N/A')}
-- **Research Direction:** {state.get('current_direction', 'N/A')}
+- **Total Iterations:** {data['total_iterations']}
+- **Exit Reason:** {data['exit_reason']}
+- **Research Direction:** {data['direction']}
 
 ## Quality Assessment
 
 ### Section Scores (1–5 scale)
 | Section | Score |
 |---------|-------|
-| Problem Statement | {ps_score}/5 |
-| Proposed Approach | {pa_score}/5 |
-| Expected Challenges | {ec_score}/5 |
-| Potential Impact | {pi_score}/5 |
+| Problem Statement | {sections['problem_statement']}/5 |
+| Proposed Approach | {sections['proposed_approach']}/5 |
+| Expected Challenges | {sections['expected_challenges']}/5 |
+| Potential Impact | {sections['potential_impact']}/5 |
 
 ### Problem Statement Detail
 | Criterion | Score |
@@ -86,7 +57,7 @@ def quality_score_node(state: Phase2State) -> Dict[str, Any]:
 | Publication potential | {a['pi_publication']}/5 |
 
 ## Justification
-{a['justification']}
+{data['justification']}
 
 ## Output Files
 - `proposals/` - Proposal iterations
@@ -96,10 +67,36 @@ def quality_score_node(state: Phase2State) -> Dict[str, Any]:
 - `report.md` - Final polished report
 - `quality_assessment.md` - Quality assessment details
 """
-        summary_path = summary_dir / "summary.md"
-        summary_path.write_text(summary_md, encoding="utf-8")
-        print(f"  > Saved proposal summary to {summary_path}")
 
+
+def quality_score_node(state: Phase2State) -> Dict[str, Any]:
+    """
+    Node 6: Quality Score
+
+    Computes the four section-level average scores (1-5) from the judge's
+    14 criterion scores and saves a proposal summary.
+    """
+    print("--- Quality Score: Computing section averages ---")
+
+    a = state["quality_assessment"]
+
+    ps_score = round((a["ps_coherence"] + a["ps_motivation"] + a["ps_derivation"] + a["ps_depth"]) / 4, 2)
+    pa_score = round((a["pa_coherence"] + a["pa_alignment"] + a["pa_feasibility"]) / 3, 2)
+    ec_score = round((a["ec_identification"] + a["ec_technical_depth"] + a["ec_complexity"] + a["ec_strategies"]) / 4, 2)
+    pi_score = round((a["pi_novelty"] + a["pi_advancement"] + a["pi_publication"]) / 3, 2)
+
+    print(
+        f"Section scores — "
+        f"Problem Statement: {ps_score}/5 | "
+        f"Proposed Approach: {pa_score}/5 | "
+        f"Expected Challenges: {ec_score}/5 | "
+        f"Potential Impact: {pi_score}/5"
+    )
+
+    # Save final summary to the artifact store if arxiv_id is available
+    arxiv_id = state.get("arxiv_id")
+    proposal_num = state.get("proposal_num", 1)
+    if arxiv_id:
         summary_json = {
             "arxiv_id": arxiv_id,
             "proposal_num": proposal_num,
@@ -129,8 +126,19 @@ def quality_score_node(state: Phase2State) -> Dict[str, Any]:
                 "pi_publication": a["pi_publication"],
             },
         }
-        json_path = summary_dir / "summary.json"
-        json_path.write_text(json.dumps(summary_json, indent=2), encoding="utf-8")
+        summary_view = {
+            **summary_json,
+            "total_iterations": state.get("phase2_iteration", "N/A"),
+            "exit_reason": state.get("done_reason", "N/A"),
+            "direction": state.get("current_direction", "N/A"),
+            "justification": a["justification"],
+        }
+        summary_dir = f"step4_open_problems/proposal_{proposal_num}"
+        save_artifacts([
+            Artifact(arxiv_id, f"{summary_dir}/summary.md", "proposal_summary_md", summary_view),
+            Artifact(arxiv_id, f"{summary_dir}/summary.json", "json", summary_json),
+        ])
+        print(f"  > Saved proposal summary to {summary_dir}/summary.md")
 
     return {
         "ps_score": ps_score,
@@ -138,3 +146,8 @@ def quality_score_node(state: Phase2State) -> Dict[str, Any]:
         "ec_score": ec_score,
         "pi_score": pi_score,
     }
+
+
+async def aquality_score_node(state: Phase2State) -> Dict[str, Any]:
+    """Async variant of quality_score_node (no LLM call, delegates)."""
+    return quality_score_node(state)
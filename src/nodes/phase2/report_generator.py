@@ -6,7 +6,8 @@ from langchain_core.prompts import ChatPromptTemplate
 
 from prompts.phase2 import REPORT_GENERATOR_SYSTEM, REPORT_GENERATOR_PROMPT
 from schema.phase2 import Phase2State, ReportResult
-from ._common import PAPERS_DIR, invoke_with_structured_output
+from utils.artifacts import Artifact, save_artifacts
+from ._common import ainvoke_with_structured_output, invoke_with_structured_output
 
 
 def report_generator_node(state: Phase2State) -> Dict[str, Any]:
@@ -17,12 +18,25 @@ def report_generator_node(state: Phase2State) -> Dict[str, Any]:
     """
     print("--- Report Generator: Creating final report ---")
 
+    result = invoke_with_structured_output(**_report_request(state))
+    return _record_report(state, result)
+
+
+async def areport_generator_node(state: Phase2State) -> Dict[str, Any]:
+    """Async variant of report_generator_node."""
+    print("--- Report Generator: Creating final report ---")
+
+    result = await ainvoke_with_structured_output(**_report_request(state))
+    return _record_report(state, result)
+
+
+def _report_request(state: Phase2State) -> Dict[str, Any]:
     prompt = ChatPromptTemplate.from_messages([
         ("system", REPORT_GENERATOR_SYSTEM),
         ("human", REPORT_GENERATOR_PROMPT)
     ])
 
-    result = invoke_with_structured_output(
+    return dict(
         prompt=prompt,
         output_class=ReportResult,
         inputs={
@@ -34,6 +48,8 @@ def report_generator_node(state: Phase2State) -> Dict[str, Any]:
         temperature=0.4,
     )
 
+
+def _record_report(state: Phase2State, result: ReportResult) -> Dict[str, Any]:
     # Format as markdown report
     report = f"""# Problem Statement
 {result.problem_statement}
@@ -50,14 +66,12 @@ def report_generator_node(state: Phase2State) -> Dict[str, Any]:
 
     print(f"Generated report for proposal {state.get('proposal_num', '?')}")
 
-    # Save report to file if arxiv_id is available
+    # Save report to the artifact store if arxiv_id is available
     arxiv_id = state.get("arxiv_id")
     proposal_num = state.get("proposal_num", 1)
     if arxiv_id:
-        report_dir = PAPERS_DIR / arxiv_id / "step4_open_problems" / f"proposal_{proposal_num}"
-        report_dir.mkdir(parents=True, exist_ok=True)
-        report_path = report_dir / "final_report.md"
-        report_path.write_text(report, encoding="utf-8")
+        report_path = f"step4_open_problems/proposal_{proposal_num}/final_report.md"
+        save_artifacts([Artifact(arxiv_id, report_path, "text", report)])
         print(f"  > Saved report to {report_path}")
 
     return {
@@ -1,13 +1,17 @@
 """Phase 1 Prompts: Paper ingestion, summarization, critique, and mechanism extraction."""
 
 from .paper_summarizer import (
+    PAPER_INPUT_BLOCK,
     CONTEXT_EXTRACTOR_SYSTEM_PROMPT,
+    CONTEXT_EXTRACTOR_TASK_PROMPT,
     CONTEXT_EXTRACTOR_USER_PROMPT,
     CONTEXT_EXTRACTOR_REVISION_SYSTEM_PROMPT,
+    CONTEXT_EXTRACTOR_REVISION_TASK_PROMPT,
     CONTEXT_EXTRACTOR_REVISION_USER_PROMPT,
 )
 from .paper_summarizer_critic import (
     SUMMARIZER_CRITIC_SYSTEM_PROMPT,
+    SUMMARIZER_CRITIC_TASK_PROMPT,
     SUMMARIZER_CRITIC_USER_PROMPT,
 )
 from .mechanism_extractor import (
@@ -16,11 +20,15 @@ from .mechanism_extractor import (
 )
 
 __all__ = [
+    "PAPER_INPUT_BLOCK",
     "CONTEXT_EXTRACTOR_SYSTEM_PROMPT",
+    "CONTEXT_EXTRACTOR_TASK_PROMPT",
     "CONTEXT_EXTRACTOR_USER_PROMPT",
     "CONTEXT_EXTRACTOR_REVISION_SYSTEM_PROMPT",
+    "CONTEXT_EXTRACTOR_REVISION_TASK_PROMPT",
     "CONTEXT_EXTRACTOR_REVISION_USER_PROMPT",
     "SUMMARIZER_CRITIC_SYSTEM_PROMPT",
+    "SUMMARIZER_CRITIC_TASK_PROMPT",
     "SUMMARIZER_CRITIC_USER_PROMPT",
     "MECHANISM_EXTRACTOR_SYSTEM_PROMPT",
     "MECHANISM_EXTRACTOR_USER_PROMPT",
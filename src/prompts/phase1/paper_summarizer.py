@@ -75,21 +75,24 @@ This section is the primary fuel for open problems. Provide the following if dis
 '''
 
 # ============================================================
-# This is used in the initial invocation
-CONTEXT_EXTRACTOR_SYSTEM_PROMPT = PERSONA + GOAL_INITIAL + OUTPUT_FORMAT + STRUCTURE_AND_INSTRUCTIONS
-CONTEXT_EXTRACTOR_USER_PROMPT = '''
+# The paper block is shared by the summarizer, critic and revision prompts.
+# Kept separate so it can be sent once as a cacheable prefix; each
+# *_USER_PROMPT below is exactly PAPER_INPUT_BLOCK + its *_TASK_PROMPT.
+PAPER_INPUT_BLOCK = '''
 [INPUT PAPER TO SUMMARIZE]
 {input_paper}
-
+'''
+# ============================================================
+# This is used in the initial invocation
+CONTEXT_EXTRACTOR_SYSTEM_PROMPT = PERSONA + GOAL_INITIAL + OUTPUT_FORMAT + STRUCTURE_AND_INSTRUCTIONS
+CONTEXT_EXTRACTOR_TASK_PROMPT = '''
 [YOUR SUMMARY]
 '''
+CONTEXT_EXTRACTOR_USER_PROMPT = PAPER_INPUT_BLOCK + CONTEXT_EXTRACTOR_TASK_PROMPT
 # ============================================================
 # This is used for revision with feedback from the critique
 CONTEXT_EXTRACTOR_REVISION_SYSTEM_PROMPT = PERSONA + GOAL_REVISION + OUTPUT_FORMAT + STRUCTURE_AND_INSTRUCTIONS
-CONTEXT_EXTRACTOR_REVISION_USER_PROMPT = '''
-[INPUT PAPER TO SUMMARIZE]
-{input_paper}
-
+CONTEXT_EXTRACTOR_REVISION_TASK_PROMPT = '''
 [YOUR PREVIOUS SUMMARY]
 {previous_summary}
 
@@ -98,5 +101,6 @@ CONTEXT_EXTRACTOR_REVISION_USER_PROMPT = '''
 
 [YOUR REVISED SUMMARY]
 '''
+CONTEXT_EXTRACTOR_REVISION_USER_PROMPT = PAPER_INPUT_BLOCK + CONTEXT_EXTRACTOR_REVISION_TASK_PROMPT
 
 
@@ -1,3 +1,5 @@
+from .paper_summarizer import PAPER_INPUT_BLOCK
+
 SUMMARIZER_CRITIC_SYSTEM_PROMPT = """
 You are a Senior Mathematical Reviewer and Logic Critic.
 You are helping mathematicians to summarize mathematics papers to facilitate **Open Problem Formulation**.
@@ -56,12 +58,10 @@ If the paper *itself* does not contain certain information (e.g., the authors do
 If the summary hallucinates information not present in the original paper, you must mark it as NEEDS_REVISION and specify the hallucinated content.
 """
 
-SUMMARIZER_CRITIC_USER_PROMPT = '''
-[INPUT PAPER TO SUMMARIZE]
-{input_paper}
-
+SUMMARIZER_CRITIC_TASK_PROMPT = '''
 [SUMMARY]
 {summary}
 
 [YOUR EVALUATION]
 '''
+SUMMARIZER_CRITIC_USER_PROMPT = PAPER_INPUT_BLOCK + SUMMARIZER_CRITIC_TASK_PROMPT
@@ -1,6 +1,6 @@
 """Phase 2 Prompts: Open Problem Formulation workflow."""
 
-from .base import BASE_SYSTEM_PROMPT
+from .base import BASE_SYSTEM_PROMPT, SHARED_CONTEXT_PROMPT, SHARED_CONTEXT_REFERENCE
 from .agenda_creator import AGENDA_CREATOR_SYSTEM, AGENDA_CREATOR_PROMPT
 from .brainstormer import (
     BRAINSTORMER_SYSTEM,
@@ -26,6 +26,8 @@ from .final_judge import JUDGE_SYSTEM, FINAL_JUDGE_PROMPT
 __all__ = [
     # Base
     "BASE_SYSTEM_PROMPT",
+    "SHARED_CONTEXT_PROMPT",
+    "SHARED_CONTEXT_REFERENCE",
     # Agenda Creator
     "AGENDA_CREATOR_SYSTEM",
     "AGENDA_CREATOR_PROMPT",
@@ -3,3 +3,17 @@
 BASE_SYSTEM_PROMPT = """You are an expert AI research assistant specializing in mathematical research
 and open problem formulation. You provide rigorous, precise, and insightful analysis.
 You think carefully before responding and always justify your reasoning."""
+
+# Paper summary and mechanisms are identical for every Phase 2 call on a paper.
+# They are sent once, first, as a cacheable prefix; the per-node prompts then
+# point back to it instead of repeating the text.
+SHARED_CONTEXT_PROMPT = """## Shared Research Context
+
+### Paper Summary
+{paper_summary}
+
+### Key Mechanisms and Theories (XML Knowledge Base)
+{mechanisms}
+"""
+
+SHARED_CONTEXT_REFERENCE = "(see the Shared Research Context at the start of this conversation)"
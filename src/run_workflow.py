@@ -4,6 +4,7 @@ Simple script to run the workflow directly without UI.
 Usage: python run_workflow.py <arxiv_id>
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -18,8 +19,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from workflow.phase1 import build_phase1_workflow
-from workflow.phase2 import run_phase2_workflow
+from workflow.phase2 import arun_phase2_workflow
 from nodes.phase1 import critic_node, revision_node, mechanism_node
+from utils.artifacts import artifact_writer_stats, describe_store
+from utils.http_client import aclose_http_client
+from utils.llm_cache import get_llm_cache
+from utils.rate_limit import get_rate_limiter
+from utils.usage import format_usage, get_usage_tracker
 
 
 def run_phase1(arxiv_id: str, max_revisions: int = 10):
@@ -96,22 +102,33 @@ def run_phase1(arxiv_id: str, max_revisions: int = 10):
     print(f"{'='*60}")
     print(f"Final iteration: {state.get('iteration', 1)}")
     print(f"Critic status: {state.get('critic_status', 'UNKNOWN')}")
+    print("Token usage per round:")
+    print(format_usage(get_usage_tracker().summary("phase1")))
+    print(f"Prompt tokens served from provider cache: {get_usage_tracker().cached_share('phase1'):.1%}")
 
     return state
 
 
-def run_phase2(phase1_state: dict, max_iterations: int = 5):
-    """Run Phase 2 workflow, generating 3 proposals."""
+def run_phase2(phase1_state: dict, max_iterations: int = 5, max_concurrency: int = 3, resume: bool = False):
+    """Run Phase 2 workflow, generating 3 proposals (up to max_concurrency at once)."""
     print(f"\n{'='*60}")
     print("PHASE 2: Open Problem Formulation (3 Proposals)")
     print(f"{'='*60}\n")
 
-    result = run_phase2_workflow(
-        summary=phase1_state["summary"],
-        mechanism=phase1_state["mechanism"],
-        arxiv_id=phase1_state.get("arxiv_id"),
-        max_iterations=max_iterations,
-    )
+    async def _run():
+        try:
+            return await arun_phase2_workflow(
+                summary=phase1_state["summary"],
+                mechanism=phase1_state["mechanism"],
+                arxiv_id=phase1_state.get("arxiv_id"),
+                max_iterations=max_iterations,
+                max_concurrency=max_concurrency,
+                resume=resume,
+            )
+        finally:
+            await aclose_http_client()
+
+    result = asyncio.run(_run())
 
     print(f"\n{'='*60}")
     print("PHASE 2 COMPLETE")
@@ -124,6 +141,15 @@ def run_phase2(phase1_state: dict, max_iterations: int = 5):
             f"EC={p.get('ec_score', 0)}/5 | PI={p.get('pi_score', 0)}/5"
         )
 
+    tracker = get_usage_tracker()
+    print("Token usage per node:")
+    print(format_usage(tracker.summary("phase2")))
+    print(f"Prompt tokens served from provider cache: {tracker.cached_share('phase2'):.1%}")
+    print(f"Rate limiter: {get_rate_limiter().stats.as_dict()}")
+    writer_stats = artifact_writer_stats()
+    if writer_stats is not None:
+        print(f"Artifact writer: {writer_stats}")
+
     return result
 
 
@@ -160,17 +186,39 @@ def load_phase1_outputs(arxiv_id: str) -> dict:
     }
 
 
+def _option_value(name: str, default: int) -> int:
+    """Read a positive integer option given as `--name N` from sys.argv."""
+    if name not in sys.argv:
+        return default
+    index = sys.argv.index(name)
+    value = sys.argv[index + 1] if index + 1 < len(sys.argv) else ""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        print(f"ERROR: {name} needs a positive integer, got {value!r}")
+        print("Usage: python run_workflow.py <arxiv_id> [--phase2-only] [--resume] [--concurrency N]")
+        sys.exit(2)
+    return number
+
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python run_workflow.py <arxiv_id> [--phase2-only]")
+        print("Usage: python run_workflow.py <arxiv_id> [--phase2-only] [--resume] [--concurrency N]")
         print("Example: python run_workflow.py 2512.01868")
         print("         python run_workflow.py 2512.01868 --phase2-only")
+        print("         python run_workflow.py 2512.01868 --resume        # continue an interrupted Phase 2 run")
+        print("         python run_workflow.py 2512.01868 --concurrency 1   # one proposal at a time")
         sys.exit(1)
 
     arxiv_id = sys.argv[1]
     phase2_only = "--phase2-only" in sys.argv
+    # Resuming continues Phase 2 from its checkpoints, on the saved Phase 1 outputs
+    resume = "--resume" in sys.argv
+    max_concurrency = _option_value("--concurrency", 3)
 
-    if phase2_only:
+    if phase2_only or resume:
         # Load existing Phase 1 outputs and go directly to Phase 2
         print(f"\n{'='*60}")
         print(f"Loading Phase 1 outputs for {arxiv_id}")
@@ -207,7 +255,7 @@ def main():
             return
 
     # Run Phase 2
-    phase2_result = run_phase2(phase1_state)
+    phase2_result = run_phase2(phase1_state, max_concurrency=max_concurrency, resume=resume)
 
     # Print Phase 2 outputs
     proposals = phase2_result.get("proposals", [])
@@ -243,7 +291,12 @@ def main():
             f"- {p.get('iterations', 0)} iterations"
         )
 
-    print(f"\nFiles saved to papers/{arxiv_id}/")
+    print(f"\nPhase 1 files saved to papers/{arxiv_id}/")
+    print(f"Phase 2 outputs saved to {describe_store(arxiv_id)}")
+
+    cache = get_llm_cache()
+    if cache is not None:
+        print(f"LLM response cache: {cache.stats.as_dict()}")
 
 
 if __name__ == "__main__":
@@ -9,6 +9,7 @@ from .phase1 import GraphState
 from .phase2 import (
     Phase2State,
     Critique,
+    merge_critiques,
     ConsolidatedFeedback,
     QualityAssessment,
     # Pydantic models
@@ -27,6 +28,7 @@ __all__ = [
     # Phase 2 State
     "Phase2State",
     "Critique",
+    "merge_critiques",
     "ConsolidatedFeedback",
     "QualityAssessment",
     # Pydantic models
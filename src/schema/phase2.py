@@ -5,7 +5,6 @@ State for the Open Problem Formulation workflow, plus Pydantic models
 for structured LLM outputs.
 """
 
-import operator
 from typing import Annotated, List, Literal, NotRequired, TypedDict
 
 from pydantic import BaseModel, Field
@@ -18,11 +17,36 @@ from pydantic import BaseModel, Field
 class Critique(TypedDict):
     """Individual critique from a critic agent."""
     source: str  # Which critic agent produced this
+    iteration: int  # Brainstorm iteration (phase2_iteration) being critiqued
     issues: List[str]  # List of identified issues
     strengths: List[str]  # List of identified strengths
     suggestions: List[str]  # Suggested improvements
 
 
+def merge_critiques(existing: List[Critique], update: List[Critique]) -> List[Critique]:
+    """
+    Reducer for Phase2State.critiques: an iteration-scoped store.
+
+    - An empty update resets the store (the brainstormer sends one when it
+      starts a new iteration).
+    - Otherwise critiques are keyed by (iteration, source): a critique replaces
+      any earlier one with the same key, and once a critique for a newer
+      iteration arrives every older iteration is dropped.
+
+    The list therefore holds at most one critique per critic, so state and
+    checkpoint size stay constant across loop iterations.
+    """
+    if not update:
+        return []
+
+    merged = {(c.get("iteration", 0), c["source"]): c for c in (existing or [])}
+    for critique in update:
+        merged[(critique.get("iteration", 0), critique["source"])] = critique
+
+    latest = max(iteration for iteration, _ in merged)
+    return [c for (iteration, _), c in merged.items() if iteration == latest]
+
+
 class ConsolidatedFeedback(TypedDict):
     """Merged feedback from all critic agents."""
     critical_issues: List[str]  # Must-fix issues
@@ -82,8 +106,9 @@ class Phase2State(TypedDict):
     phase2_iteration: NotRequired[int]
     max_iterations: NotRequired[int]
 
-    # Critiques from parallel agents (using Annotated with operator.add for merging)
-    critiques: Annotated[List[Critique], operator.add]
+    # Critiques from parallel agents for the current iteration only
+    # (merge_critiques keys them by (iteration, source); [] resets)
+    critiques: Annotated[List[Critique], merge_critiques]
 
     # Consolidated feedback
     consolidated_feedback: NotRequired[ConsolidatedFeedback]
@@ -0,0 +1,569 @@
+"""
+Artifact store for per-paper pipeline outputs.
+
+Phase 2 nodes used to write each proposal, critique, decision and score
+sheet as its own file under ``papers/<arxiv_id>/step4_open_problems``. That
+is dozens of small files per proposal, and every write did its own mkdir.
+Nodes now hand their outputs to one store as Artifact records. Each record
+holds the structured data and the name of a renderer, and a node's
+artifacts are written together (one transaction on SQLite). Markdown is
+rendered only when an artifact is read or exported.
+
+Backends:
+- SQLiteArtifactStore: one table in a single file, one connection
+- JSONLArtifactStore:  append-only JSON lines; the last record for a path wins
+- FileArtifactStore:   renders straight to the old papers/<arxiv_id>/...
+  layout, as the nodes did before
+
+Writes happen off the node's hot path: save_artifacts() hands the batch to
+a background ArtifactWriter thread and returns. The writer merges whatever
+has queued up into one put(), syncs the store to disk every
+ARTIFACT_SYNC_INTERVAL seconds, and is flushed when a Phase 2 run completes
+and when the process exits. Its stats (queue depth, put and sync latency)
+are printed after Phase 2 and reported by bench_pipeline.
+
+export_layout() recreates the old directory layout from any store:
+    uv run python -m utils.artifacts export <arxiv_id> [--dest DIR]
+    uv run python -m utils.artifacts list <arxiv_id>
+    uv run python -m utils.artifacts show <arxiv_id> <path>
+
+Configuration (environment variables):
+- ARTIFACT_STORE        "sqlite" (default), "jsonl" or "files"
+- ARTIFACT_STORE_PATH   store file (default <project>/papers/artifacts.sqlite
+                        or papers/artifacts.jsonl)
+- ARTIFACT_WRITER       "background" (default) or "sync" to write inside the node
+- ARTIFACT_SYNC_INTERVAL  seconds between fsyncs of the store (default 1.0)
+- ARTIFACT_MAX_BATCH    most artifacts merged into one put (default 256)
+"""
+
+import argparse
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence, TextIO
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+PAPERS_DIR = BASE_DIR / "papers"
+
+Renderer = Callable[[Any], str]
+_RENDERERS: Dict[str, Renderer] = {
+    "text": str,
+    "json": lambda data: json.dumps(data, indent=2),
+}
+
+
+def register_renderer(name: str) -> Callable[[Renderer], Renderer]:
+    """Decorator registering a function that turns artifact data into file content."""
+    def decorator(fn: Renderer) -> Renderer:
+        _RENDERERS[name] = fn
+        return fn
+    return decorator
+
+
+def render(renderer: str, data: Any) -> str:
+    if renderer not in _RENDERERS:
+        # Node modules register their markdown renderers on import
+        import nodes.phase2  # noqa: F401
+    return _RENDERERS[renderer](data)
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """One output file's worth of data, stored unrendered."""
+    arxiv_id: str
+    path: str  # relative to papers/<arxiv_id>, e.g. "step4_open_problems/proposal_1/summary.md"
+    renderer: str
+    data: Any
+    created_at: float = field(default_factory=time.time)
+
+    def render(self) -> str:
+        return render(self.renderer, self.data)
+
+
+class ArtifactStore(ABC):
+    """Where nodes put their outputs; put() writes a batch as one unit."""
+
+    @abstractmethod
+    def put(self, artifacts: Sequence[Artifact]) -> None: ...
+
+    @abstractmethod
+    def list(self, arxiv_id: str, prefix: str = "") -> List[Artifact]:
+        """Latest artifact per path for a paper, ordered by path."""
+
+    def get(self, arxiv_id: str, path: str) -> Artifact | None:
+        return next((a for a in self.list(arxiv_id, path) if a.path == path), None)
+
+    def read(self, arxiv_id: str, path: str) -> str | None:
+        """Rendered content of one artifact, or None if it does not exist."""
+        artifact = self.get(arxiv_id, path)
+        return artifact.render() if artifact is not None else None
+
+    def sync(self) -> None:
+        """Force what put() wrote out to disk."""
+
+    def size_bytes(self) -> int:
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteArtifactStore(ArtifactStore):
+    """All papers' artifacts in one SQLite file."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Commits skip the fsync; sync() checkpoints the log into the database instead
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            " arxiv_id TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " renderer TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (arxiv_id, path))"
+        )
+        self._conn.commit()
+
+    def put(self, artifacts: Sequence[Artifact]) -> None:
+        rows = [
+            (a.arxiv_id, a.path, a.renderer, json.dumps(a.data, ensure_ascii=False), a.created_at)
+            for a in artifacts
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO artifacts (arxiv_id, path, renderer, data, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def list(self, arxiv_id: str, prefix: str = "") -> List[Artifact]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, renderer, data, created_at FROM artifacts"
+                " WHERE arxiv_id = ? AND substr(path, 1, ?) = ? ORDER BY path",
+                (arxiv_id, len(prefix), prefix),
+            ).fetchall()
+        return [Artifact(arxiv_id, path, renderer, json.loads(data), created_at)
+                for path, renderer, data, created_at in rows]
+
+    def sync(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.path.parent.glob(self.path.name + "*"))
+
+    def close(self) -> None:
+        with self._lock:
+            # Fold the write-ahead log back in, so the store is one file again
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.close()
+
+
+class JSONLArtifactStore(ArtifactStore):
+    """Append-only log of artifacts; a batch is appended with a single write."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file: TextIO | None = None
+
+    def put(self, artifacts: Sequence[Artifact]) -> None:
+        lines = "".join(
+            json.dumps({
+                "arxiv_id": a.arxiv_id,
+                "path": a.path,
+                "renderer": a.renderer,
+                "data": a.data,
+                "created_at": a.created_at,
+            }, ensure_ascii=False) + "\n"
+            for a in artifacts
+        )
+        with self._lock:
+            if self._file is None:
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.write(lines)
+            self._file.flush()
+
+    def list(self, arxiv_id: str, prefix: str = "") -> List[Artifact]:
+        latest: Dict[str, Artifact] = {}
+        if self.path.exists():
+            with self._lock, self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record["arxiv_id"] == arxiv_id and record["path"].startswith(prefix):
+                        latest[record["path"]] = Artifact(**record)
+        return [latest[path] for path in sorted(latest)]
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+
+    def size_bytes(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class FileArtifactStore(ArtifactStore):
+    """The original layout: each artifact rendered to papers/<arxiv_id>/<path> on put."""
+
+    def __init__(self, root: Path | str = PAPERS_DIR):
+        self.root = Path(root)
+
+    def put(self, artifacts: Sequence[Artifact]) -> None:
+        for artifact in artifacts:
+            target = self.root / artifact.arxiv_id / artifact.path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(artifact.render(), encoding="utf-8")
+
+    def list(self, arxiv_id: str, prefix: str = "") -> List[Artifact]:
+        base = self.root / arxiv_id
+        if not base.exists():
+            return []
+        found = []
+        for target in sorted(p for p in base.rglob("*") if p.is_file()):
+            path = target.relative_to(base).as_posix()
+            if path.startswith(prefix):
+                # Files hold rendered content, so they read back as text
+                found.append(Artifact(arxiv_id, path, "text", target.read_text(encoding="utf-8"),
+                                      target.stat().st_mtime))
+        return found
+
+
+def export_layout(store: ArtifactStore, arxiv_id: str, root: Path | str = PAPERS_DIR) -> List[Path]:
+    """Render every artifact of a paper to <root>/<arxiv_id>/<path>; returns the files written."""
+    written = []
+    for artifact in store.list(arxiv_id):
+        target = Path(root) / arxiv_id / artifact.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(artifact.render(), encoding="utf-8")
+        written.append(target)
+    return written
+
+
+@dataclass
+class WriterStats:
+    """Counters for reports and benchmarks."""
+    submitted: int = 0
+    written: int = 0
+    failed: int = 0
+    queue_depth: int = 0       # artifacts handed over but not yet put
+    queue_depth_peak: int = 0
+    puts: int = 0
+    put_s: float = 0.0
+    put_s_max: float = 0.0
+    syncs: int = 0
+    sync_s: float = 0.0
+    sync_s_max: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        for name in ("put_s", "put_s_max", "sync_s", "sync_s_max"):
+            stats[name] = round(stats[name], 4)
+        return stats
+
+
+class _Flush:
+    """Queue marker: sync the store (unless sync is False), then wake the thread waiting in flush()."""
+
+    def __init__(self, sync: bool = True):
+        self.sync = sync
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class ArtifactWriter:
+    """
+    Background thread that writes artifact batches to a store.
+
+    submit() only enqueues, so nodes never wait on disk. The thread merges
+    everything queued at the time (up to max_batch artifacts) into one
+    put(), and syncs the store at most every sync_interval seconds while
+    there are unsynced writes. flush() blocks until everything submitted
+    before it is put and synced (only put with sync=False, leaving the
+    fsync to the timer), and re-raises a failed put.
+    """
+
+    def __init__(self, store: ArtifactStore, sync_interval: float = 1.0, max_batch: int = 256):
+        self.store = store
+        self.sync_interval = sync_interval
+        self.max_batch = max(1, max_batch)
+        self.stats = WriterStats()
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    def submit(self, artifacts: Sequence[Artifact]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+                self._thread.start()
+            self.stats.submitted += len(artifacts)
+            self.stats.queue_depth += len(artifacts)
+            self.stats.queue_depth_peak = max(self.stats.queue_depth_peak, self.stats.queue_depth)
+        self._queue.put(list(artifacts))
+
+    def flush(self, sync: bool = True) -> None:
+        """Wait until every artifact submitted so far is put (and, with sync, synced)."""
+        with self._lock:
+            running = self._thread is not None
+        if running:
+            marker = _Flush(sync)
+            self._queue.put(marker)
+            marker.done.wait()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def stop(self) -> None:
+        """Flush and end the thread (the store stays open)."""
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(_STOP)
+                thread.join()
+
+    def _run(self) -> None:
+        dirty_since: float | None = None
+        while True:
+            timeout = None if dirty_since is None else max(0.0, dirty_since + self.sync_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            batch: List[Artifact] = []
+            markers: List[_Flush] = []
+            stop = False
+            while item is not None:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    batch.extend(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+
+            if batch:
+                self._put(batch)
+                if dirty_since is None:
+                    dirty_since = time.monotonic()
+            due = dirty_since is not None and time.monotonic() - dirty_since >= self.sync_interval
+            if dirty_since is not None and (due or stop or any(marker.sync for marker in markers)):
+                self._sync()
+                dirty_since = None
+            for marker in markers:
+                marker.done.set()
+            if stop:
+                return
+
+    def _put(self, batch: List[Artifact]) -> None:
+        start = time.perf_counter()
+        try:
+            self.store.put(batch)
+        except Exception as e:
+            print(f"  > Artifact writer: failed to write {len(batch)} artifacts: {e}")
+            self._error = e
+            written = False
+        else:
+            written = True
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats.queue_depth -= len(batch)
+            self.stats.puts += 1
+            self.stats.put_s += elapsed
+            self.stats.put_s_max = max(self.stats.put_s_max, elapsed)
+            if written:
+                self.stats.written += len(batch)
+            else:
+                self.stats.failed += len(batch)
+
+    def _sync(self) -> None:
+        start = time.perf_counter()
+        try:
+            self.store.sync()
+        except Exception as e:
+            print(f"  > Artifact writer: failed to sync the store: {e}")
+            self._error = e
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats.syncs += 1
+            self.stats.sync_s += elapsed
+            self.stats.sync_s_max = max(self.stats.sync_s_max, elapsed)
+
+
+_store: ArtifactStore | None = None
+_writer: ArtifactWriter | None = None
+_owns_store = False  # opened here from the environment, so closed here too
+_store_lock = threading.Lock()
+
+
+def _store_from_env() -> ArtifactStore:
+    backend = os.getenv("ARTIFACT_STORE", "sqlite").lower()
+    if backend == "files":
+        return FileArtifactStore()
+    if backend == "jsonl":
+        return JSONLArtifactStore(os.getenv("ARTIFACT_STORE_PATH", str(PAPERS_DIR / "artifacts.jsonl")))
+    if backend == "sqlite":
+        return SQLiteArtifactStore(os.getenv("ARTIFACT_STORE_PATH", str(PAPERS_DIR / "artifacts.sqlite")))
+    raise ValueError(f"ARTIFACT_STORE must be sqlite, jsonl or files, got {backend!r}")
+
+
+def _get_store_locked() -> ArtifactStore:
+    global _store, _writer, _owns_store
+    if _store is None:
+        _store = _store_from_env()
+        _owns_store = True
+        if os.getenv("ARTIFACT_WRITER", "background").lower() != "sync":
+            _writer = ArtifactWriter(
+                _store,
+                sync_interval=float(os.getenv("ARTIFACT_SYNC_INTERVAL", "1.0")),
+                max_batch=int(os.getenv("ARTIFACT_MAX_BATCH", "256")),
+            )
+    return _store
+
+
+def describe_store(arxiv_id: str, store: ArtifactStore | None = None) -> str:
+    """Where a paper's artifacts are, for messages to the user."""
+    store = store or get_artifact_store()
+    if isinstance(store, FileArtifactStore):
+        return f"{store.root / arxiv_id}/"
+    location = getattr(store, "path", type(store).__name__)
+    return f"{location} (export with: python -m utils.artifacts export {arxiv_id})"
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the process-wide store (configured from env on first use)."""
+    with _store_lock:
+        return _get_store_locked()
+
+
+def set_artifact_store(store: ArtifactStore | None, background: bool = True) -> None:
+    """
+    Install a store explicitly (None re-reads the environment on next use).
+
+    Anything still queued for the previous store is written first. A store
+    installed here is never closed here; whoever installed it owns it.
+    """
+    global _store, _writer
+    with _store_lock:
+        _release_locked()
+        _store = store
+        _writer = ArtifactWriter(store) if store is not None and background else None
+
+
+def save_artifacts(artifacts: Iterable[Artifact]) -> None:
+    """Hand one node's artifacts to the writer (or the store) as a single batch."""
+    batch = list(artifacts)
+    if not batch:
+        return
+    with _store_lock:
+        store, writer = _get_store_locked(), _writer
+    if writer is not None:
+        writer.submit(batch)
+    else:
+        store.put(batch)
+
+
+def flush_artifacts(sync: bool = True) -> None:
+    """
+    Block until every artifact saved so far is in the store and synced.
+
+    With sync=False only the put is waited for; the fsync is left to the
+    writer's sync_interval timer and the next full flush.
+    """
+    with _store_lock:
+        writer = _writer
+    if writer is not None:
+        writer.flush(sync)
+
+
+def artifact_writer_stats() -> Dict[str, Any] | None:
+    """Writer counters (queue depth, put/sync latency), or None when writing inline."""
+    with _store_lock:
+        writer = _writer
+    return writer.stats.as_dict() if writer is not None else None
+
+
+def _release_locked() -> None:
+    global _store, _writer, _owns_store
+    try:
+        if _writer is not None:
+            _writer.stop()
+    finally:
+        if _owns_store and _store is not None:
+            _store.close()
+        _store, _writer, _owns_store = None, None, False
+
+
+@atexit.register
+def _shutdown() -> None:
+    with _store_lock:
+        try:
+            _release_locked()
+        except Exception as e:
+            print(f"Artifact writer: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or export stored pipeline artifacts")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write the old papers/<arxiv_id>/... layout")
+    export.add_argument("arxiv_id")
+    export.add_argument("--dest", type=Path, default=PAPERS_DIR)
+    listing = commands.add_parser("list", help="list a paper's artifacts")
+    listing.add_argument("arxiv_id")
+    show = commands.add_parser("show", help="print one artifact, rendered")
+    show.add_argument("arxiv_id")
+    show.add_argument("path")
+    args = parser.parse_args()
+
+    store = get_artifact_store()
+    if args.command == "export":
+        written = export_layout(store, args.arxiv_id, args.dest)
+        print(f"Exported {len(written)} files to {Path(args.dest) / args.arxiv_id}")
+    elif args.command == "list":
+        for artifact in store.list(args.arxiv_id):
+            print(artifact.path)
+    else:
+        content = store.read(args.arxiv_id, args.path)
+        if content is None:
+            parser.error(f"no artifact {args.path!r} for {args.arxiv_id}")
+        print(content, end="")
+
+
+if __name__ == "__main__":
+    # Node renderers register with utils.artifacts, not with this __main__ copy
+    from utils.artifacts import main
+    main()
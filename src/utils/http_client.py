@@ -0,0 +1,182 @@
+"""
+Shared HTTP transport for all LLM calls.
+
+Every OpenRouter request goes through one pooled, keep-alive httpx client so
+that a Phase 2 run (40+ calls per proposal) pays the TCP+TLS handshake once
+per connection instead of once per call. HTTP/2 is used when the optional
+``h2`` package is installed (``httpx[http2]``), which lets the parallel critics
+multiplex over a single connection.
+
+An ``httpx.AsyncClient`` twin (one per event loop) backs the async node
+variants, so a single process can keep hundreds of LLM calls in flight
+without a thread per call.
+
+post_stream / apost_stream keep the response open so server-sent events
+(``"stream": true`` completions) can be consumed as they arrive.
+
+Pool limits can be tuned through environment variables:
+- LLM_HTTP_MAX_CONNECTIONS   (default 20)
+- LLM_HTTP_MAX_KEEPALIVE     (default 10)
+- LLM_HTTP_KEEPALIVE_EXPIRY  (seconds, default 60)
+- LLM_HTTP_TIMEOUT           (seconds, default 180)
+- LLM_HTTP2                  ("0" to force HTTP/1.1)
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator
+
+import httpx
+
+DEFAULT_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "180"))
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+# AsyncClient connections are bound to the loop that opened them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_available() -> bool:
+    if os.getenv("LLM_HTTP2", "1") == "0":
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def pool_limits() -> httpx.Limits:
+    """Connection pool limits, read from the environment."""
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60")),
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        with _client_lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.Client(
+                    http2=_http2_available(),
+                    limits=pool_limits(),
+                    timeout=DEFAULT_TIMEOUT,
+                )
+    return _client
+
+
+def close_http_client() -> None:
+    """Close the shared client and drop its pooled connections."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+atexit.register(close_http_client)
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the pooled async client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=_http2_available(),
+            limits=pool_limits(),
+            timeout=DEFAULT_TIMEOUT,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_http_client() -> None:
+    """Close the async client owned by the running event loop, if any."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _auth_headers(api_key: str) -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+
+
+def post_json(
+    url: str,
+    payload: Dict[str, Any],
+    api_key: str,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> httpx.Response:
+    """POST a JSON payload with bearer auth over the shared client."""
+    return get_http_client().post(
+        url,
+        headers=_auth_headers(api_key),
+        json=payload,
+        timeout=timeout,
+    )
+
+
+async def apost_json(
+    url: str,
+    payload: Dict[str, Any],
+    api_key: str,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> httpx.Response:
+    """Async counterpart of post_json."""
+    return await get_async_http_client().post(
+        url,
+        headers=_auth_headers(api_key),
+        json=payload,
+        timeout=timeout,
+    )
+
+
+@contextmanager
+def post_stream(
+    url: str,
+    payload: Dict[str, Any],
+    api_key: str,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Iterator[httpx.Response]:
+    """POST like post_json but yield the response before its body is read."""
+    with get_http_client().stream(
+        "POST",
+        url,
+        headers=_auth_headers(api_key),
+        json=payload,
+        timeout=timeout,
+    ) as response:
+        yield response
+
+
+@asynccontextmanager
+async def apost_stream(
+    url: str,
+    payload: Dict[str, Any],
+    api_key: str,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> AsyncIterator[httpx.Response]:
+    """Async counterpart of post_stream."""
+    async with get_async_http_client().stream(
+        "POST",
+        url,
+        headers=_auth_headers(api_key),
+        json=payload,
+        timeout=timeout,
+    ) as response:
+        yield response
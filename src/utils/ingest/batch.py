@@ -0,0 +1,197 @@
+"""
+Batch ingestion of many arXiv papers.
+
+pipeline() handles one paper at a time. ingest_batch() runs the same steps
+for a list of ids:
+- downloads run on a thread pool (``concurrency`` at once), and every
+  request waits its turn at a per-host rate limiter, so arXiv sees at most
+  one request per ``min_interval`` seconds; sources already in the local
+  source store (see fetch_papers) make no request at all
+- as each download finishes, the CPU-bound part (inlining, bibliography,
+  cleaning) is handed to a process pool, so it overlaps the downloads
+- a failure is recorded for that paper and the batch carries on
+
+The result is a manifest with per-paper status, error and timings, also
+written as JSON.
+
+Usage (from src/):
+    uv run python -m utils.ingest.batch 2601.03006 2601.09704
+    uv run python -m utils.ingest.batch --file ids.txt --concurrency 4 --workers 4 --manifest manifest.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+from urllib.parse import urlsplit
+
+from .fetch_papers import PAPERS_DIR, fetch_arxiv_source
+from .ingestion_pipeline import REPORT_NAME, process_paper
+
+# arXiv asks automated clients for no more than one request every 3 seconds
+DEFAULT_MIN_INTERVAL = float(os.getenv("ARXIV_MIN_INTERVAL", "3.0"))
+DEFAULT_MANIFEST = PAPERS_DIR / "ingest_manifest.json"
+# Workers start while download threads run: forking then could copy a lock
+# one of them holds, so they come from a fresh interpreter instead
+PROCESS_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least ``min_interval`` seconds apart."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        host = urlsplit(url).netloc
+        with self._lock:
+            # Reserve the next free slot for this host, then sleep outside the lock
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class _InlineExecutor(Executor):
+    """Runs submitted work in the calling thread (workers=0)."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def _process(working_dir: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    output = Path(working_dir) / "step1_ingest" / "processed.tex"
+    content = process_paper(Path(working_dir))
+    report = json.loads((output.parent / REPORT_NAME).read_text(encoding="utf-8"))
+    # Only the size travels back; the text itself is already on disk
+    return {
+        "chars": len(content),
+        "tokens_before": report["tokens_before"],
+        "tokens_after": report["tokens_after"],
+        "output": str(output),
+        "process_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def read_ids(path: Path) -> List[str]:
+    """arXiv ids from a file: one per line, blank lines and ``#`` comments ignored."""
+    ids = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            ids.append(line)
+    return ids
+
+
+def ingest_batch(
+    arxiv_ids: Iterable[str],
+    concurrency: int = 4,
+    workers: int | None = None,
+    min_interval: float = DEFAULT_MIN_INTERVAL,
+    out_dir: Path = PAPERS_DIR,
+    manifest_path: Path | None = DEFAULT_MANIFEST,
+) -> Dict[str, Any]:
+    """
+    Download and process every id; returns (and writes) the manifest.
+
+    Args:
+        arxiv_ids: Papers to ingest (duplicates are ingested once)
+        concurrency: Downloads in flight at once
+        workers: Processes for cleaning (None = CPU count, 0 = in this process)
+        min_interval: Seconds between requests to the same host
+        out_dir: Where paper directories are created
+        manifest_path: JSON file for the manifest (None = do not write one)
+    """
+    ids = list(dict.fromkeys(arxiv_ids))
+    limiter = HostRateLimiter(min_interval)
+    entries: Dict[str, Dict[str, Any]] = {arxiv_id: {"arxiv_id": arxiv_id, "status": "pending"} for arxiv_id in ids}
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+
+    def download(arxiv_id: str) -> Path:
+        began = time.perf_counter()
+        try:
+            return fetch_arxiv_source(arxiv_id, out_dir, before_request=limiter.wait)
+        finally:
+            entries[arxiv_id]["download_s"] = round(time.perf_counter() - began, 3)
+
+    processes = _InlineExecutor() if workers == 0 else ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context(PROCESS_START_METHOD)
+    )
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="ingest") as downloads, processes:
+        pending = {downloads.submit(download, arxiv_id): arxiv_id for arxiv_id in ids}
+        processing: Dict[Future, str] = {}
+        for future in as_completed(pending):
+            arxiv_id = pending[future]
+            try:
+                working_dir = future.result()
+            except Exception as e:
+                entries[arxiv_id].update(status="failed", stage="download", error=f"{type(e).__name__}: {e}")
+                continue
+            processing[processes.submit(_process, str(working_dir))] = arxiv_id
+
+        for future in as_completed(processing):
+            arxiv_id = processing[future]
+            try:
+                entries[arxiv_id].update(status="ok", **future.result())
+            except Exception as e:
+                entries[arxiv_id].update(status="failed", stage="process", error=f"{type(e).__name__}: {e}")
+
+    papers = [entries[arxiv_id] for arxiv_id in ids]
+    manifest = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "wall_s": round(time.perf_counter() - start, 3),
+        "succeeded": sum(p["status"] == "ok" for p in papers),
+        "failed": sum(p["status"] == "failed" for p in papers),
+        "papers": papers,
+    }
+    if manifest_path is not None:
+        manifest_path = Path(manifest_path)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest many arXiv papers at once")
+    parser.add_argument("ids", nargs="*", help="arXiv ids")
+    parser.add_argument("--file", type=Path, action="append", default=[], help="file with one arXiv id per line")
+    parser.add_argument("--concurrency", type=int, default=4, help="downloads in flight at once")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for cleaning (default: CPU count, 0 = in this process)")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL,
+                        help="seconds between requests to the same host")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    args = parser.parse_args()
+
+    ids = list(args.ids)
+    for path in args.file:
+        ids += read_ids(path)
+    if not ids:
+        parser.error("no arXiv ids given")
+
+    manifest = ingest_batch(ids, args.concurrency, args.workers, args.min_interval, manifest_path=args.manifest)
+    for paper in manifest["papers"]:
+        if paper["status"] == "failed":
+            print(f"  FAILED {paper['arxiv_id']} ({paper['stage']}): {paper['error']}")
+    print(f"Ingested {manifest['succeeded']}/{len(manifest['papers'])} papers in {manifest['wall_s']}s "
+          f"(manifest: {args.manifest})")
+
+
+if __name__ == "__main__":
+    main()
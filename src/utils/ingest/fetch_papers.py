@@ -1,32 +1,232 @@
-import io
+"""
+Download and unpack arXiv e-print sources.
+
+Downloads go through a local source store, so re-ingesting a paper does not
+fetch it again:
+- each tarball is stored once, named by its SHA-256 (``objects/ab/abcd...``)
+- an index entry per arXiv id records the object, ETag and Last-Modified
+- a versioned id (``2601.03006v2``) never changes on arXiv, so once stored
+  it is served without touching the network
+- an unversioned id follows the latest version; it is revalidated with a
+  conditional GET (If-None-Match / If-Modified-Since) at most every
+  ARXIV_SOURCE_REVALIDATE seconds, and a 304 reuses the stored object
+- if revalidation fails (offline, arXiv down) the stored object is used
+
+Nothing is held in memory: the response is streamed to disk in chunks
+(hashed on the way), and the tarball is read as a stream (``r|*``). Only
+the files the ingest pipeline reads (SOURCE_EXTENSIONS) are extracted, so
+figures and PDFs are skipped. The extracted directory remembers which
+object it came from, so an unchanged source is not extracted again.
+
+Configuration (environment variables):
+- ARXIV_EPRINT_URL           e-print endpoint (default https://arxiv.org/e-print)
+- ARXIV_SOURCE_CACHE         store directory (default <project>/.cache/arxiv_sources),
+                             "off" to download every time
+- ARXIV_SOURCE_REVALIDATE    seconds before an unversioned id is checked again (default 86400)
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
 import tarfile
+import tempfile
+import time
 from pathlib import Path
+from typing import Any, Callable, Dict
 
 import requests
 
 BASE_DIR = Path(__file__).resolve().parents[3]   # project root (math-conjecturer/)
 PAPERS_DIR = BASE_DIR / "papers"
+ARXIV_EPRINT_URL = os.getenv("ARXIV_EPRINT_URL", "https://arxiv.org/e-print")
+DEFAULT_SOURCE_CACHE = BASE_DIR / ".cache" / "arxiv_sources"
 
-def fetch_arxiv_source(arxiv_id: str, out_dir=PAPERS_DIR) -> Path:
-    url = f"https://arxiv.org/e-print/{arxiv_id}"
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
+# Written into the extracted directory: the object it was extracted from
+SOURCE_MARKER = ".source_sha256"
+
+# Tarball members worth extracting; figures, PDFs and data files are skipped
+SOURCE_EXTENSIONS = frozenset({".tex", ".bbl", ".bib", ".sty", ".cls"})
+CHUNK_SIZE = 1 << 16
+
+_VERSIONED_ID = re.compile(r"v\d+$")
+
+
+def source_cache_dir() -> Path | None:
+    """Source store location, or None when caching is off."""
+    location = os.getenv("ARXIV_SOURCE_CACHE", str(DEFAULT_SOURCE_CACHE))
+    return None if location.lower() == "off" else Path(location)
+
+
+def _index_path(cache: Path, arxiv_id: str) -> Path:
+    # Old-style ids contain a slash (math/0601001)
+    return cache / "index" / f"{arxiv_id.replace('/', '_')}.json"
+
+
+def _object_path(cache: Path, sha256: str) -> Path:
+    return cache / "objects" / sha256[:2] / sha256
+
+
+def _read_index(cache: Path, arxiv_id: str) -> Dict[str, Any] | None:
+    path = _index_path(cache, arxiv_id)
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    # An index entry whose object is gone is as good as none
+    return entry if _object_path(cache, entry["sha256"]).exists() else None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
 
-    out = Path(out_dir) / arxiv_id
-    out.mkdir(parents=True, exist_ok=True)
 
-    content = io.BytesIO(r.content)
+def _save_stream(response: requests.Response, path: Path) -> tuple[str, int]:
+    """Write a streamed response body to ``path``; returns (sha256, size)."""
+    digest, size = hashlib.sha256(), 0
+    with path.open("wb") as f:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+            f.write(chunk)
+    return digest.hexdigest(), size
 
+
+def _store(cache: Path, arxiv_id: str, response: requests.Response) -> Dict[str, Any]:
+    objects = cache / "objects"
+    objects.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=objects, prefix="download.")
+    os.close(fd)
+    try:
+        sha256, size = _save_stream(response, Path(tmp))
+        target = _object_path(cache, sha256)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    entry = {
+        "arxiv_id": arxiv_id,
+        "sha256": sha256,
+        "size": size,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "checked_at": time.time(),
+    }
+    _write_atomic(_index_path(cache, arxiv_id), json.dumps(entry, indent=2).encode("utf-8"))
+    return entry
+
+
+def _is_fresh(arxiv_id: str, entry: Dict[str, Any]) -> bool:
+    if _VERSIONED_ID.search(arxiv_id):
+        return True
+    max_age = float(os.getenv("ARXIV_SOURCE_REVALIDATE", "86400"))
+    return time.time() - entry.get("checked_at", 0) < max_age
+
+
+def download_arxiv_source(arxiv_id: str, before_request: Callable[[str], None] | None = None) -> Path:
+    """
+    Path of the stored e-print for ``arxiv_id``, downloading it only if needed.
+
+    before_request is called with the URL just before any request is made
+    (batch ingestion uses it for per-host rate limiting).
+    """
+    cache = source_cache_dir()
+    if cache is None:
+        raise ValueError("ARXIV_SOURCE_CACHE is off")
+
+    entry = _read_index(cache, arxiv_id)
+    if entry is not None and _is_fresh(arxiv_id, entry):
+        return _object_path(cache, entry["sha256"])
+
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    url = f"{ARXIV_EPRINT_URL}/{arxiv_id}"
     try:
-        with tarfile.open(fileobj=content, mode="r:*") as tar:
-            tar.extractall(path=out, filter="data")
-            return out
+        if before_request is not None:
+            before_request(url)
+        with requests.get(url, headers=headers, timeout=30, stream=True) as r:
+            if r.status_code == 304 and entry is not None:
+                entry["checked_at"] = time.time()
+                _write_atomic(_index_path(cache, arxiv_id), json.dumps(entry, indent=2).encode("utf-8"))
+                return _object_path(cache, entry["sha256"])
+            r.raise_for_status()
+            entry = _store(cache, arxiv_id, r)
+    except requests.RequestException as e:
+        if entry is None:
+            raise
+        print(f"Could not revalidate {arxiv_id} ({e}); using the stored source")
+    return _object_path(cache, entry["sha256"])
+
+
+def _extract(source: Path, out: Path) -> None:
+    extracted = skipped = 0
+    try:
+        # Stream mode reads the archive front to back, one member at a time
+        with tarfile.open(source, mode="r|*") as tar:
+            for member in tar:
+                if member.isfile() and Path(member.name).suffix.lower() in SOURCE_EXTENSIONS:
+                    tar.extract(member, path=out, filter="data")
+                    extracted += 1
+                elif member.isfile():
+                    skipped += 1
     except tarfile.ReadError:
-        # Not a tarball → single-file LaTeX
-        (out / "main.tex").write_bytes(r.content)
+        # Not a tarball → single-file LaTeX, usually gzipped on its own
+        with source.open("rb") as f:
+            gzipped = f.read(2) == b"\x1f\x8b"
+        with (gzip.open(source) if gzipped else source.open("rb")) as src, (out / "main.tex").open("wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        return
+    print(f"Extracted {extracted} source files to {out} (skipped {skipped} figures and other files)")
+
+
+def fetch_arxiv_source(
+    arxiv_id: str,
+    out_dir=PAPERS_DIR,
+    before_request: Callable[[str], None] | None = None,
+) -> Path:
+    out = Path(out_dir) / arxiv_id
+    out.mkdir(parents=True, exist_ok=True)
+
+    if source_cache_dir() is None:
+        # Not from the store: nothing to tie this extraction to
+        (out / SOURCE_MARKER).unlink(missing_ok=True)
+        url = f"{ARXIV_EPRINT_URL}/{arxiv_id}"
+        if before_request is not None:
+            before_request(url)
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "eprint"
+            with requests.get(url, timeout=30, stream=True) as r:
+                r.raise_for_status()
+                _save_stream(r, source)
+            _extract(source, out)
+        return out
+
+    source = download_arxiv_source(arxiv_id, before_request)
+    marker = out / SOURCE_MARKER
+    if marker.exists() and marker.read_text(encoding="utf-8").strip() == source.name:
+        # Already extracted from this exact object
         return out
+    _extract(source, out)
+    marker.write_text(source.name, encoding="utf-8")
+    return out
 
 
 if __name__=="__main__":
 
-   print(type(fetch_arxiv_source("2601.03006")))
\ No newline at end of file
+   print(type(fetch_arxiv_source("2601.03006")))
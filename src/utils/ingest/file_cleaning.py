@@ -2,6 +2,7 @@ import re
 from pathlib import Path
 
 from .find_mainTeX_and_bbls import find_main_tex
+from .macro_definitions import find_macro_definitions
 
 '''
 Line Based Commands
@@ -85,10 +86,8 @@ ENVIRONMENTS_TO_FLATTEN = [
     Unused Macros
 '''
 
-MACRO_DEF_RE = re.compile(
-    r'\\(newcommand|renewcommand|def|DeclareMathOperator)\s*\{\\([A-Za-z@]+)\}',
-    re.MULTILINE,
-)
+# A control word ends at the first non-letter: \eps_1 and \x1 use \eps and \x
+CONTROL_WORD_RE = re.compile(r'\\([A-Za-z@]+)')
 
 
 
@@ -132,24 +131,43 @@ def flatten_layout_environments(tex: str) -> str:
     return tex
 
 
+# Drops definitions of macros the document never uses. A macro only used in
+# the bodies of unused macros is unused too.
 def remove_unused_macros(tex: str) -> str:
-    defs = MACRO_DEF_RE.findall(tex)
-    defined = {name for _, name in defs}
-
-    # remove macro definitions before checking usage
-    tex_wo_defs = MACRO_DEF_RE.sub('', tex)
-
-    used = set(re.findall(r'\\([A-Za-z@]+)\b', tex_wo_defs))
-    unused = defined - used
+    defs = find_macro_definitions(tex)
+    if not defs:
+        return tex
+
+    used = set()
+    uses_in_body = {}   # name -> names used in its definitions
+    i = 0
+    for match in CONTROL_WORD_RE.finditer(tex):
+        pos = match.start()
+        while i < len(defs) and defs[i][2] <= pos:
+            i += 1
+        if i < len(defs) and defs[i][0] <= pos:
+            _, body_start, _, name = defs[i]
+            if pos >= body_start:
+                uses_in_body.setdefault(name, set()).add(match.group(1))
+            continue
+        used.add(match.group(1))
 
-    for name in unused:
-        tex = re.sub(
-            rf'\\(newcommand|renewcommand|def|DeclareMathOperator)\s*\{{\\{name}\}}.*',
-            '',
-            tex,
-        )
+    reachable = set()
+    pending = list(used)
+    while pending:
+        name = pending.pop()
+        if name not in reachable:
+            reachable.add(name)
+            pending.extend(uses_in_body.get(name, ()))
 
-    return tex
+    out = []
+    pos = 0
+    for start, _, end, name in defs:
+        if name not in reachable:
+            out.append(tex[pos:start])
+            pos = end
+    out.append(tex[pos:])
+    return ''.join(out)
 
 
 def normalize_whitespace(tex: str) -> str:
@@ -158,8 +176,140 @@ def normalize_whitespace(tex: str) -> str:
     return tex.strip() + "\n"
 
 
+'''
+    Single-pass cleaning
+
+    The functions above each rescan the whole document (remove_regex_junk
+    once per pattern). clean_latex makes two scans instead: one regex
+    removes comments and junk lines together, one combined alternation
+    removes the layout, colour and box commands and finds the environments
+    to flatten. Its output is byte-identical to clean_latex_multipass.
+    The passes above run one after the other, so a removal can change what
+    a later pattern sees: nested junk (\\mbox{\\vspace{1em}}), text
+    that joins into a new command, \\par losing its word boundary. When a
+    document has any of those, or line breaks other than \\n and \\r\\n
+    (which splitlines treats specially), the scan falls back to the
+    original passes for that stage.
+'''
+
+_JUNK_LINE_PREFIXES = METADATA_PREFIXES + LAYOUT_LINE_PREFIXES + FONT_SIZE_PREFIXES
+
+LINE_PASS_RE = re.compile(
+    r'^[^\S\n]*(?:' + '|'.join(re.escape(p) for p in _JUNK_LINE_PREFIXES) + r')[^\n]*(?:\n|\Z)'
+    r'|(?<!\\)%[^\n]*',
+    re.MULTILINE,
+)
+
+# Line boundaries for str.splitlines besides \n (\r\n is normalised first)
+UNUSUAL_LINE_BREAK_RE = re.compile('[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]')
+
+_JUNK_PATTERNS = LAYOUT_REGEX + COLOR_REGEX + BOX_REGEX
+assert all(pat.startswith('\\\\') for pat in _JUNK_PATTERNS)
+# Patterns ending in \b: a removal right after them can change whether they match
+_BOUNDARY_PATTERNS = {i for i, pat in enumerate(_JUNK_PATTERNS) if pat.endswith(r'\b')}
+
+# Every pattern starts with a backslash; keeping it outside the alternation
+# lets the scan jump from one backslash to the next
+LAYOUT_PASS_RE = re.compile(
+    r'\\(?:'
+    + '|'.join(f'(?P<j{i}>{pat[2:]})' for i, pat in enumerate(_JUNK_PATTERNS))
+    + r'|(?P<env>(?P<side>begin|end)\{(?P<name>' + '|'.join(ENVIRONMENTS_TO_FLATTEN) + r')\}))',
+    re.DOTALL,
+)
+
+# Where any junk pattern or environment token could start
+JUNK_START_RE = re.compile(
+    r'\\(?:' + '|'.join(re.match(r'\\\\(\([^)]*\)|[A-Za-z]+)', pat).group(1) for pat in _JUNK_PATTERNS)
+    + r'|(?:begin|end)\{)'
+)
+
+# A control word (or environment name) cut off by a removal, which the text after it could complete
+_OPEN_COMMAND_RE = re.compile(r'\\(?:(?:begin|end)\{[A-Za-z]*|[A-Za-z]*\*?)\Z')
+
+
+# remove_comments + remove_line_based_junk in one scan
+def strip_comments_and_lines(tex: str) -> str:
+    unix = tex.replace('\r\n', '\n')
+    if UNUSUAL_LINE_BREAK_RE.search(unix):
+        return remove_line_based_junk(remove_comments(tex))
+    tex = LINE_PASS_RE.sub('', unix)
+    # "\n".join(splitlines()) drops the final line break
+    return tex[:-1] if tex.endswith('\n') else tex
+
+
+# Could removing the text between before and after form a new command?
+def _joins_command(before: str, after: str) -> bool:
+    # Only a control word, "*", "\\" or "{" can be left open
+    last = before[-1:]
+    if not (last.isascii() and last.isalpha()) and last not in ('*', '\\', '{'):
+        return False
+    match = _OPEN_COMMAND_RE.search(before[-32:])
+    if match is None:
+        return False
+    cut = match.group(0)
+    if cut.startswith(('\\begin{', '\\end{')):
+        return True
+    if cut.endswith('*'):
+        return after.startswith('{')
+    return after[:1].isascii() and (after[:1].isalpha() or after[:1] in '*{')
+
+
+# remove_regex_junk + flatten_layout_environments in one scan; None when
+# the passes would interact (see above) and have to run one by one
+def strip_layout(tex: str) -> str | None:
+    removed = []      # (start, end) spans, in order
+    open_envs = {}    # environment name -> its unpaired \begin span
+    previous = None
+    for match in LAYOUT_PASS_RE.finditer(tex):
+        start, end = match.span()
+        if match.lastgroup == 'env':
+            name = match.group('name')
+            if match.group('side') == 'begin':
+                # A \begin inside an open one is body text, as in the regex
+                open_envs.setdefault(name, (start, end))
+            elif name in open_envs:
+                removed.append(open_envs.pop(name))
+                removed.append((start, end))
+            previous = None
+            continue
+
+        # Something nested inside this span would be removed first by its own pass
+        if tex.find('\\', start + 1, end) != -1 and JUNK_START_RE.search(tex, start + 1, end):
+            return None
+        if previous is not None and previous[0] in _BOUNDARY_PATTERNS and previous[1] == start:
+            return None
+        removed.append((start, end))
+        previous = (int(match.lastgroup[1:]), end)
+
+    if not removed:
+        return tex
+    removed.sort()
+
+    out = []
+    pos = 0
+    for start, end in removed:
+        if start > pos:
+            out.append(tex[pos:start])
+        pos = end
+        before = out[-1] if out else ''
+        if _joins_command(before, tex[pos:pos + 2]):
+            return None
+    out.append(tex[pos:])
+    return ''.join(out)
+
 
 def clean_latex(tex: str) -> str:
+    tex = strip_comments_and_lines(tex)
+    stripped = strip_layout(tex)
+    if stripped is None:
+        stripped = flatten_layout_environments(remove_regex_junk(tex))
+    tex = remove_unused_macros(stripped)
+    tex = normalize_whitespace(tex)
+    return tex
+
+
+# The original pass-per-rule cleaner, kept as the reference for clean_latex
+def clean_latex_multipass(tex: str) -> str:
     tex = remove_comments(tex)
     tex = remove_line_based_junk(tex)
     tex = remove_regex_junk(tex)
@@ -1,25 +1,151 @@
+"""
+Find the main .tex file and the bibliography files of an extracted source.
+
+One directory walk collects the .tex, .bbl and .bib files (the pipeline's
+own step1_ingest output is skipped). Each .tex candidate is scored from
+the first HEADER_BYTES only:
+- an uncommented \\documentclass
+- an uncommented \\begin{document}
+- a conventional name (main.tex, ms.tex, paper.tex, ...)
+then the shallowest, then the largest file, then the path, so the choice
+does not depend on directory listing order. Only if no header has a
+\\documentclass are the candidates searched in full, in that order.
+
+The result is saved in the directory (SCAN_CACHE) with the path, size
+and mtime of every source file, and reused for as long as those are the
+same: an edited, added or removed file means a fresh choice.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, List
 
+HEADER_BYTES = 64 * 1024
+CHUNK_SIZE = 1 << 20
+SCAN_CACHE = ".source_scan.json"
+OUTPUT_DIRS = frozenset({"step1_ingest"})
+MAIN_NAMES = frozenset({"main", "ms", "paper", "article", "manuscript"})
 
 
-def find_bbls(workdir: Path) -> list[Path]:
-    return list(workdir.rglob("*.bbl")) + list(workdir.rglob("*.bib"))
 
+@dataclass
+class SourceFiles:
+    tex: List[Path] = field(default_factory=list)
+    bbl: List[Path] = field(default_factory=list)
+    bib: List[Path] = field(default_factory=list)
 
-def find_main_tex(workdir: Path | str) -> Path | None:
+
+def file_stats(paths: List[Path], workdir: Path) -> Dict[str, List[int]]:
+    """Relative path -> [size, mtime_ns] of each file."""
+    stats = {}
+    for path in paths:
+        stat = path.stat()
+        stats[path.relative_to(workdir).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+def scan_sources(workdir: Path | str) -> SourceFiles:
+    """Every .tex, .bbl and .bib file under ``workdir``, in sorted order."""
     workdir = Path(workdir)
+    found = SourceFiles()
+    buckets = {".tex": found.tex, ".bbl": found.bbl, ".bib": found.bib}
+    for root, dirs, files in os.walk(workdir):
+        if Path(root) == workdir:
+            dirs[:] = [d for d in dirs if d not in OUTPUT_DIRS]
+        dirs.sort()
+        for name in sorted(files):
+            bucket = buckets.get(os.path.splitext(name)[1].lower())
+            if bucket is not None:
+                bucket.append(Path(root) / name)
+    return found
 
-    for tex in workdir.rglob("*.tex"):
-        try:
-            content = tex.read_text(errors="ignore")
-        except Exception:
-            continue
 
-        if "\\documentclass" in content:
-            return tex
+# Does ``needle`` occur in ``header`` outside a % comment?
+def _uncommented(header: bytes, needle: bytes) -> bool:
+    at = header.find(needle)
+    while at != -1:
+        line = header[header.rfind(b"\n", 0, at) + 1:at]
+        if b"%" not in line.replace(b"\\%", b""):
+            return True
+        at = header.find(needle, at + 1)
+    return False
+
+
+def _rank(tex: Path, workdir: Path) -> tuple:
+    try:
+        with tex.open("rb") as f:
+            header = f.read(HEADER_BYTES)
+        size = tex.stat().st_size
+    except OSError:
+        return (1, 0, 0, tex.as_posix())
+    score = 0
+    if _uncommented(header, b"\\documentclass"):
+        score += 100
+    if _uncommented(header, b"\\begin{document}"):
+        score += 50
+    if tex.stem.lower() in MAIN_NAMES:
+        score += 10
+    relative = tex.relative_to(workdir)
+    return (-score, len(relative.parts), -size, relative.as_posix())
+
+
+def _contains(path: Path, needle: bytes) -> bool:
+    # Chunked, so a large file is never held in memory
+    tail = b""
+    try:
+        with path.open("rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                if needle in tail + chunk:
+                    return True
+                tail = chunk[-(len(needle) - 1):]
+    except OSError:
+        pass
+    return False
 
+
+def _choose_main(candidates: List[Path], workdir: Path) -> Path | None:
+    ranked = sorted((_rank(tex, workdir), tex) for tex in candidates)
+    if ranked and ranked[0][0][0] <= -100:
+        return ranked[0][1]
+    for _, tex in ranked:
+        if _contains(tex, b"\\documentclass"):
+            return tex
     return None
 
 
+def find_sources(workdir: Path | str) -> tuple[Path | None, List[Path]]:
+    """(main .tex file or None, .bbl and .bib files) of a source directory."""
+    workdir = Path(workdir)
+    found = scan_sources(workdir)
+    bbls = found.bbl + found.bib
+    files = file_stats(found.tex + bbls, workdir)
+
+    cache = workdir / SCAN_CACHE
+    try:
+        cached = json.loads(cache.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        cached = {}
+    if cached.get("files") == files:
+        main = workdir / cached["main_tex"] if cached["main_tex"] else None
+        return main, bbls
+
+    main = _choose_main(found.tex, workdir)
+    cache.write_text(json.dumps({
+        "files": files,
+        "main_tex": main.relative_to(workdir).as_posix() if main else None,
+    }, indent=2), encoding="utf-8")
+    return main, bbls
+
+
+def find_bbls(workdir: Path) -> list[Path]:
+    return find_sources(workdir)[1]
+
+
+def find_main_tex(workdir: Path | str) -> Path | None:
+    return find_sources(workdir)[0]
+
+
 if __name__ == "__main__":
-    print(1)
\ No newline at end of file
+    print(1)
@@ -1,40 +1,137 @@
+import json
+import os
+import time
 from pathlib import Path
+from typing import Any, Dict
 
+from .. import prompt_budget
+from ..prompt_budget import estimate_tokens
+
+from . import (file_cleaning, find_mainTeX_and_bbls, macro_definitions, macro_expansion,
+               substitute_bibliography, substitute_inputs_and_includes)
 from .fetch_papers import fetch_arxiv_source
 from .file_cleaning import clean_latex
-from .find_mainTeX_and_bbls import find_bbls, find_main_tex
+from .find_mainTeX_and_bbls import find_sources
+from .macro_expansion import expand_macros
+from .stage_cache import StageRunner, source_digest, stage_cache_dir
 from .substitute_bibliography import substitute_bbl_content
 from .substitute_inputs_and_includes import inline_inputs
 
+REPORT_NAME = "ingest_report.json"
+
+# The code each stage's output depends on (see stage_cache)
+FLATTEN_MODULES = (find_mainTeX_and_bbls, substitute_inputs_and_includes, substitute_bibliography)
+CLEAN_MODULES = (file_cleaning, macro_definitions)
+EXPAND_MODULES = (macro_expansion, macro_definitions, prompt_budget)
+
+
+def expand_macros_mode() -> str:
+    # "0": off, "1": expand macros where that saves tokens, "all": every simple macro
+    mode = os.getenv("INGEST_EXPAND_MACROS", "0").lower()
+    if mode not in ("0", "1", "all"):
+        raise ValueError(f"INGEST_EXPAND_MACROS must be 0, 1 or all, got {mode!r}")
+    return mode
 
 
 def pipeline(paper_id: str):
     #Download Paper
     working_dir = fetch_arxiv_source(paper_id)
 
-    #Identify main TeX file and bbl file
-    bbls = find_bbls(working_dir)
-    main_tex = find_main_tex(working_dir)
+    return process_paper(working_dir)
+
+
+def _stage(name: str, content: str, started: float, **details: Any) -> Dict[str, Any]:
+    return {
+        "stage": name,
+        "chars": len(content),
+        "tokens": estimate_tokens(content),
+        "seconds": round(time.perf_counter() - started, 3),
+        **details,
+    }
+
+
+def _read_report(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
 
-    #Substitute Inputs/Includes (get content without modifying original)
-    content = inline_inputs(main_tex)
+def process_paper(working_dir: Path, expand: str | None = None) -> str:
+    """
+    Everything after the download: CPU-bound, so batch ingestion runs it in worker processes.
 
-    #Substitute Bibliography (on content, not file)
-    content = substitute_bbl_content(content, bbls)
+    ``expand`` is the macro expansion mode ("0", "1" or "all"; default:
+    INGEST_EXPAND_MACROS). Writes step1_ingest/processed.tex and a report
+    with the size of the text after each stage.
+
+    Stage outputs are reused from the stage store (INGEST_STAGE_CACHE)
+    when their input and code are unchanged.
+    """
+    working_dir = Path(working_dir)
+    expand = expand_macros_mode() if expand is None else expand
+    cache = stage_cache_dir()
+    runner = StageRunner(cache, source_digest(working_dir) if cache is not None else None)
+
+    def flatten():
+        #Identify main TeX file and bbl file
+        main_tex, bbls = find_sources(working_dir)
+
+        #Substitute Inputs/Includes (get content without modifying original)
+        content = inline_inputs(main_tex)
+
+        #Substitute Bibliography (on content, not file)
+        return substitute_bbl_content(content, bbls), {}
+
+    def expand_stage():
+        expansion = expand_macros(runner.text(), all_simple=expand == "all")
+        return expansion.text, {
+            "macros": expansion.macros,
+            "expansions": expansion.expansions,
+            "kept_definitions": expansion.kept,
+            "preamble_chars": expansion.preamble_chars,
+        }
+
+    runner.run("flattened", FLATTEN_MODULES, flatten, _stage)
 
     #Clean the content
-    content = clean_latex(content)
+    runner.run("cleaned", CLEAN_MODULES, lambda: (clean_latex(runner.text()), {}), _stage)
+
+    # Expand author macros and drop the preamble
+    if expand != "0":
+        runner.run("expanded", EXPAND_MODULES, expand_stage, _stage, mode=expand)
 
     # Create ingest folder and save cleaned text there
     ingest_dir = working_dir / "step1_ingest"
     ingest_dir.mkdir(parents=True, exist_ok=True)
+    report_path = ingest_dir / REPORT_NAME
 
+    # An unchanged output is not written again
     output_path = ingest_dir / "processed.tex"
-    output_path.write_text(content, encoding="utf-8")
+    content = runner.text()
+    data = content.encode("utf-8")
+    unchanged = (_read_report(report_path).get("output_sha256") == runner.sha256
+                 and output_path.exists() and output_path.stat().st_size == len(data))
+    if not unchanged:
+        output_path.write_bytes(data)
+
+    # Tokens before/after are for the text the LLM nodes receive
+    stages = runner.stages
+    before, after = stages[1]["tokens"], stages[-1]["tokens"]
+    report = {
+        "paper": working_dir.name,
+        "expand_macros": expand,
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_saved": before - after,
+        "output_sha256": runner.sha256,
+        "stages": stages,
+    }
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
 
     return content
 
 
 
 if __name__ == "__main__":
-    pipeline('2601.09704')
\ No newline at end of file
+    pipeline('2601.09704')
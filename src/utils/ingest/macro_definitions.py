@@ -0,0 +1,60 @@
+"""
+Finding macro definitions (\\newcommand, \\def, \\DeclareMathOperator, ...).
+
+Shared by the clean stage (remove_unused_macros) and the expand stage
+(macro_expansion). It is its own module so that the stage cache's code
+version of each stage covers this parser without covering the other
+stage's rules.
+"""
+
+import re
+
+# \newcommand{\foo}, \newcommand*\foo, \def\foo, \DeclareMathOperator*{\foo}, ...
+MACRO_DEF_RE = re.compile(
+    r'\\(newcommand|renewcommand|providecommand|def|DeclareMathOperator)\*?\s*'
+    r'(?:\{\s*\\([A-Za-z@]+)\s*\}|\\([A-Za-z@]+))'
+)
+
+# What sits between the name and the body: [n][default] for \newcommand,
+# parameter text (#1#2) for \def
+MACRO_ARGS_RE = re.compile(r'(?:\s*\[[^\]\n]*\])*\s*')
+DEF_PARAMS_RE = re.compile(r'[^{}\n]*')
+BRACE_RE = re.compile(r'\\.|[{}]', re.DOTALL)
+
+
+# Index just past the group opened at tex[start] ("{"), or -1 if it never closes
+def group_end(tex: str, start: int) -> int:
+    depth = 0
+    for match in BRACE_RE.finditer(tex, start):
+        token = match.group()
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return -1
+
+
+# (start, body_start, end, name) of every top-level macro definition, in order
+def find_macro_definitions(tex: str) -> list[tuple[int, int, int, str]]:
+    defs = []
+    end = 0
+    for match in MACRO_DEF_RE.finditer(tex):
+        if match.start() < end:
+            # Defined inside the body of the previous definition
+            continue
+        kind = match.group(1)
+        name = match.group(2) or match.group(3)
+        params = DEF_PARAMS_RE if kind == 'def' else MACRO_ARGS_RE
+        body_start = params.match(tex, match.end()).end()
+
+        end = -1
+        if tex.startswith('{', body_start):
+            end = group_end(tex, body_start)
+        if end == -1:
+            # No braced body (or it never closes): up to the end of the line
+            end = tex.find('\n', match.end())
+            end = len(tex) if end == -1 else end
+        defs.append((match.start(), body_start, end, name))
+    return defs
@@ -0,0 +1,219 @@
+"""
+Expand simple author macros and drop the preamble.
+
+After cleaning, processed.tex still uses the author's macros (``\\R``,
+``\\eps``, ``\\norm{x}``), so every LLM call has to carry the preamble that
+defines them and the model has to resolve them. expand_macros replaces
+each use of a simple macro by its definition and keeps only the document
+body:
+- simple macros: \\newcommand / \\renewcommand / \\providecommand with at
+  most 9 arguments (an optional first argument with a default included)
+  and a braced body, and \\DeclareMathOperator (expanded to
+  ``\\operatorname{...}``)
+- a name defined more than once, a body that defines macros or uses the
+  macro itself, and \\def are left alone; those definitions stay, placed
+  before the body when they were in the preamble
+- a macro is only expanded when that is not longer, in tokens, than
+  keeping its definition (uses x extra tokens per use <= tokens of the
+  definition); short macros used everywhere (``\\R``) keep their
+  definition. ``all_simple=True`` expands every simple macro
+- the title is kept from the preamble; everything else before
+  ``\\begin{document}`` is dropped
+
+Enabled in the ingest pipeline with INGEST_EXPAND_MACROS=1 (=all to
+expand every simple macro).
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List
+
+from ..prompt_budget import estimate_tokens
+from .macro_definitions import MACRO_DEF_RE, find_macro_definitions, group_end
+
+# A control word, or any other escaped character (so \\ is not read as \ + a word)
+TOKEN_RE = re.compile(r'\\(?:([A-Za-z@]+)|.)', re.DOTALL)
+NARGS_RE = re.compile(r'\s*\[\s*(\d)\s*\](?:\s*\[([^\]\n]*)\])?')
+PARAM_RE = re.compile(r'#(#|[1-9])')
+TRAILING_WORD_RE = re.compile(r'\\[A-Za-z@]+\Z')
+TITLE_RE = re.compile(r'\\title\s*(?:\[[^\]\n]*\]\s*)?(?=\{)')
+BEGIN_DOCUMENT = '\\begin{document}'
+END_DOCUMENT = '\\end{document}'
+
+# Expansions inside expansions, before giving up on a (mutually) recursive macro
+MAX_DEPTH = 10
+
+
+@dataclass(frozen=True)
+class Macro:
+    name: str
+    nargs: int
+    default: str | None   # default of an optional first argument
+    body: str
+
+
+@dataclass
+class MacroExpansion:
+    text: str
+    macros: int = 0        # definitions expanded and removed
+    expansions: int = 0    # uses replaced
+    kept: int = 0          # definitions left as they were
+    preamble_chars: int = 0
+
+
+def _parse(tex: str, start: int, body_start: int, end: int, name: str) -> Macro | None:
+    head = MACRO_DEF_RE.match(tex, start)
+    kind = head.group(1)
+    if kind == 'def' or not tex.startswith('{', body_start) or tex[end - 1] != '}':
+        return None
+    body = tex[body_start + 1:end - 1]
+
+    if kind == 'DeclareMathOperator':
+        star = '*' if '*' in tex[start:head.end()] else ''
+        return Macro(name, 0, None, f'\\operatorname{star}{{{body}}}')
+
+    nargs, default = 0, None
+    args = NARGS_RE.match(tex, head.end(), body_start)
+    if args:
+        nargs, default = int(args.group(1)), args.group(2)
+    if MACRO_DEF_RE.search(body):
+        return None
+    if any(word == name for word in TOKEN_RE.findall(body)):
+        return None
+    if any(p != '#' and int(p) > nargs for p in PARAM_RE.findall(body)):
+        return None
+    return Macro(name, nargs, default, body)
+
+
+def _skip_spaces(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in ' \t\n':
+        pos += 1
+    return pos
+
+
+# The argument starting at pos: (value, end), or None if there is none
+def _argument(text: str, pos: int) -> tuple[str, int] | None:
+    pos = _skip_spaces(text, pos)
+    if pos >= len(text) or text[pos] in '}]':
+        return None
+    if text[pos] == '{':
+        end = group_end(text, pos)
+        return None if end == -1 else (text[pos + 1:end - 1], end)
+    token = TOKEN_RE.match(text, pos)
+    end = token.end() if token else pos + 1
+    return text[pos:end], end
+
+
+def _optional_argument(text: str, pos: int) -> tuple[str, int] | None:
+    start = _skip_spaces(text, pos)
+    if not text.startswith('[', start):
+        return None
+    depth = 0
+    for i in range(start + 1, len(text)):
+        if text[i] == '{':
+            depth += 1
+        elif text[i] == '}':
+            depth -= 1
+        elif text[i] == ']' and depth == 0:
+            return text[start + 1:i], i + 1
+    return None
+
+
+def _expand(text: str, macros: Dict[str, Macro], result: MacroExpansion, depth: int = 0) -> str:
+    if depth > MAX_DEPTH:
+        return text
+    out: List[str] = []
+    pos = 0
+    for token in TOKEN_RE.finditer(text):
+        if token.start() < pos:
+            # Inside arguments already consumed
+            continue
+        macro = macros.get(token.group(1))
+        if macro is None:
+            continue
+
+        args: List[str] = []
+        end = token.end()
+        if macro.default is not None:
+            optional = _optional_argument(text, end)
+            if optional is None:
+                args.append(macro.default)
+            else:
+                value, end = optional
+                args.append(value)
+        while len(args) < macro.nargs:
+            argument = _argument(text, end)
+            if argument is None:
+                break
+            value, end = argument
+            args.append(value)
+        if len(args) < macro.nargs:
+            # Not enough arguments: leave this use as written
+            continue
+
+        body = PARAM_RE.sub(lambda m: '#' if m.group(1) == '#' else args[int(m.group(1)) - 1], macro.body)
+        expanded = _expand(body, macros, result, depth + 1)
+        # "\foo" followed by a letter would read as a longer control word
+        if TRAILING_WORD_RE.search(expanded) and text[end:end + 1].isalpha():
+            expanded += ' '
+        out.append(text[pos:token.start()])
+        out.append(expanded)
+        pos = end
+        result.expansions += 1
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+# Is replacing every use cheaper than carrying the definition?
+def _worth_expanding(macro: Macro, definition: str, uses: int) -> bool:
+    extra = estimate_tokens(macro.body) - estimate_tokens('\\' + macro.name)
+    return uses * extra <= estimate_tokens(definition)
+
+
+def expand_macros(tex: str, all_simple: bool = False) -> MacroExpansion:
+    defs = find_macro_definitions(tex)
+    parsed = [_parse(tex, *d) for d in defs]
+    counts = Counter(name for _, _, _, name in defs)
+    uses = Counter(TOKEN_RE.findall(tex))
+    parsed = [
+        macro if macro is not None and counts[macro.name] == 1
+        and (all_simple or _worth_expanding(macro, tex[start:end], uses[macro.name] - 1)) else None
+        for (start, _, end, _), macro in zip(defs, parsed)
+    ]
+    macros = {m.name: m for m in parsed if m is not None}
+
+    begin = tex.find(BEGIN_DOCUMENT)
+    body_start = 0 if begin == -1 else begin + len(BEGIN_DOCUMENT)
+    body_end = tex.find(END_DOCUMENT, body_start)
+    body_end = len(tex) if body_end == -1 else body_end
+
+    result = MacroExpansion(text='')
+    pieces: List[str] = []
+    if begin != -1:
+        title = TITLE_RE.search(tex, 0, begin)
+        if title:
+            end = group_end(tex, title.end())
+            if end != -1:
+                pieces.append(tex[title.start():end] + '\n\n')
+
+    pos = body_start
+    for (start, _, end, name), macro in zip(defs, parsed):
+        expanded = macro is not None
+        if start < body_start:
+            if not expanded:
+                pieces.append(tex[start:end] + '\n')
+                result.kept += 1
+        elif end <= body_end:
+            pieces.append(tex[pos:start])
+            pos = end
+            if not expanded:
+                pieces.append(tex[start:end])
+                result.kept += 1
+        if expanded:
+            result.macros += 1
+    pieces.append(tex[pos:body_end])
+
+    result.preamble_chars = body_start
+    result.text = _expand(''.join(pieces), macros, result).strip() + '\n'
+    return result
@@ -0,0 +1,173 @@
+"""
+Content-addressed outputs of the ingest stages.
+
+process_paper runs flatten -> clean -> (expand). Each stage's output is
+stored once, named by its SHA-256 (``objects/ab/abcd...``), under a key
+made of:
+- the SHA-256 of the stage's input: the source for the flatten stage,
+  the previous stage's output otherwise
+- the version of the code that runs the stage: a hash of the source of
+  its modules (ingestion_pipeline lists them per stage), so editing a
+  cleaning rule in file_cleaning.py invalidates the clean stage only
+- the stage's options (the macro expansion mode)
+
+Because the key holds the hash of the input text, not of the stage before
+it, a stage whose input came out the same is still a hit: after a cleaning
+rule change that does not touch this paper, the expand stage is reused.
+
+The source of a paper directory is a hash of the paths and contents of its
+.tex, .bbl and .bib files, so an edit in the extracted directory is seen.
+Each file's hash is kept (SOURCE_HASHES) with its size and mtime and only
+recomputed when those change.
+
+Outputs are only read when needed: on an unchanged paper each stage is
+one small index read, and only the final text is loaded.
+
+Configuration (environment variables):
+- INGEST_STAGE_CACHE    store directory (default <project>/.cache/ingest_stages),
+                        "off" to run every stage every time
+"""
+
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .fetch_papers import BASE_DIR, _write_atomic
+from .find_mainTeX_and_bbls import file_stats, scan_sources
+
+DEFAULT_STAGE_CACHE = BASE_DIR / ".cache" / "ingest_stages"
+SOURCE_HASHES = ".source_hashes.json"
+
+
+def stage_cache_dir() -> Path | None:
+    """Stage store location, or None when caching is off."""
+    location = os.getenv("INGEST_STAGE_CACHE", str(DEFAULT_STAGE_CACHE))
+    return None if location.lower() == "off" else Path(location)
+
+
+@lru_cache(maxsize=None)
+def _file_sha256(path: str) -> str:
+    # Module sources do not change while the process runs
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def code_version(modules: Sequence[ModuleType]) -> str:
+    """Hash of the source files of ``modules``."""
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(f"{module.__name__}:{_file_sha256(module.__file__)}\n".encode())
+    return digest.hexdigest()
+
+
+def source_digest(workdir: Path | str) -> str:
+    """SHA-256 of the paths and contents of the source files of a paper directory."""
+    workdir = Path(workdir)
+    found = scan_sources(workdir)
+    files = file_stats(found.tex + found.bbl + found.bib, workdir)
+
+    memo_path = workdir / SOURCE_HASHES
+    try:
+        memo = json.loads(memo_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        memo = {}
+    hashes = {}
+    for relative, stat in sorted(files.items()):
+        known = memo.get(relative)
+        if known is not None and known[:2] == stat:
+            hashes[relative] = known
+        else:
+            hashes[relative] = stat + [hashlib.sha256((workdir / relative).read_bytes()).hexdigest()]
+    if hashes != memo:
+        memo_path.write_text(json.dumps(hashes, indent=2), encoding="utf-8")
+
+    digest = hashlib.sha256()
+    for relative, (_, _, sha256) in hashes.items():
+        digest.update(f"{relative}\0{sha256}\n".encode())
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, input_sha256: str, version: str, **options: Any) -> str:
+    material = {"stage": stage, "input": input_sha256, "code": version, "options": options}
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+def _object_path(cache: Path, sha256: str) -> Path:
+    return cache / "objects" / sha256[:2] / sha256
+
+
+def _key_path(cache: Path, key: str) -> Path:
+    return cache / "keys" / key[:2] / f"{key}.json"
+
+
+def _lookup(cache: Path, key: str) -> Dict[str, Any] | None:
+    try:
+        entry = json.loads(_key_path(cache, key).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    # A key whose object is gone is as good as none
+    return entry if _object_path(cache, entry["sha256"]).exists() else None
+
+
+class StageRunner:
+    """
+    Runs the stages of one paper in order, each through the stage store.
+
+    ``text`` is the output of the last stage run, read from the store the
+    first time it is asked for.
+    """
+
+    def __init__(self, cache: Path | None, source: str | None):
+        self.cache = cache
+        self.sha256 = source
+        self.stages: List[Dict[str, Any]] = []
+        self._text: str | None = None
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = _object_path(self.cache, self.sha256).read_bytes().decode("utf-8")
+        return self._text
+
+    def run(
+        self,
+        stage: str,
+        modules: Sequence[ModuleType],
+        compute: Callable[[], Tuple[str, Dict[str, Any]]],
+        report: Callable[..., Dict[str, Any]],
+        **options: Any,
+    ) -> None:
+        """
+        ``compute`` returns (output, details); ``report(stage, output,
+        start time, **details)`` makes its report entry. Both only run on
+        a miss.
+        """
+        started = time.perf_counter()
+        key = None
+        if self.cache is not None:
+            key = stage_key(stage, self.sha256, code_version(modules), **options)
+            entry = _lookup(self.cache, key)
+            if entry is not None:
+                self.sha256, self._text = entry["sha256"], None
+                self.stages.append({
+                    **entry["report"],
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "cached": True,
+                })
+                return
+
+        text, details = compute()
+        stage_report = report(stage, text, started, **details)
+        self.stages.append({**stage_report, "cached": False})
+        self._text = text
+        data = text.encode("utf-8")
+        self.sha256 = hashlib.sha256(data).hexdigest()
+        if key is not None:
+            target = _object_path(self.cache, self.sha256)
+            if not target.exists():
+                _write_atomic(target, data)
+            _write_atomic(_key_path(self.cache, key), json.dumps(
+                {"sha256": self.sha256, "report": stage_report}).encode("utf-8"))
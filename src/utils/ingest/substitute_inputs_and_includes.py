@@ -1,46 +1,252 @@
+"""
+Flatten \\input / \\include (and \\subfile, \\import, ...) into one document.
+
+build_include_graph reads the main file and everything it pulls in, one
+level of the include tree at a time; the files of a level are read
+concurrently. File contents are memoised by path, mtime and size, so a
+file is read once however often it is referenced, and not again on the
+next ingest unless it changed.
+
+IncludeGraph.flatten inlines the files depth first, as \\input would:
+- a file already inlined is not inlined again ("% Skipped recursive include")
+- a file that does not exist becomes "% Missing file: ..."
+- \\subfile contributes only its document body
+- paths are relative to the including file, then to the main file;
+  \\import{dir}{file} / \\subimport{dir}{file} read ``dir/file``, and
+  that file's own includes are relative to ``dir``
+
+The flattened text of a subtree whose files are each referenced once is
+memoised with the mtimes of those files, so after an edit only the
+subtrees containing the edited file are flattened again.
+
+Both memos are least-recently-used and bounded (CACHE_CHARS characters
+each), so a long batch of papers in one process does not keep every file
+it has read.
+"""
+
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Dict, Hashable, List, Set
 
 from .find_mainTeX_and_bbls import find_main_tex
 
-INPUT_RE = re.compile(r"\\(input|include)\*?\{([^}]+)\}")
+INPUT_RE = re.compile(
+    r"\\(?:(input|include|subfile)\*?\{([^}]+)\}"
+    r"|((?:sub)?(?:import|inputfrom|includefrom))\*?\{([^}]*)\}\{([^}]+)\})"
+)
+DOCUMENT_BODY_RE = re.compile(r"\\begin\{document\}(.*?)\\end\{document\}", re.DOTALL)
 
+READ_WORKERS = 8
+CACHE_CHARS = 64 << 20
 
-def inline_inputs(tex_path: Path,
-                  seen: set[Path] | None = None) -> str:
 
-    if seen is None:
-        seen = set()
+class _TextCache:
+    """Least-recently-used map, bounded by the total characters of its values."""
 
-    tex_path = tex_path.resolve()
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._items: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
 
-    # Prevent infinite recursion
-    if tex_path in seen:
-        return f"% Skipped recursive include: {tex_path.name}\n"
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
 
-    seen.add(tex_path)
+    def put(self, key: Hashable, value: Any, chars: int) -> None:
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._chars -= old[1]
+            if chars > self.max_chars:
+                return
+            self._items[key] = (value, chars)
+            self._chars += chars
+            while self._chars > self.max_chars:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._chars -= evicted
 
-    try:
-        text = tex_path.read_text(errors="ignore")
-    except FileNotFoundError:
-        return f"% Missing file: {tex_path}\n"
 
-    def replace(match: re.Match) -> str:
-        name = match.group(2)
+# path -> (mtime_ns, size, text, include commands in it)
+_file_cache = _TextCache(CACHE_CHARS)
+# path -> (signature of its subtree, flattened text)
+_flat_cache = _TextCache(CACHE_CHARS)
+
+
+@dataclass(frozen=True)
+class Include:
+    start: int
+    end: int
+    kind: str
+    name: str            # as written, with .tex added
+    path: Path | None    # None if the file does not exist
+
+
+@dataclass
+class IncludeNode:
+    path: Path
+    mtime_ns: int
+    size: int
+    text: str
+    commands: list                # (start, end, kind, directory, name) per include command
+    includes: List[Include] = field(default_factory=list)
+
+
+@dataclass
+class IncludeGraph:
+    root: Path
+    nodes: Dict[Path, IncludeNode]
+
+    def children(self, path: Path) -> List[Path]:
+        return [inc.path for inc in self.nodes[path].includes if inc.path in self.nodes]
+
+    def flatten(self, seen: Set[Path] | None = None) -> str:
+        # A caller-supplied seen set makes the output depend on more than the files
+        memoise = not seen
+        seen = set() if seen is None else seen
+        parents: Dict[Path, int] = {}
+        for path in self.nodes:
+            for child in self.children(path):
+                parents[child] = parents.get(child, 0) + 1
+        signatures: Dict[Path, tuple | None] = {}
+        if memoise and self.root in self.nodes:
+            self._signature(self.root, parents, signatures, set())
+        return self._flatten(self.root, seen, signatures)
+
+    # What the flattened text of a subtree depends on: the files and where
+    # their includes point. None when a file in it is included from more
+    # than one place (or in a cycle): then the text depends on what was
+    # inlined before.
+    def _signature(self, path: Path, parents: Dict[Path, int], memo: Dict, stack: Set[Path]) -> tuple | None:
+        if path in memo:
+            return memo[path]
+        if path in stack or parents.get(path, 0) > 1:
+            memo[path] = None
+            return None
+        stack.add(path)
+        node = self.nodes[path]
+        parts = [(str(path), node.mtime_ns, node.size, tuple(str(inc.path) for inc in node.includes))]
+        for child in self.children(path):
+            sub = self._signature(child, parents, memo, stack)
+            if sub is None:
+                parts = None
+                break
+            parts.append(sub)
+        stack.discard(path)
+        memo[path] = None if parts is None else tuple(parts)
+        return memo[path]
+
+    def _flatten(self, path: Path, seen: Set[Path], signatures: Dict[Path, tuple | None]) -> str:
+        if path in seen:
+            return f"% Skipped recursive include: {path.name}\n"
+        seen.add(path)
+        node = self.nodes.get(path)
+        if node is None:
+            return f"% Missing file: {path}\n"
+
+        signature = signatures.get(path)
+        if signature is not None:
+            cached = _flat_cache.get(path)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+        out = []
+        pos = 0
+        for inc in node.includes:
+            out.append(node.text[pos:inc.start])
+            pos = inc.end
+            if inc.path is None:
+                out.append(f"% Missing file: {inc.name}\n")
+                continue
+            child = self._flatten(inc.path, seen, signatures)
+            if inc.kind == "subfile":
+                body = DOCUMENT_BODY_RE.search(child)
+                child = body.group(1) if body else child
+            out.append(child)
+        out.append(node.text[pos:])
+        text = "".join(out)
+
+        if signature is not None:
+            _flat_cache.put(path, (signature, text), len(text))
+        return text
+
+
+def _commands(text: str) -> list:
+    commands = []
+    for match in INPUT_RE.finditer(text):
+        if match.group(1):
+            kind, directory, name = match.group(1), "", match.group(2)
+        else:
+            kind, directory, name = match.group(3), match.group(4), match.group(5)
 
         # Add .tex if missing
         if not name.endswith(".tex"):
             name += ".tex"
+        commands.append((match.start(), match.end(), kind, directory, name))
+    return commands
+
+
+def _read(path: Path) -> IncludeNode | None:
+    try:
+        stat = path.stat()
+        cached = _file_cache.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            _, _, text, commands = cached
+        else:
+            text = path.read_text(errors="ignore")
+            commands = _commands(text)
+            _file_cache.put(path, (stat.st_mtime_ns, stat.st_size, text, commands), len(text))
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+    return IncludeNode(path, stat.st_mtime_ns, stat.st_size, text, commands)
+
+
+# Where the include commands point; this depends on which files exist, so it
+# is not memoised with the text
+def _includes(node: IncludeNode, root_dir: Path) -> List[Include]:
+    includes = []
+    for start, end, kind, directory, name in node.commands:
+        child = node.path.parent / directory / name
+        if not child.exists() and not directory:
+            # LaTeX itself resolves \input against the main file's directory
+            child = root_dir / name
+        path = child.resolve() if child.exists() else None
+        shown = f"{directory.rstrip('/')}/{name}" if directory else name
+        includes.append(Include(start, end, kind, shown, path))
+    return includes
 
-        child = (tex_path.parent / name)
-        print(child)
-        if not child.exists():
-            return f"% Missing file: {name}\n"
 
-        return inline_inputs(child, seen)
+def build_include_graph(tex_path: Path, workers: int = READ_WORKERS) -> IncludeGraph:
+    root = Path(tex_path).resolve()
+    nodes: Dict[Path, IncludeNode] = {}
+    level = [root]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tex-read") as pool:
+        while level:
+            read = pool.map(_read, level) if len(level) > 1 else map(_read, level)
+            next_level: Dict[Path, None] = {}
+            for node in read:
+                if node is None:
+                    continue
+                node.includes = _includes(node, root.parent)
+                nodes[node.path] = node
+                for inc in node.includes:
+                    if inc.path is not None and inc.path not in nodes:
+                        next_level[inc.path] = None
+            level = [path for path in next_level if path not in nodes]
+    return IncludeGraph(root, nodes)
 
 
-    return INPUT_RE.sub(replace, text)
+def inline_inputs(tex_path: Path,
+                  seen: set[Path] | None = None) -> str:
+    return build_include_graph(tex_path).flatten(seen)
 
 
 if __name__ == "__main__":
@@ -52,5 +258,3 @@ if __name__ == "__main__":
 
     flattened = inline_inputs(main_tex)
     main_tex.write_text(flattened)
-
-
@@ -0,0 +1,116 @@
+"""
+Single-pass extraction of a JSON object from free-form model output.
+
+Models wrap their JSON in prose or code fences, and they write LaTeX inside
+strings without escaping it (``"$\\alpha \\leq \\frac{1}{2}$"``), which is
+not valid JSON. extract_json decodes the first object straight out of the
+response with ``JSONDecoder.raw_decode``. That call finds the balanced end
+itself and ignores whatever follows, so no regex has to delimit the object
+first. When decoding stops at an invalid escape, or the object decoded
+but contains an escape that reads as a command (see below), the
+backslashes are repaired, in one pass over the text between them, and the
+object is decoded once more:
+
+- a backslash that cannot start a JSON escape (``\\alpha``, ``\\{``, ``\\,``,
+  ``\\underline``) is doubled, so the LaTeX survives verbatim
+- so are escapes that are valid JSON but read as commands (``\\frac``,
+  ``\\nabla``, ``\\theta``: ``\\b \\f \\n \\r \\t`` followed by a lowercase
+  letter, so ``"...\\nNext line"`` keeps its newline). Such an object is
+  valid JSON, but with ``\\theta`` read as a tab and ``heta``, so its
+  repaired version is preferred whenever that decodes too
+- raw newlines and tabs inside strings are accepted
+
+The object after the first code fence is tried first. After that, each
+opening brace in the text is tried in order, up to MAX_CANDIDATES.
+"""
+
+import json
+import re
+import string
+from typing import Any, Dict, Iterator, List
+
+_DECODER = json.JSONDecoder(strict=False)
+_CONTROL_ESCAPES = frozenset("bfnrt")
+_HEX_DIGITS = frozenset(string.hexdigits)
+_LOWERCASE = frozenset(string.ascii_lowercase)
+# \\frac, \\theta, \\nabla...: valid JSON escapes that are really LaTeX commands
+_COMMAND_ESCAPE_RE = re.compile(r"\\[bfnrt][a-z]")
+
+# Start positions tried before giving up on a response
+MAX_CANDIDATES = 8
+
+
+def extract_json(text: str) -> Dict[str, Any] | None:
+    """Return the first JSON object in ``text`` that decodes (after repair), else None."""
+    for start in _candidate_starts(text):
+        try:
+            data, end = _DECODER.raw_decode(text, start)
+        except json.JSONDecodeError as e:
+            # Only bad escapes are worth repairing; anything else is not JSON here
+            if not e.msg.startswith("Invalid \\"):
+                continue
+            data = _decode_repaired(text, start)
+        else:
+            if _COMMAND_ESCAPE_RE.search(text, start, end):
+                repaired = _decode_repaired(text, start)
+                if repaired is not None:
+                    data = repaired
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def repair_escapes(json_str: str) -> str:
+    """Double every backslash in ``json_str`` that starts LaTeX rather than a JSON escape."""
+    # Splitting on backslashes leaves each escape at the start of a piece
+    parts = json_str.split("\\")
+    out: List[str] = [parts[0]]
+    i, count = 1, len(parts)
+    while i < count:
+        piece = parts[i]
+        if not piece:
+            # Two backslashes in a row: an escaped backslash (a stray one at the end is doubled)
+            out.append("\\\\")
+            if i + 1 < count:
+                out.append(parts[i + 1])
+            i += 2
+            continue
+        escape = piece[0]
+        if (
+            escape in '"/'
+            or (escape in _CONTROL_ESCAPES and piece[1:2] not in _LOWERCASE)
+            or (escape == "u" and len(piece) >= 5 and all(c in _HEX_DIGITS for c in piece[1:5]))
+        ):
+            out.append("\\")
+        else:
+            out.append("\\\\")
+        out.append(piece)
+        i += 1
+    return "".join(out)
+
+
+def _decode_repaired(text: str, start: int) -> Any:
+    """The value at ``start`` once its backslashes are repaired, or None if it still does not decode."""
+    try:
+        data, _ = _DECODER.raw_decode(repair_escapes(text[start:]), 0)
+    except json.JSONDecodeError:
+        return None
+    return data
+
+
+def _candidate_starts(text: str) -> Iterator[int]:
+    """Opening braces to try: the one after the first code fence, then in order."""
+    tried = set()
+    fence = text.find("```")
+    if fence >= 0:
+        start = text.find("{", fence)
+        if start >= 0:
+            tried.add(start)
+            yield start
+
+    start = text.find("{")
+    while start >= 0 and len(tried) < MAX_CANDIDATES:
+        if start not in tried:
+            tried.add(start)
+            yield start
+        start = text.find("{", start + 1)
@@ -0,0 +1,229 @@
+"""
+Content-addressed cache for LLM responses.
+
+Entries are keyed on a hash of (model, messages, temperature, response_format),
+so re-running a crashed Phase 1 or ``run_workflow.py <id> --phase2-only`` does
+not pay again for identical prompts. Two backends are provided:
+- MemoryLRUCache: in-process, bounded LRU
+- SQLiteCache:    on-disk, survives restarts
+
+Both support TTL and max-entry eviction and keep hit/miss counters.
+
+Configuration (environment variables):
+- LLM_CACHE                    "off" (default), "memory" or "sqlite"
+- LLM_CACHE_PATH               SQLite file (default <project>/.cache/llm_cache.sqlite)
+- LLM_CACHE_TTL                seconds before an entry expires (default 0 = never)
+- LLM_CACHE_MAX_ENTRIES        entries kept before LRU eviction (default 10000)
+- LLM_CACHE_NONDETERMINISTIC   "1" to also cache calls with temperature > 0
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_PATH = BASE_DIR / ".cache" / "llm_cache.sqlite"
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Stable hash of the parts of a request that determine the response."""
+    response_format = payload.get("response_format")
+    format_hash = (
+        hashlib.sha256(json.dumps(response_format, sort_keys=True).encode()).hexdigest()
+        if response_format else None
+    )
+    material = {
+        "model": payload.get("model"),
+        "messages": payload.get("messages"),
+        "temperature": payload.get("temperature", 0.0),
+        "response_format": format_hash,
+    }
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters reported by every cache backend."""
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0  # non-deterministic calls skipped by policy
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+class LLMCache(ABC):
+    """Base class for response-cache backends."""
+
+    def __init__(self, ttl: float = 0, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl) and time.time() - created_at > self.ttl
+
+    @abstractmethod
+    def get(self, key: str) -> str | None:
+        """Return the cached response, or None on a miss/expired entry."""
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store a response, evicting old entries if over capacity."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry."""
+
+
+class MemoryLRUCache(LLMCache):
+    """In-process LRU cache."""
+
+    def __init__(self, ttl: float = 0, max_entries: int = 10_000):
+        super().__init__(ttl, max_entries)
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[0]):
+                if entry is not None:
+                    del self._entries[key]
+                    self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            self.stats.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(LLMCache):
+    """On-disk cache in a single SQLite file, shared across runs."""
+
+    def __init__(self, path: Path | str = DEFAULT_CACHE_PATH, ttl: float = 0, max_entries: int = 10_000):
+        super().__init__(ttl, max_entries)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1]):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.stats.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self.stats.stores += 1
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats.evictions += overflow
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+_cache: LLMCache | None = None
+_configured = False
+
+
+def _cache_from_env() -> LLMCache | None:
+    backend = os.getenv("LLM_CACHE", "off").lower()
+    ttl = float(os.getenv("LLM_CACHE_TTL", "0"))
+    max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    if backend == "memory":
+        return MemoryLRUCache(ttl=ttl, max_entries=max_entries)
+    if backend == "sqlite":
+        path = os.getenv("LLM_CACHE_PATH", str(DEFAULT_CACHE_PATH))
+        return SQLiteCache(path, ttl=ttl, max_entries=max_entries)
+    return None
+
+
+def get_llm_cache() -> LLMCache | None:
+    """Return the process-wide cache (configured from env on first use)."""
+    global _cache, _configured
+    if not _configured:
+        _cache = _cache_from_env()
+        _configured = True
+    return _cache
+
+
+def set_llm_cache(cache: LLMCache | None) -> None:
+    """Install a cache explicitly (None disables caching)."""
+    global _cache, _configured
+    _cache = cache
+    _configured = True
+
+
+def is_cacheable(payload: Dict[str, Any]) -> bool:
+    """Sampling at temperature > 0 is only cached when explicitly enabled."""
+    if payload.get("temperature", 0.0) <= 0:
+        return True
+    return os.getenv("LLM_CACHE_NONDETERMINISTIC", "0") == "1"
@@ -1,10 +1,18 @@
+import json
 import os
 import time
-from typing import Dict, List
+from typing import Any, Callable, Dict, List
 
-import requests
+import httpx
 
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+from .http_client import apost_json, apost_stream, post_json, post_stream
+from .llm_cache import LLMCache, cache_key, get_llm_cache, is_cacheable
+from .prompt_budget import estimate_message_tokens
+from .rate_limit import RateLimiter, Slot, get_rate_limiter, retry_after_seconds
+from .usage import UsageRecord, current_label, get_usage_tracker
+
+# Override to point at a local stand-in (see benchmarks/mock_openrouter.py)
+OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
 
 # Model options (set via OPENROUTER_MODEL env var or change default here):
 # - "tngtech/deepseek-r1t2-chimera:free"  # Free but unreliable for JSON
@@ -15,11 +23,265 @@ DEFAULT_MODEL = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-001")
 
 MAX_RETRIES = 5
 INITIAL_BACKOFF = 2  # seconds
+# 429s retried by request_completion itself, each after the limiter's cooldown
+RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "5"))
+
+
+def request_completion(
+    payload: Dict[str, Any],
+    api_key: str | None = None,
+    refresh_cache: bool = False,
+    on_delta: Callable[[str], None] | None = None,
+) -> str:
+    """
+    Send one chat-completion request and return the message content.
+
+    This is the single choke point for LLM traffic: Phase 1 and Phase 2 both
+    end up here, and the request travels over the shared pooled client.
+    Identical requests are answered from the response cache when one is
+    configured (see utils.llm_cache); refresh_cache skips the lookup but
+    still stores the fresh response, which callers use when retrying after
+    an unusable answer. A 429 is retried up to RATE_LIMIT_RETRIES times,
+    each in a new limiter slot, which waits out the cooldown the 429 set.
+    Raises httpx.HTTPStatusError on any other non-2xx response, or on a 429
+    once those retries are spent.
+
+    With on_delta the completion is streamed (``"stream": true``) and each
+    text fragment is passed to it as it arrives; the return value is the
+    same full content either way. A cached answer is passed on whole.
+    """
+    cache, key, cached = _cache_lookup(payload, refresh_cache)
+    if cached is not None:
+        if on_delta is not None:
+            on_delta(cached)
+        return cached
+
+    limiter = get_rate_limiter()
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            with limiter.slot(_token_estimate(limiter, payload)) as slot:
+                start = time.perf_counter()
+                if on_delta is None:
+                    response = post_json(OPENROUTER_API_URL, _with_usage(payload), _require_api_key(api_key))
+                    _raise_for_status(response, slot)
+                    data = response.json()
+                else:
+                    data = _stream_completion(payload, _require_api_key(api_key), slot, on_delta)
+                record = _record_usage(payload, data, time.perf_counter() - start)
+                slot.used_tokens(record.prompt_tokens + record.completion_tokens)
+            break
+        except httpx.HTTPStatusError as e:
+            if not is_rate_limited(e) or attempt == RATE_LIMIT_RETRIES:
+                raise
+    content = data["choices"][0]["message"]["content"]
+
+    if cache is not None:
+        cache.set(key, content)
+    return content
+
+
+async def arequest_completion(
+    payload: Dict[str, Any],
+    api_key: str | None = None,
+    refresh_cache: bool = False,
+    on_delta: Callable[[str], None] | None = None,
+) -> str:
+    """Async counterpart of request_completion, over the shared async client."""
+    cache, key, cached = _cache_lookup(payload, refresh_cache)
+    if cached is not None:
+        if on_delta is not None:
+            on_delta(cached)
+        return cached
+
+    limiter = get_rate_limiter()
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            async with limiter.aslot(_token_estimate(limiter, payload)) as slot:
+                start = time.perf_counter()
+                if on_delta is None:
+                    response = await apost_json(OPENROUTER_API_URL, _with_usage(payload), _require_api_key(api_key))
+                    await _araise_for_status(response, slot)
+                    data = response.json()
+                else:
+                    data = await _astream_completion(payload, _require_api_key(api_key), slot, on_delta)
+                record = _record_usage(payload, data, time.perf_counter() - start)
+                await slot.aused_tokens(record.prompt_tokens + record.completion_tokens)
+            break
+        except httpx.HTTPStatusError as e:
+            if not is_rate_limited(e) or attempt == RATE_LIMIT_RETRIES:
+                raise
+    content = data["choices"][0]["message"]["content"]
+
+    if cache is not None:
+        cache.set(key, content)
+    return content
+
+
+def _raise_for_status(response: httpx.Response, slot: Slot) -> None:
+    if response.status_code == 429:
+        slot.rate_limited(retry_after_seconds(response))
+    response.raise_for_status()
+
+
+async def _araise_for_status(response: httpx.Response, slot: Slot) -> None:
+    if response.status_code == 429:
+        await slot.arate_limited(retry_after_seconds(response))
+    response.raise_for_status()
+
+
+class StreamError(httpx.HTTPError):
+    """The provider reported an error part-way through a streamed completion."""
+
+
+class _StreamAccumulator:
+    """Rebuilds a completion body from SSE lines, forwarding text as it arrives."""
+
+    def __init__(self, on_delta: Callable[[str], None]):
+        self.on_delta = on_delta
+        self.parts: List[str] = []
+        self.usage: Dict[str, Any] | None = None
+
+    def feed(self, line: str) -> None:
+        # Blank separators and ": OPENROUTER PROCESSING" keep-alives carry no data
+        if not line.startswith("data:"):
+            return
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        try:
+            chunk = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise StreamError(f"Malformed stream chunk: {data[:80]!r}") from e
+        if chunk.get("error"):
+            error = chunk["error"]
+            raise StreamError(f"Stream error: {error.get('message', error) if isinstance(error, dict) else error}")
+        if chunk.get("usage"):
+            self.usage = chunk["usage"]
+        for choice in chunk.get("choices") or []:
+            text = (choice.get("delta") or {}).get("content")
+            if text and choice.get("index", 0) == 0:
+                self.parts.append(text)
+                self.on_delta(text)
+
+    def body(self) -> Dict[str, Any]:
+        """The equivalent non-streamed response body."""
+        data: Dict[str, Any] = {"choices": [{"message": {"role": "assistant", "content": "".join(self.parts)}}]}
+        if self.usage:
+            data["usage"] = self.usage
+        return data
+
+
+def _stream_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {**_with_usage(payload), "stream": True}
 
 
-def call_openrouter(messages: List[Dict[str, str]],
+def _stream_completion(
+    payload: Dict[str, Any],
+    api_key: str,
+    slot: Slot,
+    on_delta: Callable[[str], None],
+) -> Dict[str, Any]:
+    stream = _StreamAccumulator(on_delta)
+    with post_stream(OPENROUTER_API_URL, _stream_payload(payload), api_key) as response:
+        if response.is_error:
+            # Read the body so error messages (and fallback checks) can see it
+            response.read()
+            _raise_for_status(response, slot)
+        for line in response.iter_lines():
+            stream.feed(line)
+    return stream.body()
+
+
+async def _astream_completion(
+    payload: Dict[str, Any],
+    api_key: str,
+    slot: Slot,
+    on_delta: Callable[[str], None],
+) -> Dict[str, Any]:
+    stream = _StreamAccumulator(on_delta)
+    async with apost_stream(OPENROUTER_API_URL, _stream_payload(payload), api_key) as response:
+        if response.is_error:
+            await response.aread()
+            await _araise_for_status(response, slot)
+        async for line in response.aiter_lines():
+            stream.feed(line)
+    return stream.body()
+
+
+def _with_usage(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Ask OpenRouter for detailed usage (including cached prompt tokens)."""
+    return {**payload, "usage": {"include": True}}
+
+
+def _token_estimate(limiter: RateLimiter, payload: Dict[str, Any]) -> int:
+    """Prompt size for the tokens/min bucket (skipped when that limit is off)."""
+    if not limiter.tokens_per_minute:
+        return 0
+    return estimate_message_tokens(payload.get("messages", []))
+
+
+def _record_usage(payload: Dict[str, Any], data: Dict[str, Any], latency_s: float) -> UsageRecord:
+    usage = data.get("usage") or {}
+    details = usage.get("prompt_tokens_details") or {}
+    estimated = "prompt_tokens" not in usage
+    record = UsageRecord(
+        label=current_label(),
+        model=payload.get("model", ""),
+        prompt_tokens=(
+            estimate_message_tokens(payload.get("messages", [])) if estimated
+            else usage["prompt_tokens"]
+        ),
+        completion_tokens=usage.get("completion_tokens", 0),
+        cached_tokens=details.get("cached_tokens") or 0,
+        latency_s=latency_s,
+        estimated=estimated,
+    )
+    get_usage_tracker().record(record)
+    return record
+
+
+def _cache_lookup(
+    payload: Dict[str, Any],
+    refresh_cache: bool,
+) -> tuple[LLMCache | None, str | None, str | None]:
+    """Return (cache, key, cached content); cache is None when caching does not apply."""
+    cache = get_llm_cache()
+    if cache is None:
+        return None, None, None
+    if not is_cacheable(payload):
+        cache.stats.bypassed += 1
+        return None, None, None
+
+    key = cache_key(payload)
+    if refresh_cache:
+        return cache, key, None
+    return cache, key, cache.get(key)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True for a 429 from the provider (the rate limiter handles the wait)."""
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429
+
+
+def _require_api_key(api_key: str | None) -> str:
+    api_key = api_key or os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENROUTER_API_KEY not set. Add it to src/.env")
+    return api_key
+
+
+def _reset_stream(on_delta: Callable[[str], None] | None) -> None:
+    # The retry streams the answer again from the start; a callback with a
+    # reset() (utils.streaming.ProgressWriter) drops the partial text first
+    reset = getattr(on_delta, "reset", None)
+    if reset is not None:
+        reset()
+
+
+def call_openrouter(messages: List[Dict[str, Any]],
                     model: str = DEFAULT_MODEL,
-                    temperature: float = 0.0) -> str:
+                    temperature: float = 0.0,
+                    on_delta: Callable[[str], None] | None = None) -> str:
 
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
@@ -31,32 +293,22 @@ def call_openrouter(messages: List[Dict[str, str]],
     last_error = None
     for attempt in range(MAX_RETRIES):
         try:
-            response = requests.post(
-                OPENROUTER_API_URL,
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
+            content = request_completion(
+                {
                     "model": model,
                     "messages": messages,
                     "temperature": temperature,
                 },
-                timeout=180,
+                api_key=api_key,
+                on_delta=on_delta,
             )
-
-            if response.status_code == 429:
-                wait_time = INITIAL_BACKOFF * (2 ** attempt)
-                print(f"  [LLM] Rate limited. Waiting {wait_time}s... (retry {attempt + 1}/{MAX_RETRIES})", flush=True)
-                time.sleep(wait_time)
-                continue
-
-            response.raise_for_status()
             print(f"  [LLM] Response received", flush=True)
-            return response.json()["choices"][0]["message"]["content"]
+            return content
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
+            # request_completion already retried any 429 after the limiter's cooldown
             last_error = e
+            _reset_stream(on_delta)
             if attempt < MAX_RETRIES - 1:
                 wait_time = INITIAL_BACKOFF * (2 ** attempt)
                 print(f"  [LLM] Error: {e}. Retrying in {wait_time}s...", flush=True)
@@ -0,0 +1,376 @@
+"""
+Process-wide rate limiting and adaptive concurrency for LLM calls.
+
+Every request_completion call takes a slot from one shared RateLimiter
+before it hits the network:
+- token buckets for requests/min and tokens/min (prompt estimate, corrected
+  with the usage the provider reports)
+- a shared cooldown set from ``Retry-After`` / ``X-RateLimit-Reset`` on a
+  429, so parallel critics and proposals wait once together instead of each
+  sleeping on its own schedule and retrying in a burst
+- AIMD concurrency: the number of calls in flight grows by one per
+  "window" of successes and halves on every 429
+
+Bucket and cooldown state can be shared between processes (e.g. several
+``run_workflow.py`` runs) through a SQLite file; concurrency control stays
+per process.
+
+Configuration (environment variables):
+- LLM_RATE_LIMIT_RPM     requests per minute (default 0 = unlimited)
+- LLM_RATE_LIMIT_TPM     prompt+completion tokens per minute (default 0 = unlimited)
+- LLM_MAX_CONCURRENCY    ceiling for calls in flight (default 16)
+- LLM_MIN_CONCURRENCY    floor after repeated 429s (default 1)
+- LLM_RATE_LIMIT_STATE   SQLite file to share buckets across processes (default: in-process)
+- LLM_RATE_LIMIT_COOLDOWN  seconds to pause after a 429 without Retry-After (default 2)
+- LLM_RATE_LIMIT_RETRIES   429s request_completion retries before raising (default 5)
+"""
+
+import asyncio
+import email.utils
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator
+
+import httpx
+
+# Polling interval for async waiters on the concurrency gate
+ASYNC_POLL_INTERVAL = 0.02
+
+
+@dataclass
+class RateLimitStats:
+    """Counters for reports and benchmarks."""
+    acquired: int = 0
+    throttled: int = 0       # 429s reported back to the limiter
+    waited_s: float = 0.0    # time spent waiting for buckets, cooldowns or slots
+    concurrency: float = 0.0
+    in_flight_peak: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        stats["waited_s"] = round(self.waited_s, 3)
+        stats["concurrency"] = round(self.concurrency, 2)
+        return stats
+
+
+class MemoryBucketState:
+    """Token-bucket and cooldown state for one process."""
+
+    def __init__(self):
+        self._buckets: Dict[str, tuple[float, float]] = {}  # name -> (tokens, updated_at)
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def take(self, name: str, per_minute: float, amount: float) -> float:
+        """Take ``amount`` from a bucket; return seconds to wait if it is short."""
+        with self._lock:
+            now = time.time()
+            tokens, updated = self._buckets.get(name, (per_minute, now))
+            tokens, wait = _take(tokens, updated, now, per_minute, amount)
+            self._buckets[name] = (tokens, now)
+            return wait
+
+    def adjust(self, name: str, per_minute: float, amount: float) -> None:
+        """Charge (or refund, if negative) tokens after the fact."""
+        with self._lock:
+            now = time.time()
+            tokens, updated = self._buckets.get(name, (per_minute, now))
+            tokens = min(per_minute, tokens + (now - updated) * per_minute / 60) - amount
+            self._buckets[name] = (tokens, now)
+
+    def cooldown_until(self) -> float:
+        return self._cooldown_until
+
+    def set_cooldown(self, until: float) -> None:
+        with self._lock:
+            self._cooldown_until = max(self._cooldown_until, until)
+
+
+class SQLiteBucketState:
+    """Same interface as MemoryBucketState, shared across processes via SQLite."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _row(self, conn: sqlite3.Connection, name: str, default: float, now: float) -> tuple[float, float]:
+        row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+        return row if row is not None else (default, now)
+
+    def _store(self, conn: sqlite3.Connection, name: str, tokens: float, now: float) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+            (name, tokens, now),
+        )
+
+    def take(self, name: str, per_minute: float, amount: float) -> float:
+        with self._transaction() as conn:
+            now = time.time()
+            tokens, updated = self._row(conn, name, per_minute, now)
+            tokens, wait = _take(tokens, updated, now, per_minute, amount)
+            self._store(conn, name, tokens, now)
+            return wait
+
+    def adjust(self, name: str, per_minute: float, amount: float) -> None:
+        with self._transaction() as conn:
+            now = time.time()
+            tokens, updated = self._row(conn, name, per_minute, now)
+            tokens = min(per_minute, tokens + (now - updated) * per_minute / 60) - amount
+            self._store(conn, name, tokens, now)
+
+    # The shared cooldown is kept as a pseudo-bucket whose "tokens" is the deadline
+    def cooldown_until(self) -> float:
+        row = self._connect().execute(
+            "SELECT tokens FROM buckets WHERE name = 'cooldown'"
+        ).fetchone()
+        return row[0] if row else 0.0
+
+    def set_cooldown(self, until: float) -> None:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT tokens FROM buckets WHERE name = 'cooldown'").fetchone()
+            self._store(conn, "cooldown", max(until, row[0] if row else 0.0), time.time())
+
+
+def _take(tokens: float, updated: float, now: float, per_minute: float, amount: float) -> tuple[float, float]:
+    """
+    Refill a bucket (capacity = one minute's worth) and try to take ``amount``.
+
+    Returns (new token count, seconds to wait). A request larger than the
+    whole bucket is let through once the bucket is full, leaving it in
+    debt, so oversized prompts are delayed rather than blocked forever.
+    """
+    tokens = min(per_minute, tokens + (now - updated) * per_minute / 60)
+    needed = min(amount, per_minute)
+    if tokens >= needed:
+        return tokens - amount, 0.0
+    return tokens, (needed - tokens) * 60 / per_minute
+
+
+def retry_after_seconds(response: httpx.Response, default: float | None = None) -> float | None:
+    """Seconds the provider asked us to wait (Retry-After or X-RateLimit-Reset)."""
+    value = response.headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    reset = response.headers.get("X-RateLimit-Reset")
+    if reset:
+        try:
+            # OpenRouter reports the reset time in epoch milliseconds
+            return max(0.0, float(reset) / 1000 - time.time())
+        except ValueError:
+            pass
+    return default
+
+
+class Slot:
+    """One admitted request; report its outcome before leaving the block."""
+
+    def __init__(self, limiter: "RateLimiter", tokens: int):
+        self._limiter = limiter
+        self._tokens = tokens
+        self.throttled = False
+
+    def rate_limited(self, retry_after: float | None = None) -> None:
+        """The provider answered 429: pause everyone and shrink concurrency."""
+        self.throttled = True
+        self._limiter._on_throttle(retry_after)
+
+    def used_tokens(self, actual: int) -> None:
+        """Correct the tokens/min bucket with the usage the provider reported."""
+        self._limiter._adjust_tokens(actual - self._tokens)
+        self._tokens = actual
+
+    async def arate_limited(self, retry_after: float | None = None) -> None:
+        """Async counterpart of rate_limited()."""
+        self.throttled = True
+        await self._limiter._off_loop(self._limiter._on_throttle, retry_after)
+
+    async def aused_tokens(self, actual: int) -> None:
+        """Async counterpart of used_tokens()."""
+        await self._limiter._off_loop(self._limiter._adjust_tokens, actual - self._tokens)
+        self._tokens = actual
+
+
+class RateLimiter:
+    """Token buckets + shared cooldown + AIMD concurrency limit."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        default_cooldown: float = 2.0,
+        state: MemoryBucketState | SQLiteBucketState | None = None,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.default_cooldown = default_cooldown
+        self.state = state or MemoryBucketState()
+        self.stats = RateLimitStats(concurrency=float(max_concurrency))
+        self._concurrency = float(max_concurrency)
+        self._in_flight = 0
+        self._gate = threading.Condition()
+
+    # --- admission ---------------------------------------------------------
+
+    def _bucket_wait(self, tokens: int) -> float:
+        """Seconds until this request may go out (cooldown and buckets)."""
+        wait = self.state.cooldown_until() - time.time()
+        if wait > 0:
+            # Spread the restart a little so the herd does not fire in one burst
+            return wait + random.uniform(0, 0.25)
+        if self.requests_per_minute:
+            wait = self.state.take("requests", self.requests_per_minute, 1)
+            if wait > 0:
+                return wait
+        if self.tokens_per_minute:
+            wait = self.state.take("tokens", self.tokens_per_minute, tokens)
+            if wait > 0:
+                # Give back the request we already took
+                if self.requests_per_minute:
+                    self.state.adjust("requests", self.requests_per_minute, -1)
+                return wait
+        return 0.0
+
+    def _try_enter(self) -> bool:
+        with self._gate:
+            if self._in_flight < int(self._concurrency):
+                self._in_flight += 1
+                self.stats.in_flight_peak = max(self.stats.in_flight_peak, self._in_flight)
+                return True
+            return False
+
+    def _leave(self, slot: Slot) -> None:
+        with self._gate:
+            self._in_flight -= 1
+            if not slot.throttled:
+                # Additive increase: about +1 per window of successful calls
+                self._concurrency = min(self.max_concurrency, self._concurrency + 1 / self._concurrency)
+            self.stats.acquired += 1
+            self.stats.concurrency = self._concurrency
+            self._gate.notify_all()
+
+    def _on_throttle(self, retry_after: float | None) -> None:
+        with self._gate:
+            # Multiplicative decrease
+            self._concurrency = max(self.min_concurrency, self._concurrency / 2)
+            self.stats.throttled += 1
+            self.stats.concurrency = self._concurrency
+        delay = self.default_cooldown if retry_after is None else retry_after
+        self.state.set_cooldown(time.time() + delay)
+
+    async def _off_loop(self, fn, *args):
+        # Shared state is a SQLite transaction that may wait on other
+        # processes' locks: keep it off the event loop
+        if isinstance(self.state, SQLiteBucketState):
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def _record_wait(self, seconds: float) -> None:
+        with self._gate:
+            self.stats.waited_s += seconds
+
+    def _adjust_tokens(self, delta: int) -> None:
+        if self.tokens_per_minute and delta:
+            self.state.adjust("tokens", self.tokens_per_minute, delta)
+
+    @contextmanager
+    def slot(self, tokens: int = 0) -> Iterator[Slot]:
+        """Block until a request of ``tokens`` prompt tokens may be sent."""
+        start = time.monotonic()
+        while not self._try_enter():
+            with self._gate:
+                self._gate.wait(timeout=1.0)
+        slot = Slot(self, tokens)
+        try:
+            while (wait := self._bucket_wait(tokens)) > 0:
+                time.sleep(wait)
+            self._record_wait(time.monotonic() - start)
+            yield slot
+        finally:
+            self._leave(slot)
+
+    @asynccontextmanager
+    async def aslot(self, tokens: int = 0) -> AsyncIterator[Slot]:
+        """Async counterpart of slot(); waits without blocking the event loop."""
+        start = time.monotonic()
+        while not self._try_enter():
+            await asyncio.sleep(ASYNC_POLL_INTERVAL)
+        slot = Slot(self, tokens)
+        try:
+            while (wait := await self._off_loop(self._bucket_wait, tokens)) > 0:
+                await asyncio.sleep(wait)
+            self._record_wait(time.monotonic() - start)
+            yield slot
+        finally:
+            self._leave(slot)
+
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def _limiter_from_env() -> RateLimiter:
+    state_path = os.getenv("LLM_RATE_LIMIT_STATE")
+    return RateLimiter(
+        requests_per_minute=float(os.getenv("LLM_RATE_LIMIT_RPM", "0")),
+        tokens_per_minute=float(os.getenv("LLM_RATE_LIMIT_TPM", "0")),
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+        min_concurrency=int(os.getenv("LLM_MIN_CONCURRENCY", "1")),
+        default_cooldown=float(os.getenv("LLM_RATE_LIMIT_COOLDOWN", "2")),
+        state=SQLiteBucketState(state_path) if state_path else None,
+    )
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter (configured from env on first use)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = _limiter_from_env()
+        return _limiter
+
+
+def set_rate_limiter(limiter: RateLimiter | None) -> None:
+    """Install a limiter explicitly (None re-reads the environment on next use)."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
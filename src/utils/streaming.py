@@ -0,0 +1,68 @@
+"""
+Partial LLM output as LangGraph custom stream events.
+
+Nodes that produce long free text (the Phase 1 summarizer and revision)
+stream their completion and forward each fragment to the graph's stream
+writer as a ``step_progress`` event, the shape the frontend's useSSE hook
+already understands:
+
+    {"type": "step_progress", "step": "summarize", "delta": "...", "message": "..."}
+
+When a streamed call is retried after part of its text was sent,
+``{"type": "step_progress", "step": ..., "reset": true}`` tells consumers
+to drop what they have so far.
+
+Consumers see them with ``graph.stream(..., stream_mode=["custom", ...])``.
+Outside a graph run (or with LLM_STREAM=0) no callback is returned and the
+call is made without streaming, exactly as before.
+"""
+
+import os
+from typing import Any, Callable, Dict
+
+from langgraph.config import get_stream_writer
+
+
+class ProgressWriter:
+    """on_delta callback emitting step_progress events for one step."""
+
+    def __init__(self, step: str, writer: Callable[[Dict[str, Any]], None]):
+        self.step = step
+        self.writer = writer
+        self.received = 0
+
+    def __call__(self, text: str) -> None:
+        self.received += len(text)
+        self.writer({
+            "type": "step_progress",
+            "step": self.step,
+            "delta": text,
+            "message": f"Generating... ({self.received} characters)",
+        })
+
+    def reset(self) -> None:
+        """The call is being retried: the text sent so far is void."""
+        if not self.received:
+            return
+        self.received = 0
+        self.writer({
+            "type": "step_progress",
+            "step": self.step,
+            "reset": True,
+            "message": "Retrying...",
+        })
+
+
+def progress_writer(step: str) -> ProgressWriter | None:
+    """Return an on_delta callback emitting step_progress events for ``step``."""
+    if os.getenv("LLM_STREAM", "1") == "0":
+        return None
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # Outside any runnable (a direct node call in a script): no writer at all
+        return None
+    # Inside a graph run there is always a writer, but unless the caller asked
+    # for stream_mode="custom" it discards the events; LangGraph does not tell
+    # the node which, so such runs still stream (LLM_STREAM=0 turns that off)
+    return ProgressWriter(step, writer)
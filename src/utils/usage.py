@@ -0,0 +1,109 @@
+"""
+Per-call LLM token and latency accounting.
+
+request_completion records one UsageRecord per network call, using the
+``usage`` block the provider returns (prompt, completion and cached prompt
+tokens). Callers tag calls with ``usage_label("phase1.critic")`` so reports
+can be broken down per node or per revision round.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List
+
+_current_label: contextvars.ContextVar[str] = contextvars.ContextVar("llm_usage_label", default="unlabeled")
+
+
+@dataclass
+class UsageRecord:
+    """Token usage and latency of one LLM call."""
+    label: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    latency_s: float
+    estimated: bool = False  # True when the provider sent no usage block
+
+
+class UsageTracker:
+    """Thread-safe collection of UsageRecords for the current process."""
+
+    def __init__(self):
+        self._records: List[UsageRecord] = []
+        self._lock = threading.Lock()
+
+    def record(self, record: UsageRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def records(self, label_prefix: str = "") -> List[UsageRecord]:
+        with self._lock:
+            return [r for r in self._records if r.label.startswith(label_prefix)]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def summary(self, label_prefix: str = "") -> Dict[str, Dict[str, Any]]:
+        """Totals per label: calls, prompt/completion/cached tokens, latency."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for r in self.records(label_prefix):
+            t = totals.setdefault(r.label, {
+                "calls": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cached_tokens": 0,
+                "latency_s": 0.0,
+            })
+            t["calls"] += 1
+            t["prompt_tokens"] += r.prompt_tokens
+            t["completion_tokens"] += r.completion_tokens
+            t["cached_tokens"] += r.cached_tokens
+            t["latency_s"] = round(t["latency_s"] + r.latency_s, 3)
+        return totals
+
+    def cached_share(self, label_prefix: str = "") -> float:
+        """Fraction of prompt tokens the provider served from its prompt cache."""
+        records = self.records(label_prefix)
+        prompt = sum(r.prompt_tokens for r in records)
+        return sum(r.cached_tokens for r in records) / prompt if prompt else 0.0
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        return [asdict(r) for r in self.records()]
+
+
+_tracker = UsageTracker()
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Return the process-wide usage tracker."""
+    return _tracker
+
+
+def current_label() -> str:
+    return _current_label.get()
+
+
+@contextmanager
+def usage_label(label: str) -> Iterator[None]:
+    """Attribute LLM calls made inside the block to ``label``."""
+    token = _current_label.set(label)
+    try:
+        yield
+    finally:
+        _current_label.reset(token)
+
+
+def format_usage(totals: Dict[str, Dict[str, Any]]) -> str:
+    """One line per label, for console reports."""
+    lines = []
+    for label, t in totals.items():
+        lines.append(
+            f"  {label:<34} calls={t['calls']:<3} prompt={t['prompt_tokens']:<8} "
+            f"cached={t['cached_tokens']:<8} completion={t['completion_tokens']:<7} "
+            f"latency={t['latency_s']:.1f}s"
+        )
+    return "\n".join(lines)
@@ -6,12 +6,19 @@ Workflow package for LangGraph workflow definitions.
 """
 
 from .phase1 import build_phase1_workflow
-from .phase2 import create_agenda_workflow, create_proposal_workflow, run_phase2_workflow, run_phase2_from_phase1_state
+from .phase2 import (
+    create_agenda_workflow,
+    create_proposal_workflow,
+    run_phase2_workflow,
+    arun_phase2_workflow,
+    run_phase2_from_phase1_state,
+)
 
 __all__ = [
     "build_phase1_workflow",
     "create_agenda_workflow",
     "create_proposal_workflow",
     "run_phase2_workflow",
+    "arun_phase2_workflow",
     "run_phase2_from_phase1_state",
 ]
@@ -0,0 +1,133 @@
+"""
+Durable checkpoints for the Phase 2 graphs.
+
+The agenda and proposal graphs are compiled with a SQLite checkpointer, and
+each run is stored under a thread keyed by paper and proposal
+(``<arxiv_id>/agenda``, ``<arxiv_id>/proposal_<n>``). Every superstep is
+written before the next one starts. A crashed run can therefore be resumed:
+- a finished thread returns its saved final state without running again
+- an unfinished thread continues from the node that did not complete; the
+  parallel critics that had already finished in that step are not re-run
+- a thread with no checkpoint starts from its input, as before
+
+With a checkpointer, each node's artifacts are written to the store before
+the node returns, so a checkpoint never marks done a node whose outputs
+were still queued. The fsync is left to the artifact writer's interval and
+the flush at the end of the run.
+
+A run without resume clears the paper's threads first, so it always starts
+fresh. Runs without an arxiv_id are not checkpointed.
+
+Configuration (environment variables):
+- PHASE2_CHECKPOINTS   SQLite file (default <project>/.cache/checkpoints.sqlite),
+                       "off" to compile the graphs without a checkpointer
+"""
+
+import os
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph.state import CompiledStateGraph
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CHECKPOINT_PATH = BASE_DIR / ".cache" / "checkpoints.sqlite"
+
+
+def checkpoint_path() -> Path | None:
+    """Checkpoint database location, or None when checkpointing is off."""
+    location = os.getenv("PHASE2_CHECKPOINTS", str(DEFAULT_CHECKPOINT_PATH))
+    return None if location.lower() == "off" else Path(location)
+
+
+def agenda_thread(arxiv_id: str | None) -> str | None:
+    return f"{arxiv_id}/agenda" if arxiv_id else None
+
+
+def proposal_thread(arxiv_id: str | None, proposal_num: int) -> str | None:
+    return f"{arxiv_id}/proposal_{proposal_num}" if arxiv_id else None
+
+
+def _config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@contextmanager
+def open_checkpointer() -> Iterator[BaseCheckpointSaver | None]:
+    """Open the SQLite checkpointer for the sync graphs (None when disabled)."""
+    path = checkpoint_path()
+    if path is None:
+        yield None
+        return
+
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with SqliteSaver.from_conn_string(str(path)) as saver:
+        yield saver
+
+
+@asynccontextmanager
+async def aopen_checkpointer() -> AsyncIterator[BaseCheckpointSaver | None]:
+    """Async counterpart of open_checkpointer, for graphs driven with ``ainvoke``."""
+    path = checkpoint_path()
+    if path is None:
+        yield None
+        return
+
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(str(path)) as saver:
+        # Tables are otherwise created lazily, after a fresh run's first delete
+        await saver.setup()
+        yield saver
+
+
+def invoke_checkpointed(
+    graph: CompiledStateGraph,
+    state: Dict[str, Any],
+    thread_id: str | None,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """Invoke ``graph`` on ``thread_id``; with resume, pick up saved progress."""
+    if graph.checkpointer is None or thread_id is None:
+        return graph.invoke(state)
+
+    config = _config(thread_id)
+    if resume:
+        snapshot = graph.get_state(config)
+        if snapshot.values:
+            if not snapshot.next:
+                print(f"--- Resume: {thread_id} already complete ---")
+                return snapshot.values
+            print(f"--- Resume: {thread_id} continuing at {', '.join(snapshot.next)} ---")
+            return graph.invoke(None, config, durability="sync")
+    else:
+        graph.checkpointer.delete_thread(thread_id)
+    return graph.invoke(state, config, durability="sync")
+
+
+async def ainvoke_checkpointed(
+    graph: CompiledStateGraph,
+    state: Dict[str, Any],
+    thread_id: str | None,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """Async counterpart of invoke_checkpointed."""
+    if graph.checkpointer is None or thread_id is None:
+        return await graph.ainvoke(state)
+
+    config = _config(thread_id)
+    if resume:
+        snapshot = await graph.aget_state(config)
+        if snapshot.values:
+            if not snapshot.next:
+                print(f"--- Resume: {thread_id} already complete ---")
+                return snapshot.values
+            print(f"--- Resume: {thread_id} continuing at {', '.join(snapshot.next)} ---")
+            return await graph.ainvoke(None, config, durability="sync")
+    else:
+        await graph.checkpointer.adelete_thread(thread_id)
+    return await graph.ainvoke(state, config, durability="sync")
@@ -6,7 +6,8 @@ iterative ideation + critique loop for research proposal generation.
 
 The workflow generates 3 distinct proposals by:
 1. Running an agenda workflow once to get research directions
-2. Running a proposal workflow 3 times, each focused on a different direction
+2. Running a proposal workflow once per direction (concurrently, with a
+   configurable cap), each focused on a different direction
 
 Flow per proposal:
 1. Brainstormer
@@ -18,9 +19,13 @@ Flow per proposal:
 7. Quality Score
 """
 
-from pathlib import Path
-from typing import Literal
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Literal
 
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
@@ -39,7 +44,72 @@ from nodes.phase2 import (
     mechanism_updater_node,
     final_judge_node,
     quality_score_node,
+    acontext_ingestion_node,
+    aagenda_creator_node,
+    abrainstormer_node,
+    asanity_checker_node,
+    aexample_tester_node,
+    areverse_reasoner_node,
+    aobstruction_analyzer_node,
+    afeedback_consolidator_node,
+    adone_decision_node,
+    areport_generator_node,
+    amechanism_updater_node,
+    afinal_judge_node,
+    aquality_score_node,
 )
+from utils.artifacts import flush_artifacts
+from .checkpoint import (
+    agenda_thread,
+    ainvoke_checkpointed,
+    aopen_checkpointer,
+    invoke_checkpointed,
+    open_checkpointer,
+    proposal_thread,
+)
+
+
+# Graph node name -> (sync implementation, async implementation)
+NODE_IMPLEMENTATIONS = {
+    "context_ingestion": (context_ingestion_node, acontext_ingestion_node),
+    "agenda_creator": (agenda_creator_node, aagenda_creator_node),
+    "brainstormer": (brainstormer_node, abrainstormer_node),
+    "sanity_checker": (sanity_checker_node, asanity_checker_node),
+    "example_tester": (example_tester_node, aexample_tester_node),
+    "reverse_reasoner": (reverse_reasoner_node, areverse_reasoner_node),
+    "obstruction_analyzer": (obstruction_analyzer_node, aobstruction_analyzer_node),
+    "feedback_consolidator": (feedback_consolidator_node, afeedback_consolidator_node),
+    "done_decision": (done_decision_node, adone_decision_node),
+    "report_generator": (report_generator_node, areport_generator_node),
+    "mechanism_updater": (mechanism_updater_node, amechanism_updater_node),
+    "final_judge": (final_judge_node, afinal_judge_node),
+    "quality_score": (quality_score_node, aquality_score_node),
+}
+
+
+def _node(name: str, use_async: bool, durable: bool = False):
+    sync_node, async_node = NODE_IMPLEMENTATIONS[name]
+    if not durable:
+        return async_node if use_async else sync_node
+
+    # The checkpoint written after a node marks it done, and a resumed run
+    # skips it: its artifacts must be in the store before that checkpoint.
+    # Being put is enough for that; fsync stays on the writer's timer and
+    # the end-of-run flush instead of costing every node
+    if use_async:
+        @functools.wraps(async_node)
+        async def flushed_async_node(state: Phase2State) -> dict:
+            update = await async_node(state)
+            await asyncio.to_thread(flush_artifacts, sync=False)
+            return update
+        return flushed_async_node
+
+    @functools.wraps(sync_node)
+    def flushed_node(state: Phase2State) -> dict:
+        update = sync_node(state)
+        flush_artifacts(sync=False)
+        return update
+    return flushed_node
 
 
 NUM_PROPOSALS = 3
@@ -63,29 +133,39 @@ def should_continue_loop(state: Phase2State) -> Literal["continue", "exit"]:
         return "continue"
 
 
-def create_agenda_workflow() -> CompiledStateGraph:
+def create_agenda_workflow(
+    use_async: bool = False,
+    checkpointer: BaseCheckpointSaver | None = None,
+) -> CompiledStateGraph:
     """
     Creates the agenda-only workflow: context_ingestion → agenda_creator.
 
+    Args:
+        use_async: Register the async node variants (run with ``ainvoke``)
+        checkpointer: Optional saver for durable, resumable runs (see checkpoint)
+
     Returns:
         Compiled LangGraph workflow that produces research directions.
     """
     workflow = StateGraph(Phase2State)
+    durable = checkpointer is not None
 
-    workflow.add_node("context_ingestion", context_ingestion_node)
-    workflow.add_node("agenda_creator", agenda_creator_node)
+    workflow.add_node("context_ingestion", _node("context_ingestion", use_async, durable))
+    workflow.add_node("agenda_creator", _node("agenda_creator", use_async, durable))
 
     workflow.set_entry_point("context_ingestion")
     workflow.add_edge("context_ingestion", "agenda_creator")
     workflow.add_edge("agenda_creator", END)
 
-    compiled = workflow.compile()
+    compiled = workflow.compile(checkpointer=checkpointer)
     print("--- Agenda Workflow compiled successfully ---")
     return compiled
 
 
 def create_proposal_workflow(
     max_iterations: int = 5,
+    use_async: bool = False,
+    checkpointer: BaseCheckpointSaver | None = None,
 ) -> CompiledStateGraph:
     """
     Creates the proposal workflow: brainstormer → critics → feedback → done → report → judge → score.
@@ -94,30 +174,35 @@ def create_proposal_workflow(
 
     Args:
         max_iterations: Maximum number of brainstorm-critique iterations (default: 5)
+        use_async: Register the async node variants (run with ``ainvoke``), so
+            the four parallel critics await their LLM calls instead of each
+            blocking a worker thread
+        checkpointer: Optional saver for durable, resumable runs (see checkpoint)
 
     Returns:
         Compiled LangGraph workflow for a single proposal
     """
     workflow = StateGraph(Phase2State)
+    durable = checkpointer is not None
 
     # Agent K Loop
-    workflow.add_node("brainstormer", brainstormer_node)
+    workflow.add_node("brainstormer", _node("brainstormer", use_async, durable))
 
     # Parallel Critique Agents
-    workflow.add_node("sanity_checker", sanity_checker_node)
-    workflow.add_node("example_tester", example_tester_node)
-    workflow.add_node("reverse_reasoner", reverse_reasoner_node)
-    workflow.add_node("obstruction_analyzer", obstruction_analyzer_node)
+    workflow.add_node("sanity_checker", _node("sanity_checker", use_async, durable))
+    workflow.add_node("example_tester", _node("example_tester", use_async, durable))
+    workflow.add_node("reverse_reasoner", _node("reverse_reasoner", use_async, durable))
+    workflow.add_node("obstruction_analyzer", _node("obstruction_analyzer", use_async, durable))
 
     # Feedback and Decision
-    workflow.add_node("feedback_consolidator", feedback_consolidator_node)
-    workflow.add_node("done_decision", done_decision_node)
+    workflow.add_node("feedback_consolidator", _node("feedback_consolidator", use_async, durable))
+    workflow.add_node("done_decision", _node("done_decision", use_async, durable))
 
     # Finalization
-    workflow.add_node("report_generator", report_generator_node)
-    workflow.add_node("mechanism_updater", mechanism_updater_node)
-    workflow.add_node("final_judge", final_judge_node)
-    workflow.add_node("quality_score", quality_score_node)
+    workflow.add_node("report_generator", _node("report_generator", use_async, durable))
+    workflow.add_node("mechanism_updater", _node("mechanism_updater", use_async, durable))
+    workflow.add_node("final_judge", _node("final_judge", use_async, durable))
+    workflow.add_node("quality_score", _node("quality_score", use_async, durable))
 
     # Entry point
     workflow.set_entry_point("brainstormer")
@@ -153,24 +238,176 @@ def create_proposal_workflow(
     workflow.add_edge("final_judge", "quality_score")
     workflow.add_edge("quality_score", END)
 
-    compiled = workflow.compile()
+    compiled = workflow.compile(checkpointer=checkpointer)
     print("--- Proposal Workflow compiled successfully ---")
     return compiled
 
 
+def _agenda_state(summary: str, mechanism: str, arxiv_id: str | None, max_iterations: int) -> Phase2State:
+    return {
+        "summary": summary,
+        "mechanism": mechanism,
+        "arxiv_id": arxiv_id,
+        "max_iterations": max_iterations,
+        "critiques": [],
+    }
+
+
+def _select_directions(agenda_result: dict, num_proposals: int) -> tuple[list, list]:
+    """Return (full agenda, top-N directions) and log the selection."""
+    directions = agenda_result.get("agenda", [])
+    if not directions:
+        print("ERROR: Agenda creator produced no research directions!")
+        return [], []
+
+    # Pick top N directions
+    selected_directions = directions[:num_proposals]
+    print(f"\nSelected {len(selected_directions)} directions for proposal generation:")
+    for i, d in enumerate(selected_directions, 1):
+        print(f"  {i}. {d[:100]}...")
+    return directions, selected_directions
+
+
+def _proposal_state(
+    summary: str,
+    mechanism: str,
+    arxiv_id: str | None,
+    max_iterations: int,
+    direction: str,
+    proposal_num: int,
+    total: int,
+    directions: list,
+) -> Phase2State:
+    print(f"\n{'='*60}")
+    print(f"PROPOSAL {proposal_num}/{total}")
+    print(f"Direction: {direction[:100]}...")
+    print(f"{'='*60}\n")
+
+    return {
+        "summary": summary,
+        "mechanism": mechanism,
+        "arxiv_id": arxiv_id,
+        "max_iterations": max_iterations,
+        "current_direction": direction,
+        "proposal_num": proposal_num,
+        "agenda": directions,  # Pass full agenda for context
+        "critiques": [],
+    }
+
+
+def _proposal_result(proposal_num: int, direction: str, final_state: dict) -> dict:
+    proposal_result = {
+        "proposal_num": proposal_num,
+        "direction": direction,
+        "final_report": final_state.get("final_report", ""),
+        "ps_score": final_state.get("ps_score", 0),
+        "pa_score": final_state.get("pa_score", 0),
+        "ec_score": final_state.get("ec_score", 0),
+        "pi_score": final_state.get("pi_score", 0),
+        "quality_assessment": final_state.get("quality_assessment", {}),
+        "iterations": final_state.get("phase2_iteration", 0),
+    }
+
+    print(
+        f"\nProposal {proposal_num} complete: "
+        f"PS={proposal_result['ps_score']}/5 | "
+        f"PA={proposal_result['pa_score']}/5 | "
+        f"EC={proposal_result['ec_score']}/5 | "
+        f"PI={proposal_result['pi_score']}/5"
+    )
+    return proposal_result
+
+
+def _failed_proposal(proposal_num: int, direction: str, error: Exception) -> dict:
+    """Placeholder result for a proposal whose graph raised, so siblings still report."""
+    print(f"\nProposal {proposal_num} FAILED: {type(error).__name__}: {error}")
+    return {
+        "proposal_num": proposal_num,
+        "direction": direction,
+        "final_report": "",
+        "ps_score": 0,
+        "pa_score": 0,
+        "ec_score": 0,
+        "pi_score": 0,
+        "quality_assessment": {},
+        "iterations": 0,
+        "error": f"{type(error).__name__}: {error}",
+    }
+
+
+def _report_flush_error(error: Exception) -> None:
+    # The run already failed; that error is the one to propagate
+    print(f"Artifact writer: could not flush after a failed run: {error}")
+
+
+@contextmanager
+def _flushing_artifacts() -> Iterator[None]:
+    """Nodes save their outputs in the background; make sure they are written on the way out."""
+    try:
+        yield
+    except BaseException:
+        try:
+            flush_artifacts()
+        except Exception as e:
+            _report_flush_error(e)
+        raise
+    flush_artifacts()
+
+
+@asynccontextmanager
+async def _aflushing_artifacts() -> AsyncIterator[None]:
+    try:
+        yield
+    except BaseException:
+        try:
+            await asyncio.to_thread(flush_artifacts)
+        except Exception as e:
+            _report_flush_error(e)
+        raise
+    await asyncio.to_thread(flush_artifacts)
+
+
+def _print_phase2_summary(all_proposals: list) -> None:
+    print("\n" + "=" * 60)
+    print("PHASE 2 COMPLETE")
+    print("=" * 60)
+    for p in all_proposals:
+        if p.get("error"):
+            print(f"  Proposal {p['proposal_num']}: FAILED ({p['error'][:80]})")
+            continue
+        print(
+            f"  Proposal {p['proposal_num']}: "
+            f"PS={p['ps_score']}/5 | PA={p['pa_score']}/5 | "
+            f"EC={p['ec_score']}/5 | PI={p['pi_score']}/5 "
+            f"({p['iterations']} iterations)"
+        )
+    print("=" * 60 + "\n")
+
+
 def run_phase2_workflow(
     summary: str,
     mechanism: str,
     arxiv_id: str = None,
     max_iterations: int = 5,
     num_proposals: int = NUM_PROPOSALS,
+    max_concurrency: int = NUM_PROPOSALS,
+    resume: bool = False,
 ) -> dict:
     """
     Convenience function to create and run the Phase 2 workflow.
 
     Generates multiple proposals by:
     1. Running the agenda workflow once to get research directions
-    2. Running the proposal workflow once per direction (top N)
+    2. Running the proposal workflow once per direction (top N), up to
+       max_concurrency at a time on a worker pool
+
+    Proposals share only read-only inputs, so they run independently: the
+    returned list is always in direction order, and a proposal whose graph
+    raises is reported with an 'error' key instead of aborting the others.
+
+    With an arxiv_id, both graphs are checkpointed per paper and proposal
+    (see checkpoint); resume continues an earlier run of the same paper
+    from its last completed node instead of starting again from the agenda.
 
     Args:
         summary: Paper summary from Phase 1 (summarizer_node output)
@@ -178,6 +415,8 @@ def run_phase2_workflow(
         arxiv_id: Optional paper identifier for file saving
         max_iterations: Maximum brainstorm-critique iterations per proposal
         num_proposals: Number of proposals to generate (default: 3)
+        max_concurrency: Proposal graphs allowed to run at once (1 = sequential)
+        resume: Continue from saved checkpoints instead of starting fresh
 
     Returns:
         Dict containing 'proposals' list and 'agenda' from the workflow
@@ -187,87 +426,120 @@ def run_phase2_workflow(
     print(f"  Generating {num_proposals} proposals")
     print("=" * 60 + "\n")
 
-    # === Step 1: Run agenda workflow once ===
-    print("--- Phase 2 Step 1: Generating Research Agenda ---")
-    agenda_workflow = create_agenda_workflow()
+    with open_checkpointer() as checkpointer, _flushing_artifacts():
+        # === Step 1: Run agenda workflow once ===
+        print("--- Phase 2 Step 1: Generating Research Agenda ---")
+        agenda_workflow = create_agenda_workflow(checkpointer=checkpointer)
 
-    agenda_state: Phase2State = {
-        "summary": summary,
-        "mechanism": mechanism,
-        "arxiv_id": arxiv_id,
-        "max_iterations": max_iterations,
-        "critiques": [],
+        agenda_result = invoke_checkpointed(
+            agenda_workflow,
+            _agenda_state(summary, mechanism, arxiv_id, max_iterations),
+            agenda_thread(arxiv_id),
+            resume,
+        )
+        directions, selected_directions = _select_directions(agenda_result, num_proposals)
+        if not directions:
+            return {"proposals": [], "agenda": []}
+
+        # === Step 2: Run proposal workflow for each direction ===
+        proposal_workflow = create_proposal_workflow(
+            max_iterations=max_iterations, checkpointer=checkpointer
+        )
+
+        def run_proposal(i: int, direction: str) -> dict:
+            proposal_state = _proposal_state(
+                summary, mechanism, arxiv_id, max_iterations,
+                direction, i, len(selected_directions), directions,
+            )
+            try:
+                final_state = invoke_checkpointed(
+                    proposal_workflow, proposal_state, proposal_thread(arxiv_id, i), resume
+                )
+            except Exception as e:
+                return _failed_proposal(i, direction, e)
+            return _proposal_result(i, direction, final_state)
+
+        workers = max(1, min(max_concurrency, len(selected_directions)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proposal") as pool:
+            # map() yields in submission order, so proposals stay in direction order
+            all_proposals = list(pool.map(
+                run_proposal, range(1, len(selected_directions) + 1), selected_directions
+            ))
+
+    _print_phase2_summary(all_proposals)
+
+    return {
+        "proposals": all_proposals,
+        "agenda": directions,
     }
 
-    agenda_result = agenda_workflow.invoke(agenda_state)
-    directions = agenda_result.get("agenda", [])
 
-    if not directions:
-        print("ERROR: Agenda creator produced no research directions!")
-        return {"proposals": [], "agenda": []}
+async def arun_phase2_workflow(
+    summary: str,
+    mechanism: str,
+    arxiv_id: str = None,
+    max_iterations: int = 5,
+    num_proposals: int = NUM_PROPOSALS,
+    max_concurrency: int = NUM_PROPOSALS,
+    resume: bool = False,
+) -> dict:
+    """
+    Async counterpart of run_phase2_workflow.
 
-    # Pick top N directions
-    selected_directions = directions[:num_proposals]
-    print(f"\nSelected {len(selected_directions)} directions for proposal generation:")
-    for i, d in enumerate(selected_directions, 1):
-        print(f"  {i}. {d[:100]}...")
+    Compiles the graphs with the async node variants and drives them with
+    ``ainvoke``, so LLM calls (including the four parallel critics) are
+    awaited on one event loop instead of occupying a thread each. Up to
+    max_concurrency proposal graphs run at once (bounded by a semaphore),
+    with the same ordering, failure-isolation and checkpoint/resume
+    guarantees.
 
-    # === Step 2: Run proposal workflow for each direction ===
-    proposal_workflow = create_proposal_workflow(max_iterations=max_iterations)
-    all_proposals = []
-
-    for i, direction in enumerate(selected_directions, 1):
-        print(f"\n{'='*60}")
-        print(f"PROPOSAL {i}/{len(selected_directions)}")
-        print(f"Direction: {direction[:100]}...")
-        print(f"{'='*60}\n")
-
-        proposal_state: Phase2State = {
-            "summary": summary,
-            "mechanism": mechanism,
-            "arxiv_id": arxiv_id,
-            "max_iterations": max_iterations,
-            "current_direction": direction,
-            "proposal_num": i,
-            "agenda": directions,  # Pass full agenda for context
-            "critiques": [],
-        }
+    Returns:
+        Dict containing 'proposals' list and 'agenda' from the workflow
+    """
+    print("\n" + "=" * 60)
+    print("STARTING PHASE 2: OPEN PROBLEM FORMULATION")
+    print(f"  Generating {num_proposals} proposals")
+    print("=" * 60 + "\n")
 
-        final_state = proposal_workflow.invoke(proposal_state)
-
-        proposal_result = {
-            "proposal_num": i,
-            "direction": direction,
-            "final_report": final_state.get("final_report", ""),
-            "ps_score": final_state.get("ps_score", 0),
-            "pa_score": final_state.get("pa_score", 0),
-            "ec_score": final_state.get("ec_score", 0),
-            "pi_score": final_state.get("pi_score", 0),
-            "quality_assessment": final_state.get("quality_assessment", {}),
-            "iterations": final_state.get("phase2_iteration", 0),
-        }
-        all_proposals.append(proposal_result)
+    async with aopen_checkpointer() as checkpointer, _aflushing_artifacts():
+        print("--- Phase 2 Step 1: Generating Research Agenda ---")
+        agenda_workflow = create_agenda_workflow(use_async=True, checkpointer=checkpointer)
 
-        print(
-            f"\nProposal {i} complete: "
-            f"PS={proposal_result['ps_score']}/5 | "
-            f"PA={proposal_result['pa_score']}/5 | "
-            f"EC={proposal_result['ec_score']}/5 | "
-            f"PI={proposal_result['pi_score']}/5"
+        agenda_result = await ainvoke_checkpointed(
+            agenda_workflow,
+            _agenda_state(summary, mechanism, arxiv_id, max_iterations),
+            agenda_thread(arxiv_id),
+            resume,
         )
+        directions, selected_directions = _select_directions(agenda_result, num_proposals)
+        if not directions:
+            return {"proposals": [], "agenda": []}
 
-    # === Print summary ===
-    print("\n" + "=" * 60)
-    print("PHASE 2 COMPLETE")
-    print("=" * 60)
-    for p in all_proposals:
-        print(
-            f"  Proposal {p['proposal_num']}: "
-            f"PS={p['ps_score']}/5 | PA={p['pa_score']}/5 | "
-            f"EC={p['ec_score']}/5 | PI={p['pi_score']}/5 "
-            f"({p['iterations']} iterations)"
+        proposal_workflow = create_proposal_workflow(
+            max_iterations=max_iterations, use_async=True, checkpointer=checkpointer
         )
-    print("=" * 60 + "\n")
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_proposal(i: int, direction: str) -> dict:
+            async with semaphore:
+                proposal_state = _proposal_state(
+                    summary, mechanism, arxiv_id, max_iterations,
+                    direction, i, len(selected_directions), directions,
+                )
+                try:
+                    final_state = await ainvoke_checkpointed(
+                        proposal_workflow, proposal_state, proposal_thread(arxiv_id, i), resume
+                    )
+                except Exception as e:
+                    return _failed_proposal(i, direction, e)
+                return _proposal_result(i, direction, final_state)
+
+        # gather() returns results in argument order, not completion order
+        all_proposals = list(await asyncio.gather(*(
+            run_proposal(i, direction) for i, direction in enumerate(selected_directions, 1)
+        )))
+
+    _print_phase2_summary(all_proposals)
 
     return {
         "proposals": all_proposals,
@@ -275,13 +547,20 @@ def run_phase2_workflow(
     }
 
 
-def run_phase2_from_phase1_state(phase1_state: dict, max_iterations: int = 5) -> dict:
+def run_phase2_from_phase1_state(
+    phase1_state: dict,
+    max_iterations: int = 5,
+    max_concurrency: int = NUM_PROPOSALS,
+    resume: bool = False,
+) -> dict:
     """
     Run Phase 2 directly from Phase 1 output state.
 
     Args:
         phase1_state: The state dict from Phase 1 containing 'summary' and 'mechanism'
         max_iterations: Maximum brainstorm-critique iterations
+        max_concurrency: Proposal graphs allowed to run at once
+        resume: Continue from saved checkpoints instead of starting fresh
 
     Returns:
         Dict with 'proposals' list and 'agenda'
@@ -291,4 +570,6 @@ def run_phase2_from_phase1_state(phase1_state: dict, max_iterations: int = 5) ->
         mechanism=phase1_state["mechanism"],
         arxiv_id=phase1_state.get("arxiv_id"),
         max_iterations=max_iterations,
+        max_concurrency=max_concurrency,
+        resume=resume,
     )